@@ -44,6 +44,7 @@ class CircuitBreaker:
         self._state = CircuitState.CLOSED
         self._failure_count = 0
         self._last_failure_time: float = 0.0
+        self._rejected_count = 0
         self._lock = Lock()
 
     @property
@@ -58,14 +59,22 @@ class CircuitBreaker:
                 logger.info(f"Circuit breaker '{self.name}': OPEN -> HALF_OPEN (recovery timeout elapsed)")
             return self._state
 
+    @property
+    def rejected_count(self) -> int:
+        """Number of requests short-circuited while the breaker was OPEN."""
+        return self._rejected_count
+
     def allow_request(self) -> bool:
         """Check if a request should be allowed through."""
-        current_state = self.state  # triggers OPEN->HALF_OPEN check
-        if current_state == CircuitState.CLOSED:
+        # Fast path: CLOSED is the common case and needs no lock or clock read
+        if self._state == CircuitState.CLOSED:
             return True
+        current_state = self.state  # triggers OPEN->HALF_OPEN check
         if current_state == CircuitState.HALF_OPEN:
             return True
         # OPEN
+        with self._lock:
+            self._rejected_count += 1
         return False
 
     def record_success(self) -> None:
@@ -98,6 +107,7 @@ class CircuitBreaker:
             self._state = CircuitState.CLOSED
             self._failure_count = 0
             self._last_failure_time = 0.0
+            self._rejected_count = 0
 
 
 # Module-level singleton for Gemini API calls
@@ -62,11 +62,18 @@ class Settings(BaseSettings):
     CACHE_PRODUCT_TTL: int = 3600  # 1 hour for product cache lookups
     CACHE_FIRECRAWL_TTL: int = 1800  # 30 min for Firecrawl search results
     CACHE_SUMMARY_TTL: int = 7200  # 2 hours for generated summaries
+    CACHE_EXTRACTION_TTL: int = 86400  # 24 hours for blog review extractions
+    CACHE_YOUTUBE_TTL: int = 604800  # 7 days for YouTube scrape/analysis responses
+    CACHE_REVIEW_ID_TTL: int = 300  # 5 min for the in-process ingested-URL -> review id memo
 
     # Qdrant Vector Database
     QDRANT_HOST: str = Field(default="localhost")
     QDRANT_PORT: int = Field(default=6333)
+    QDRANT_GRPC_PORT: int = Field(default=6334)
     QDRANT_COLLECTION: str = "reviews"
+    QDRANT_UPSERT_BATCH: int = 64
+    QDRANT_FLUSH_INTERVAL_MS: int = 200
+    QDRANT_QUANTIZATION: str = "scalar"  # "scalar", "binary" or "none" (new collections only)
 
     # AI/LLM
     LLM_PROVIDER: str = Field(default="gemini")  # "gemini" or "openai"
@@ -76,12 +83,31 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = Field(default="")
     OPENAI_MODEL: str = "gpt-4o"
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_BATCH_WINDOW_MS: int = 20  # coalesce concurrent embedding calls
+    EMBEDDING_BATCH_MAX: int = 32
+    EMBEDDING_CACHE_SIZE: int = 2048  # in-process vectors kept by content hash
+    EMBEDDING_CONCURRENCY: int = 4  # max in-flight embedding API requests
+    LLM_WARMUP_ON_STARTUP: bool = True
+    LLM_PROMPT_CACHE_TTL: int = 3600  # Gemini cached system prompt; 0 disables
+    LLM_RESPONSE_CACHE_SIZE: int = 1024  # temperature-0 responses kept in-process
+    LLM_RESPONSE_CACHE_TTL: int = 3600  # 0 disables the response cache
+    LLM_STREAM_TOOL_CALLS: bool = True  # chat loop dispatches tools from the stream
+    LLM_HTTP_MAX_KEEPALIVE: int = 64
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    HTTP_MAX_CONNECTIONS: int = 100
 
     # YouTube API (for ingestion)
     YOUTUBE_API_KEY: str = Field(default="")
 
     # Firecrawl (for blog scraping)
     FIRECRAWL_API_KEY: str = Field(default="")
+    FIRECRAWL_MAX_CONCURRENCY: int = 5
+    BLOG_INGEST_CONCURRENCY: int = 4  # per-stage limit for FirecrawlService.ingest_many
+
+    # eBay Browse API (direct listing search; Gemini search is the fallback)
+    EBAY_CLIENT_ID: str = Field(default="")
+    EBAY_CLIENT_SECRET: str = Field(default="")
+    EBAY_MARKETPLACE_ID: str = "EBAY_US"
 
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 100
@@ -0,0 +1,38 @@
+"""Shared HTTP connection pool for outbound API calls."""
+
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide async HTTP client.
+
+    Connections are kept alive (HTTP/2 where the server supports it), so
+    repeated calls to the same API skip the TCP+TLS handshake. Pass a
+    per-request ``timeout=`` to override the default.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client — call once at shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
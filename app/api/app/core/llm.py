@@ -0,0 +1,40 @@
+"""Shared Gemini client for every service that talks to the Gemini API."""
+
+from typing import Any, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.http import get_http_client
+
+try:
+    from google import genai
+    from google.genai import types as genai_types
+except ImportError:  # pragma: no cover - optional dependency
+    genai = None
+    genai_types = None
+
+_client: Optional[Any] = None
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_genai_client() -> Any:
+    """Return the process-wide ``genai.Client``.
+
+    The client rides on the shared HTTP pool from :func:`get_http_client`, so
+    chat, scraping and extraction calls reuse the same kept-alive
+    connections. It is rebuilt if that pool has been replaced (e.g. after
+    ``close_http_client``).
+    """
+    global _client, _http_client
+    if genai is None:
+        raise RuntimeError("google-genai is not installed")
+
+    http_client = get_http_client()
+    if _client is None or http_client is not _http_client:
+        _client = genai.Client(
+            api_key=settings.GEMINI_API_KEY,
+            http_options=genai_types.HttpOptions(httpx_async_client=http_client),
+        )
+        _http_client = http_client
+    return _client
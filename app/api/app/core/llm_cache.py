@@ -0,0 +1,184 @@
+"""Two-tier (in-process + Redis) cache for deterministic LLM responses."""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import orjson
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_KEY_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run call() once for all concurrent callers with the same key.
+
+        The first caller performs the request; callers arriving while it is
+        in flight await the same future and get its result (or exception).
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            # shield: a cancelled follower must not cancel the leader's request
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the outcome as retrieved even if nobody else was waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+class LLMCache:
+    """
+    Bounded LRU cache with per-entry TTL for raw LLM responses.
+
+    Only responses to temperature-0 requests should be stored: those are
+    the only ones where replaying a previous answer is indistinguishable
+    from calling the model again.
+
+    When a backend (the Redis CacheService) is connected it acts as a shared
+    second tier, so a response cached by one worker serves every worker.
+    SDK objects cannot be stored there directly: callers pass ``encode`` /
+    ``decode`` to convert them to and from a JSON string.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600, backend: Any = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._inflight = SingleFlight()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Hash request parts (SDK objects, dicts, strings) into a cache key.
+
+        Parts are fed to BLAKE2b one item at a time (list items separately),
+        so long conversation histories never become one large JSON string.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            items = part if isinstance(part, (list, tuple)) else (part,)
+            for item in items:
+                digest.update(orjson.dumps(_canonical(item), default=str, option=_KEY_OPTIONS))
+                digest.update(b"\x1f")
+            digest.update(b"\x1e")
+        return digest.hexdigest()
+
+    async def get(
+        self, key: str, decode: Optional[Callable[[str], Any]] = None
+    ) -> Optional[Any]:
+        """Return the cached response, or None on miss or expiry.
+
+        Checks memory first, then the shared backend (when ``decode`` is
+        given); a backend hit is copied into memory.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+
+        if decode is None or not self._backend_available:
+            return None
+        data = await self.backend.get(_backend_key(key))
+        if data is None:
+            return None
+        try:
+            value = decode(data)
+        except Exception as e:
+            # Stored by an incompatible SDK version — treat as a miss
+            logger.debug(f"Discarding undecodable LLM cache entry '{key}': {e}")
+            return None
+        self._store(key, value)
+        return value
+
+    async def set(
+        self, key: str, value: Any, encode: Optional[Callable[[Any], str]] = None
+    ) -> None:
+        if not self.enabled:
+            return
+        self._store(key, value)
+        if encode is None or not self._backend_available:
+            return
+        try:
+            data = encode(value)
+        except Exception as e:
+            logger.debug(f"Not sharing LLM cache entry '{key}': {e}")
+            return
+        await self.backend.set(_backend_key(key), data, ttl=int(self.ttl))
+
+    @property
+    def _backend_available(self) -> bool:
+        return self.backend is not None and self.backend.available
+
+    def _store(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def single_flight(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run call() once for all concurrent callers with the same key."""
+        return await self._inflight.run(key, call)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _backend_key(key: str) -> str:
+    return f"llm_response:{key}"
+
+
+def _canonical(value: Any) -> Any:
+    """Convert SDK (pydantic) objects to JSON-compatible data for hashing."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    return value
+
+
+# Module-level singleton; app.services.cache_service attaches the Redis backend
+llm_cache = LLMCache(
+    maxsize=settings.LLM_RESPONSE_CACHE_SIZE,
+    ttl=settings.LLM_RESPONSE_CACHE_TTL,
+)
@@ -31,6 +31,17 @@ class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
         )
         return result.scalar_one_or_none()
 
+    async def get_by_name(
+        self,
+        db: AsyncSession,
+        name: str
+    ) -> Optional[Product]:
+        """Get a product by its exact name."""
+        result = await db.execute(
+            select(Product).where(Product.name == name).limit(1)
+        )
+        return result.scalar_one_or_none()
+
     async def search(
         self,
         db: AsyncSession,
@@ -1,7 +1,8 @@
 """CRUD operations for Reviewer model."""
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base import CRUDBase
@@ -33,6 +34,27 @@ class CRUDReviewer(CRUDBase[Reviewer, ReviewerCreate, ReviewerUpdate]):
         )
         return result.scalar_one_or_none()
 
+    async def upsert_by_platform_id(
+        self,
+        db: AsyncSession,
+        values: Dict[str, Any]
+    ) -> Reviewer:
+        """
+        Insert a reviewer, or return the existing one with the same platform_id.
+
+        A single INSERT ... ON CONFLICT statement, so concurrent ingests of the
+        same channel cannot race into a duplicate-key error.
+        """
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(Reviewer).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Reviewer.platform_id],
+            # No-op update so RETURNING yields the existing row unchanged
+            set_={"platform_id": stmt.excluded.platform_id},
+        ).returning(Reviewer)
+        result = await db.execute(stmt, execution_options={"populate_existing": True})
+        return result.scalar_one()
+
     async def get_by_platform(
         self,
         db: AsyncSession,
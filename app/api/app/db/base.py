@@ -1,7 +1,8 @@
 """SQLAlchemy declarative base class."""
 
 import uuid as uuid_module
-import json
+
+import orjson
 
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.types import TypeDecorator, Text, CHAR
@@ -27,13 +28,13 @@ class JSONB(TypeDecorator):
     def process_bind_param(self, value, dialect):
         if value is not None:
             if dialect.name != 'postgresql':
-                return json.dumps(value)
+                return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
         return value
 
     def process_result_value(self, value, dialect):
         if value is not None:
             if dialect.name != 'postgresql' and isinstance(value, str):
-                return json.loads(value)
+                return orjson.loads(value)
         return value
 
 
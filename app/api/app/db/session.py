@@ -1,10 +1,28 @@
 """Database session management."""
 
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
+
+import orjson
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from app.core.config import settings
 
+
+def _orjson_default(obj: Any) -> Any:
+    """Fallback for types orjson does not serialize natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_serializer(value: Any) -> str:
+    """Serialize JSONB column values with orjson (datetime/UUID handled natively)."""
+    return orjson.dumps(
+        value, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
@@ -12,6 +30,8 @@ engine = create_async_engine(
     max_overflow=settings.DB_MAX_OVERFLOW,
     echo=False,
     pool_pre_ping=True,  # Enable connection health checks
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
 )
 
 # Create async session factory
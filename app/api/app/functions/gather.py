@@ -1,6 +1,8 @@
 """Gather functions for auto-scraping product reviews from YouTube and blogs."""
 
 import asyncio
+import json
+import re
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone, timedelta
 
@@ -9,6 +11,7 @@ from sqlalchemy import select
 
 from app.functions.registry import register_function
 from app.core.config import settings
+from app.core.llm import get_genai_client
 from app.core.logging import get_logger
 from app.crud.product import product_crud
 from app.crud.review import review_crud
@@ -19,6 +22,11 @@ from app.services.firecrawl_service import get_firecrawl_service
 
 logger = get_logger(__name__)
 
+# Patterns for pulling JSON / URLs out of grounded search responses
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.S)
+_YOUTUBE_URL_RE = re.compile(r'https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[\w-]+')
+_NON_YOUTUBE_URL_RE = re.compile(r'https?://(?!(?:www\.)?youtube\.com|youtu\.be)[^\s<>"\']+(?:/[^\s<>"\']*)?')
+
 # Cache TTL for reviews (7 days in hours)
 REVIEW_CACHE_TTL_HOURS = 168
 
@@ -141,29 +149,28 @@ async def gather_product_reviews(db: AsyncSession, args: Dict[str, Any]) -> Dict
                 "error": str(e)
             })
 
-    # Ingest blog reviews
+    # Ingest blog reviews (scrape/extract stages run concurrently)
     firecrawl_service = get_firecrawl_service()
-    for url in blog_urls[:3]:  # Limit to 3 per source
-        try:
-            result = await firecrawl_service.ingest_blog_review(
-                db=db,
-                url=url,
-                product_id=product.id if product else None
-            )
-            if result.get("status") in ["success", "already_exists"]:
-                ingested_reviews.append(result)
-                sources.append({
-                    "type": "blog",
-                    "url": url,
-                    "status": result.get("status")
-                })
-        except Exception as e:
-            logger.error(f"Failed to ingest blog review {url}: {e}")
+    blog_batch = blog_urls[:3]  # Limit to 3 per source
+    blog_results = await firecrawl_service.ingest_many(
+        db=db,
+        urls=blog_batch,
+        product_id=product.id if product else None
+    )
+    for url, result in zip(blog_batch, blog_results):
+        if result.get("status") in ["success", "already_exists"]:
+            ingested_reviews.append(result)
+            sources.append({
+                "type": "blog",
+                "url": url,
+                "status": result.get("status")
+            })
+        elif result.get("status") == "error":
             sources.append({
                 "type": "blog",
                 "url": url,
                 "status": "error",
-                "error": str(e)
+                "error": result.get("message")
             })
 
     # Commit changes
@@ -257,9 +264,8 @@ async def search_youtube_reviews(db: AsyncSession, args: Dict[str, Any]) -> Dict
     if not settings.GEMINI_API_KEY:
         return {"error": "GEMINI_API_KEY not configured — Google Search grounding requires Gemini"}
 
-    from google import genai
     from google.genai import types
-    client = genai.Client(api_key=settings.GEMINI_API_KEY)
+    client = get_genai_client()
 
     # Search prompt focusing on tech reviewers
     search_prompt = f"""Search for YouTube video reviews of "{product_name}".
@@ -320,12 +326,9 @@ Only include actual YouTube video URLs that exist. Do not make up URLs."""
             }
 
         # Extract URLs from response
-        import re
-        import json
-
         # Try to parse as JSON first
         try:
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
+            json_match = _JSON_OBJECT_RE.search(response_text)
             if json_match:
                 data = json.loads(json_match.group())
                 urls = data.get("urls", [])
@@ -341,8 +344,7 @@ Only include actual YouTube video URLs that exist. Do not make up URLs."""
             pass
 
         # Fallback: extract URLs using regex
-        youtube_pattern = r'https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[\w-]+'
-        urls = re.findall(youtube_pattern, response_text)
+        urls = _YOUTUBE_URL_RE.findall(response_text)
         urls = list(dict.fromkeys(urls))  # Remove duplicates while preserving order
 
         if urls:
@@ -393,9 +395,8 @@ async def search_blog_reviews(db: AsyncSession, args: Dict[str, Any]) -> Dict[st
     if not settings.GEMINI_API_KEY:
         return {"error": "GEMINI_API_KEY not configured — Google Search grounding requires Gemini"}
 
-    from google import genai
     from google.genai import types
-    client = genai.Client(api_key=settings.GEMINI_API_KEY)
+    client = get_genai_client()
 
     # Search prompt focusing on tech blogs
     search_prompt = f"""Search for written tech blog reviews of "{product_name}".
@@ -458,12 +459,9 @@ Only include actual blog review URLs that exist. Do not make up URLs."""
             }
 
         # Extract URLs from response
-        import re
-        import json
-
         # Try to parse as JSON first
         try:
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
+            json_match = _JSON_OBJECT_RE.search(response_text)
             if json_match:
                 data = json.loads(json_match.group())
                 urls = data.get("urls", [])
@@ -479,8 +477,7 @@ Only include actual blog review URLs that exist. Do not make up URLs."""
             pass
 
         # Fallback: extract URLs using regex (excluding YouTube)
-        url_pattern = r'https?://(?!(?:www\.)?youtube\.com|youtu\.be)[^\s<>"\']+(?:/[^\s<>"\']*)?'
-        urls = re.findall(url_pattern, response_text)
+        urls = _NON_YOUTUBE_URL_RE.findall(response_text)
 
         # Filter to likely review URLs
         review_domains = [
@@ -42,7 +42,9 @@ async def scrape_marketplace_listings(db: AsyncSession, args: Dict[str, Any]) ->
             product_name: str - Product to search for,
             product_id?: int - Optional product ID to associate listings,
             marketplaces?: list[str] - Marketplaces to search (default: ["amazon", "ebay"]),
-            country?: str - Country code (default: "US")
+            country?: str - Country code (default: "US"),
+            max_total?: int - Stop searching further marketplaces once this many listings are found,
+            prefer_marketplace?: str - Marketplace to search first when max_total is set
         }
 
     Returns:
@@ -54,6 +56,8 @@ async def scrape_marketplace_listings(db: AsyncSession, args: Dict[str, Any]) ->
     product_id = args.get("product_id")
     marketplaces = args.get("marketplaces", ["amazon", "ebay"])
     country = args.get("country", "US")
+    max_total = args.get("max_total")
+    prefer_marketplace = args.get("prefer_marketplace")
 
     if not product_name:
         return {"error": "product_name is required"}
@@ -76,7 +80,9 @@ async def scrape_marketplace_listings(db: AsyncSession, args: Dict[str, Any]) ->
         product_name=product_name,
         product_id=product_id,
         marketplaces=marketplaces,
-        country=country
+        country=country,
+        max_total=max_total,
+        prefer_marketplace=prefer_marketplace
     )
 
     return result
@@ -26,6 +26,8 @@ from app.functions.registry import register_function
 from app.core.config import settings
 from app.core.logging import get_logger, log_success, log_detail, log_fail, log_warn
 from app.core.circuit_breaker import gemini_breaker
+from app.core.http import get_http_client
+from app.core.llm import get_genai_client
 from app.services.cache_service import cache
 from app.models.product import Product
 from app.models.reviewer import Reviewer, Platform
@@ -35,8 +37,12 @@ from app.services.embedding_service import embedding_service
 
 logger = get_logger(__name__)
 
-# Firecrawl search API
+# Outermost {...} in a model response that may wrap its JSON in prose
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.S)
+
+# Firecrawl search and scrape APIs
 FIRECRAWL_SEARCH_URL = "https://api.firecrawl.dev/v2/search"
+FIRECRAWL_SCRAPE_URL = "https://api.firecrawl.dev/v2/scrape"
 
 
 def _is_gemini_available() -> bool:
@@ -46,10 +52,9 @@ def _is_gemini_available() -> bool:
 
 def _get_gemini_client():
     """Get Gemini client instance (required for Google Search grounding features)."""
-    from google import genai
     if not settings.GEMINI_API_KEY:
         raise RuntimeError("GEMINI_API_KEY not configured — Google Search grounding requires Gemini")
-    return genai.Client(api_key=settings.GEMINI_API_KEY)
+    return get_genai_client()
 
 
 async def _llm_generate_text(prompt: str, timeout: int = 90, temperature: float = 0.3) -> str:
@@ -65,24 +70,29 @@ async def _llm_generate_text(prompt: str, timeout: int = 90, temperature: float
     return provider.extract_text(response)
 
 
-async def _scrape_url_with_firecrawl(url: str) -> Optional[str]:
+async def _scrape_url_with_firecrawl(url: str, timeout: int = 60) -> Optional[str]:
     """Scrape a URL with Firecrawl and return markdown content.
 
-    Uses asyncio.to_thread to avoid blocking the event loop — Firecrawl's
-    scrape() is synchronous and can take 10-30 seconds.
+    Calls the scrape API on the shared HTTP client (like _firecrawl_search), so
+    every scrape in a pipeline run reuses the same pooled connections instead
+    of the SDK's one-off requests in a worker thread.
     """
     if not settings.FIRECRAWL_API_KEY:
         return None
+    headers = {
+        "Authorization": f"Bearer {settings.FIRECRAWL_API_KEY}",
+        "Content-Type": "application/json"
+    }
     try:
-        from firecrawl import FirecrawlApp
-        firecrawl = FirecrawlApp(api_key=settings.FIRECRAWL_API_KEY)
-        scrape_result = await asyncio.to_thread(
-            lambda: firecrawl.scrape(url, formats=['markdown'])
+        resp = await get_http_client().post(
+            FIRECRAWL_SCRAPE_URL,
+            json={"url": url, "formats": ["markdown"]},
+            headers=headers,
+            timeout=timeout
         )
-        if hasattr(scrape_result, 'markdown'):
-            return scrape_result.markdown
-        elif isinstance(scrape_result, dict):
-            return scrape_result.get("markdown", "")
+        resp.raise_for_status()
+        data = resp.json().get("data") or {}
+        return data.get("markdown", "")
     except Exception as e:
         logger.warning(f"Firecrawl scrape failed for {url}: {e}")
     return None
@@ -248,10 +258,12 @@ async def _firecrawl_search(query: str, limit: int = 5, timeout: int = 30) -> Li
     }
 
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            resp = await client.post(FIRECRAWL_SEARCH_URL, json=payload, headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
+        client = get_http_client()
+        resp = await client.post(
+            FIRECRAWL_SEARCH_URL, json=payload, headers=headers, timeout=timeout
+        )
+        resp.raise_for_status()
+        data = resp.json()
 
         # Firecrawl v2 returns data in two possible formats:
         # Format A: {"data": [{"url": ..., "title": ...}, ...]}  — flat array
@@ -283,6 +295,19 @@ async def _firecrawl_search(query: str, limit: int = 5, timeout: int = 30) -> Li
         return []
 
 
+def _summary_cache_key(product: str) -> str:
+    """Cache key for get_reviews_summary, by product name or ID."""
+    return cache.hash_key("summary", product)
+
+
+async def _invalidate_summary_cache(product_name: str, product_id: int) -> None:
+    """Drop cached summaries for a product after a review is added to it."""
+    await asyncio.gather(
+        cache.delete(_summary_cache_key(product_name)),
+        cache.delete(_summary_cache_key(str(product_id))),
+    )
+
+
 # =============================================================================
 # Tool 1: Check Product Cache
 # =============================================================================
@@ -618,7 +643,7 @@ Return as JSON:
             if response_text.endswith("```"):
                 response_text = response_text[:-3]
 
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
+            json_match = _JSON_OBJECT_RE.search(response_text)
             if json_match:
                 data = json.loads(json_match.group())
             else:
@@ -698,6 +723,8 @@ Return as JSON:
             content=full_content,
             source_url=video_url,
         )
+        # The product's cached summary no longer covers all its reviews
+        await _invalidate_summary_cache(product_name, product.id)
 
         log_detail(logger, f"Ingested: \"{data.get('video_title', '?')}\" by {channel_name}")
 
@@ -927,7 +954,7 @@ This is a review of "{product_name}".
             if response_text.endswith("```"):
                 response_text = response_text[:-3]
 
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
+            json_match = _JSON_OBJECT_RE.search(response_text)
             if json_match:
                 data = json.loads(json_match.group())
             else:
@@ -1007,6 +1034,8 @@ This is a review of "{product_name}".
             content=full_content,
             source_url=url,
         )
+        # The product's cached summary no longer covers all its reviews
+        await _invalidate_summary_cache(product_name, product.id)
 
         log_detail(logger, f"Ingested: \"{data.get('article_title', '?')}\" from {publication_name}")
 
@@ -1144,7 +1173,7 @@ async def get_reviews_summary(db: AsyncSession, args: Dict[str, Any]) -> Dict[st
     logger.debug(f"Summary generation: {product_name or product_id}")
 
     # Check Redis cache for summary
-    summary_cache_key = cache.hash_key("summary", product_name or str(product_id))
+    summary_cache_key = _summary_cache_key(product_name or str(product_id))
     cached_summary = await cache.get(summary_cache_key)
     if cached_summary is not None:
         logger.debug(f"Summary cache hit for: {product_name or product_id}")
@@ -1253,7 +1282,7 @@ Return as JSON:
             if response_text.endswith("```"):
                 response_text = response_text[:-3]
 
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
+            json_match = _JSON_OBJECT_RE.search(response_text)
             if json_match:
                 data = json.loads(json_match.group())
             else:
@@ -1,12 +1,10 @@
 """Search functions for Gemini function calling."""
 
-import asyncio
 from typing import Dict, Any, List
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.functions.registry import register_function
 from app.core.logging import get_logger
-from app.core.config import settings
 
 logger = get_logger(__name__)
 
@@ -47,7 +45,6 @@ async def _vector_search(query: str, limit: int) -> Dict[str, Any]:
     Perform vector similarity search using Qdrant.
     """
     try:
-        from qdrant_client import QdrantClient
         from app.services.embedding_service import embedding_service
 
         # Generate embedding for query using the configured provider
@@ -55,20 +52,8 @@ async def _vector_search(query: str, limit: int) -> Dict[str, Any]:
         if not query_vector:
             raise RuntimeError("Embedding service not available")
 
-        # Connect to Qdrant
-        client = QdrantClient(
-            host=settings.QDRANT_HOST,
-            port=settings.QDRANT_PORT
-        )
-
-        # Search (wrap synchronous call)
-        search_results = await asyncio.to_thread(
-            client.search,
-            collection_name=settings.QDRANT_COLLECTION,
-            query_vector=query_vector,
-            limit=limit,
-            with_payload=True
-        )
+        # Search with the embedding service's pooled Qdrant client
+        search_results = await embedding_service.search(query_vector, limit)
 
         if not search_results:
             return {
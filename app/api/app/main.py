@@ -10,6 +10,7 @@ from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
+from app.core.http import close_http_client
 from app.core.logging import get_logger, setup_logging
 from app.core.rate_limit import limiter
 from app.api.v1.router import api_router
@@ -17,6 +18,7 @@ from app.db.session import engine
 from app.db.base import Base
 from app.services.cache_service import cache
 from app.services.embedding_service import embedding_service
+from app.services.llm_service import warmup_llm_provider
 
 logger = get_logger(__name__)
 
@@ -41,11 +43,17 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     # Initialize embedding service (Qdrant + Gemini embeddings)
     await embedding_service.initialize()
 
+    # Prime the LLM HTTP connection pool so the first chat skips the TLS handshake
+    if settings.LLM_WARMUP_ON_STARTUP:
+        await warmup_llm_provider()
+
     yield
 
     # Shutdown
     logger.info("Shutting down...")
+    await embedding_service.close()
     await cache.disconnect()
+    await close_http_client()
     await engine.dispose()
 
 
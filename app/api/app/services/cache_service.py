@@ -2,9 +2,12 @@
 
 import hashlib
 import json
-from typing import Any, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
 
 from app.core.config import settings
+from app.core.llm_cache import llm_cache
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -49,6 +52,11 @@ class CacheService:
             finally:
                 self._redis = None
 
+    @property
+    def available(self) -> bool:
+        """True while connected to Redis."""
+        return self._redis is not None
+
     async def get(self, key: str) -> Optional[Any]:
         """Get a value from cache. Returns None on miss or error."""
         if not self._redis:
@@ -88,5 +96,49 @@ class CacheService:
         return f"{prefix}:{digest}"
 
 
+class LRUCache:
+    """Small bounded in-process cache with least-recently-used eviction.
+
+    With a ttl (seconds), entries also expire that long after being set.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[Optional[float], Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value (marking it recently used), or None."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
 # Module-level singleton
 cache = CacheService()
+
+# Shared second tier for LLM responses, attached here so app.core does not
+# import the services layer
+llm_cache.backend = cache
@@ -1,6 +1,7 @@
 """Chat service with multi-provider LLM function calling integration."""
 
 import json
+import logging
 import time
 from typing import Optional, List, Dict, Any, Callable, Awaitable
 from uuid import UUID
@@ -46,6 +47,37 @@ FUNCTION_LABELS = {
     "semantic_search": "Searching knowledge base",
 }
 
+# Result fields reported in the per-function success log line
+_SUMMARY_KEYS = ("total_reviews", "urls", "videos", "articles", "amazon", "ebay", "reviews")
+
+
+def _short_arg(value: Any, limit: int = 40) -> str:
+    """Render a function argument for logging without serializing large values."""
+    if isinstance(value, str):
+        return repr(value[:limit])
+    if value is None or isinstance(value, (bool, int, float)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return f"[{len(value)} items]"
+    if isinstance(value, dict):
+        return f"{{{len(value)} keys}}"
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def _summarize_result(result: Dict[str, Any]) -> List[str]:
+    """Build the short "3 urls, total_reviews=5" summary for a function result."""
+    parts = []
+    for key, val in zip(_SUMMARY_KEYS, map(result.get, _SUMMARY_KEYS)):
+        if not val:
+            continue
+        if isinstance(val, list):
+            parts.append(f"{len(val)} {key}")
+        elif isinstance(val, (int, float)):
+            parts.append(f"{key}={val}")
+    return parts
+
+
 # System prompt for ShopLens AI
 SYSTEM_PROMPT = """You are ShopLens, an AI assistant that helps users make informed purchasing decisions by aggregating and analyzing product reviews from trusted tech reviewers on YouTube and tech blogs.
 
@@ -147,6 +179,12 @@ class ChatService:
             logger.error(f"Failed to initialize LLM provider: {e}", exc_info=True)
             self.provider = None
 
+    async def _generate(self, contents: List[Any], config: Any) -> Any:
+        """Call the provider, streaming so tool calls are dispatched as soon as they arrive."""
+        if settings.LLM_STREAM_TOOL_CALLS and self.provider.supports_streaming:
+            return await self.provider.generate_streamed(contents, config)
+        return await self.provider.generate(contents, config)
+
     async def process_message(
         self,
         request: ChatRequest,
@@ -259,7 +297,7 @@ class ChatService:
 
             # Initial request
             try:
-                response = await self.provider.generate(contents, config)
+                response = await self._generate(contents, config)
                 gemini_breaker.record_success()
             except Exception:
                 gemini_breaker.record_failure()
@@ -274,17 +312,17 @@ class ChatService:
                 if not fc:
                     break
 
-                function_name = fc["name"]
-                function_args = fc["args"]
+                function_name, function_args = fc
                 functions_called.append(function_name)
                 fn_step += 1
                 fn_start = time.time()
 
-                # Pretty-print args
-                short_args = ", ".join(
-                    f"{k}={repr(v)[:40]}" for k, v in function_args.items()
-                )
-                logger.info(f"{BOLD}{CYAN}[fn {fn_step}]{RESET} {function_name}({short_args})")
+                # Pretty-print args (skip building the string when INFO is off)
+                if logger.isEnabledFor(logging.INFO):
+                    short_args = ", ".join(
+                        f"{k}={_short_arg(v)}" for k, v in function_args.items()
+                    )
+                    logger.info(f"{BOLD}{CYAN}[fn {fn_step}]{RESET} {function_name}({short_args})")
 
                 # Emit progress: function starting
                 if on_progress:
@@ -309,13 +347,7 @@ class ChatService:
                 if err:
                     logger.info(f"  {YELLOW}⚠{RESET} {err} {fn_elapsed}")
                 elif result_status in ("success", "found"):
-                    summary_parts = []
-                    for key in ("total_reviews", "urls", "videos", "articles", "amazon", "ebay", "reviews"):
-                        val = function_result.get(key)
-                        if isinstance(val, list) and val:
-                            summary_parts.append(f"{len(val)} {key}")
-                        elif isinstance(val, (int, float)) and val:
-                            summary_parts.append(f"{key}={val}")
+                    summary_parts = _summarize_result(function_result)
                     detail = ", ".join(summary_parts) if summary_parts else result_status
                     logger.info(f"  {GREEN}✓{RESET} {detail} {fn_elapsed}")
                 else:
@@ -345,7 +377,7 @@ class ChatService:
 
                 # Send updated contents back to model
                 try:
-                    response = await self.provider.generate(contents, config)
+                    response = await self._generate(contents, config)
                     gemini_breaker.record_success()
                 except Exception:
                     gemini_breaker.record_failure()
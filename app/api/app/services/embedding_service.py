@@ -1,19 +1,100 @@
 """Embedding service for storing review content in Qdrant vector database."""
 
 import asyncio
-from typing import Optional
+import hashlib
+import random
+from array import array
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import httpx
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.services.cache_service import LRUCache
 
 logger = get_logger(__name__)
 
+# Provider SDKs are optional: without them the service degrades to disabled.
+try:
+    from qdrant_client import AsyncQdrantClient
+    from qdrant_client.models import (
+        BinaryQuantization,
+        BinaryQuantizationConfig,
+        Datatype,
+        Distance,
+        PointStruct,
+        QuantizationSearchParams,
+        ScalarQuantization,
+        ScalarQuantizationConfig,
+        ScalarType,
+        SearchParams,
+        VectorParams,
+    )
+except ImportError:
+    AsyncQdrantClient = None
+
+try:
+    from openai import OpenAI, RateLimitError
+except ImportError:
+    OpenAI = None
+    RateLimitError = None
+
+try:
+    import google.generativeai as genai
+except ImportError:
+    genai = None
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 # Vector dimensions per provider
 _VECTOR_DIMS = {
     "gemini": 768,   # text-embedding-004
     "openai": 1536,  # text-embedding-3-small
 }
 
+# Max texts sent to the embedding API in a single request
+_EMBED_BATCH_SIZE = 64
+# Max total characters per request (keeps batches under provider token limits)
+_EMBED_BATCH_CHARS = 200_000
+
+# Attempts per embedding request when the provider rate-limits us (HTTP 429)
+_EMBED_MAX_ATTEMPTS = 5
+# Exponential backoff bounds for those retries, in seconds
+_EMBED_BACKOFF_BASE = 1.0
+_EMBED_BACKOFF_MAX = 30.0
+
+# Input token limit of each provider's embedding model
+_MAX_EMBED_TOKENS = {
+    "gemini": 2048,  # text-embedding-004
+    "openai": 8191,  # text-embedding-3-small
+}
+# Character budget used when no tokenizer is available (~4 chars/token for
+# Gemini; a conservative 3 for OpenAI so multi-byte text stays under the limit)
+_MAX_EMBED_CHARS = {
+    "gemini": 2048 * 4,
+    "openai": 8191 * 3,
+}
+
+
+def _quantization_config(mode: str):
+    """Map the QDRANT_QUANTIZATION setting to a Qdrant quantization config.
+
+    "scalar" stores int8 vectors in RAM (4x smaller), "binary" stores 1 bit
+    per dimension (32x smaller, best for high-dim OpenAI vectors). Anything
+    else disables quantization.
+    """
+    mode = mode.lower()
+    if mode == "scalar":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+        )
+    if mode == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
 
 class EmbeddingService:
     """
@@ -31,6 +112,24 @@ class EmbeddingService:
         self._openai_client = None
         self._embedding_model: Optional[str] = None
         self._vector_size: int = 768
+        self._tokenizer = None
+
+        # Exact-match cache of recent vectors, keyed by content hash
+        self._vector_cache = LRUCache(maxsize=settings.EMBEDDING_CACHE_SIZE)
+        # Digests of (review_id, vector) pairs already sent to Qdrant
+        self._stored_digests = LRUCache(maxsize=settings.EMBEDDING_CACHE_SIZE)
+
+        # Caps in-flight provider requests so bursts stay under the provider's QPM
+        self._embed_semaphore = asyncio.Semaphore(settings.EMBEDDING_CONCURRENCY)
+
+        # Micro-batching state for generate_embedding
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+        # Background Qdrant writer (started by initialize())
+        self._upsert_queue: Optional[asyncio.Queue] = None
+        self._upsert_task: Optional[asyncio.Task] = None
 
     async def initialize(self) -> None:
         """Connect to Qdrant and initialize the embedding provider."""
@@ -39,13 +138,23 @@ class EmbeddingService:
             provider = settings.LLM_PROVIDER.lower()
 
             if provider == "openai" and settings.OPENAI_API_KEY:
-                from openai import OpenAI
-                self._openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+                if OpenAI is None:
+                    raise ImportError("openai is not installed")
+                # Pooled keep-alive connections: embedding calls skip the TLS handshake
+                self._openai_client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    http_client=httpx.Client(
+                        http2=True,
+                        limits=httpx.Limits(max_keepalive_connections=32),
+                    ),
+                )
                 self._embedding_model = settings.OPENAI_EMBEDDING_MODEL
                 self._vector_size = _VECTOR_DIMS.get("openai", 1536)
                 self._provider = "openai"
+                self._tokenizer = await asyncio.to_thread(self._load_tokenizer, self._embedding_model)
             elif settings.GEMINI_API_KEY:
-                import google.generativeai as genai
+                if genai is None:
+                    raise ImportError("google-generativeai is not installed")
                 genai.configure(api_key=settings.GEMINI_API_KEY)
                 self._genai = genai
                 self._embedding_model = settings.EMBEDDING_MODEL
@@ -56,35 +165,44 @@ class EmbeddingService:
                 return
 
             # Connect to Qdrant
-            from qdrant_client import QdrantClient
-            from qdrant_client.models import Distance, VectorParams
+            if AsyncQdrantClient is None:
+                raise ImportError("qdrant-client is not installed")
 
-            self._qdrant = QdrantClient(
+            # Native async gRPC client: no thread-pool hop per call
+            self._qdrant = AsyncQdrantClient(
                 host=settings.QDRANT_HOST,
                 port=settings.QDRANT_PORT,
+                grpc_port=settings.QDRANT_GRPC_PORT,
+                prefer_grpc=True,
                 timeout=10,
             )
 
             # Ensure collection exists
-            collections = await asyncio.to_thread(
-                self._qdrant.get_collections
-            )
+            collections = await self._qdrant.get_collections()
             collection_names = [c.name for c in collections.collections]
 
             if settings.QDRANT_COLLECTION not in collection_names:
-                await asyncio.to_thread(
-                    self._qdrant.create_collection,
+                quantization = _quantization_config(settings.QDRANT_QUANTIZATION)
+                await self._qdrant.create_collection(
                     collection_name=settings.QDRANT_COLLECTION,
                     vectors_config=VectorParams(
                         size=self._vector_size,
                         distance=Distance.COSINE,
+                        # Half-precision storage: 2 bytes/dim, negligible recall loss
+                        datatype=Datatype.FLOAT16,
+                        # Original vectors only needed for rescoring
+                        on_disk=quantization is not None,
                     ),
+                    quantization_config=quantization,
                 )
                 logger.info(
                     f"Created Qdrant collection: {settings.QDRANT_COLLECTION} "
-                    f"(dims={self._vector_size})"
+                    f"(dims={self._vector_size}, quantization={settings.QDRANT_QUANTIZATION})"
                 )
 
+            self._upsert_queue = asyncio.Queue()
+            self._upsert_task = asyncio.create_task(self._upsert_worker())
+
             logger.info(
                 f"Embedding service initialized "
                 f"({self._provider} / {self._embedding_model}, Qdrant)"
@@ -95,36 +213,279 @@ class EmbeddingService:
             self._qdrant = None
             self._provider = None
 
+    async def close(self, timeout: float = 5.0) -> None:
+        """Flush pending embeddings and queued Qdrant upserts, then disconnect."""
+        # Send the open micro-batch now instead of on the timer, then give
+        # in-flight batches until the timeout before cancelling them
+        self._flush_pending()
+        if self._flush_tasks:
+            _, unfinished = await asyncio.wait(set(self._flush_tasks), timeout=timeout)
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+        if self._upsert_task is not None:
+            try:
+                await asyncio.wait_for(self._upsert_queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Dropping {self._upsert_queue.qsize()} queued embedding(s) on shutdown"
+                )
+            self._upsert_task.cancel()
+            self._upsert_task = None
+            self._upsert_queue = None
+        if self._qdrant is not None:
+            await self._qdrant.close()
+            self._qdrant = None
+        if self._openai_client is not None:
+            # Also closes the pooled httpx.Client it was created with
+            self._openai_client.close()
+            self._openai_client = None
+
+    async def _upsert_worker(self) -> None:
+        """Drain queued (point, digest) pairs into batched Qdrant upserts.
+
+        A batch is written when it reaches QDRANT_UPSERT_BATCH points or
+        QDRANT_FLUSH_INTERVAL_MS after its first point, whichever is first.
+        """
+        queue = self._upsert_queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + settings.QDRANT_FLUSH_INTERVAL_MS / 1000
+            while len(batch) < settings.QDRANT_UPSERT_BATCH:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._upsert_points([point for point, _ in batch], wait=False)
+            except Exception as e:
+                logger.warning(f"Failed to upsert {len(batch)} embedding(s): {e}")
+            else:
+                # Only written points are skipped on a later identical store
+                for _, digest in batch:
+                    self._stored_digests.set(digest, True)
+                logger.debug(f"Flushed {len(batch)} review embedding(s) to Qdrant")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _upsert_points(self, points: list, wait: bool = True) -> None:
+        await self._qdrant.upsert(
+            collection_name=settings.QDRANT_COLLECTION,
+            points=points,
+            wait=wait,
+        )
+
     @property
     def is_available(self) -> bool:
         return self._provider is not None
 
+    async def search(self, query_vector: list, limit: int) -> list:
+        """Find the reviews closest to query_vector using the shared Qdrant client."""
+        if not self._qdrant:
+            raise RuntimeError("Qdrant not available")
+
+        return await self._qdrant.search(
+            collection_name=settings.QDRANT_COLLECTION,
+            query_vector=query_vector,
+            limit=limit,
+            with_payload=True,
+            # Search quantized vectors, then rescore the top hits at full precision
+            search_params=SearchParams(
+                quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+            ),
+        )
+
     async def generate_embedding(self, text: str) -> Optional[list]:
-        """Generate an embedding vector for the given text."""
+        """Generate an embedding vector for the given text.
+
+        Concurrent calls are coalesced: texts arriving within
+        EMBEDDING_BATCH_WINDOW_MS of each other (up to EMBEDDING_BATCH_MAX)
+        share a single batched provider request.
+        """
         if not self._provider:
             return None
-        try:
-            truncated = text[:8000] if len(text) > 8000 else text
 
-            if self._provider == "openai":
-                result = await asyncio.to_thread(
-                    self._openai_client.embeddings.create,
-                    model=self._embedding_model,
-                    input=truncated,
-                )
-                return result.data[0].embedding
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
 
-            else:  # gemini
-                result = await asyncio.to_thread(
-                    self._genai.embed_content,
-                    model=self._embedding_model,
-                    content=truncated,
-                )
-                return result["embedding"]
+        if len(self._pending) >= settings.EMBEDDING_BATCH_MAX:
+            self._flush_pending()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                settings.EMBEDDING_BATCH_WINDOW_MS / 1000, self._flush_pending
+            )
+
+        return await future
 
+    def _flush_pending(self) -> None:
+        """Dispatch all queued generate_embedding texts as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        task = asyncio.get_running_loop().create_task(self._resolve_pending(pending))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _resolve_pending(self, pending: List[Tuple[str, asyncio.Future]]) -> None:
+        vectors: List[Optional[list]] = [None] * len(pending)
+        try:
+            vectors = await self.generate_embeddings([text for text, _ in pending])
         except Exception as e:
             logger.debug(f"Embedding generation failed: {e}")
+        finally:
+            # Also on cancellation, so no generate_embedding caller waits forever
+            for (_, future), vector in zip(pending, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+    async def generate_embeddings(self, texts: List[str]) -> List[Optional[list]]:
+        """Generate embedding vectors for several texts.
+
+        Previously embedded texts are served from an in-process cache; the
+        rest are sent in batches of up to _EMBED_BATCH_SIZE texts and
+        _EMBED_BATCH_CHARS characters per API call.
+        Returns one entry per input text; entries are None if their batch failed.
+        """
+        if not self._provider or not texts:
+            return [None] * len(texts)
+
+        truncated = [self._truncate(text) for text in texts]
+        keys = [self._vector_cache_key(text) for text in truncated]
+        vectors: List[Optional[list]] = [self._vector_cache.get(key) for key in keys]
+
+        # Embed each distinct uncached text once
+        missing: Dict[bytes, str] = {}
+        for key, text, vector in zip(keys, truncated, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+        if not missing:
+            return vectors
+
+        fresh: Dict[bytes, Optional[list]] = {}
+        miss_keys = list(missing)
+        offset = 0
+        for batch in self._split_batches(list(missing.values())):
+            batch_keys = miss_keys[offset:offset + len(batch)]
+            offset += len(batch)
+            try:
+                batch_vectors = await self._embed_batch(batch)
+            except Exception as e:
+                logger.warning(f"Batch embedding generation failed ({len(batch)} texts): {e}")
+                continue
+            for key, vector in zip(batch_keys, batch_vectors):
+                fresh[key] = vector
+                self._vector_cache.set(key, vector)
+
+        return [vector if vector is not None else fresh.get(key) for key, vector in zip(keys, vectors)]
+
+    @staticmethod
+    def _load_tokenizer(model: str):
+        """Load the tiktoken encoding for model, or None to fall back to characters."""
+        if tiktoken is None:
             return None
+        try:
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning(f"tiktoken unavailable, truncating embeddings by characters: {e}")
+            return None
+
+    def _truncate(self, text: str) -> str:
+        """Cut text to the embedding model's input limit."""
+        if self._tokenizer is None:
+            return text[:_MAX_EMBED_CHARS[self._provider]]
+        max_tokens = _MAX_EMBED_TOKENS[self._provider]
+        # A token covers at least one UTF-8 byte, so short texts can't exceed the limit
+        if len(text) * 4 <= max_tokens:
+            return text
+        tokens = self._tokenizer.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self._tokenizer.decode(tokens[:max_tokens])
+
+    def _vector_cache_key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self._embedding_model}\0{text}".encode()).digest()
+
+    @staticmethod
+    def _split_batches(texts: List[str]) -> List[List[str]]:
+        """Split texts into request-sized batches, preserving order."""
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        batch_chars = 0
+        for text in texts:
+            if batch and (
+                len(batch) >= _EMBED_BATCH_SIZE
+                or batch_chars + len(text) > _EMBED_BATCH_CHARS
+            ):
+                batches.append(batch)
+                batch, batch_chars = [], 0
+            batch.append(text)
+            batch_chars += len(text)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _embed_batch(self, batch: List[str]) -> List[list]:
+        """Embed a list of (already truncated) texts in one provider call.
+
+        Rate-limited calls are retried with jittered exponential backoff.
+        """
+        async with self._embed_semaphore:
+            for attempt in range(1, _EMBED_MAX_ATTEMPTS + 1):
+                try:
+                    return await self._request_embeddings(batch)
+                except Exception as e:
+                    if attempt == _EMBED_MAX_ATTEMPTS or not self._is_rate_limited(e):
+                        raise
+                    delay = min(_EMBED_BACKOFF_MAX, _EMBED_BACKOFF_BASE * 2 ** (attempt - 1))
+                    delay *= random.uniform(0.5, 1.0)
+                    logger.warning(
+                        f"Embedding request rate-limited (attempt {attempt}/{_EMBED_MAX_ATTEMPTS}), "
+                        f"retrying in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+
+    async def _request_embeddings(self, batch: List[str]) -> List[list]:
+        if self._provider == "openai":
+            result = await asyncio.to_thread(
+                self._openai_client.embeddings.create,
+                model=self._embedding_model,
+                input=batch,
+            )
+            return [item.embedding for item in result.data]
+
+        # gemini — embed_content accepts a list and returns a list of vectors
+        result = await asyncio.to_thread(
+            self._genai.embed_content,
+            model=self._embedding_model,
+            content=batch,
+        )
+        return result["embedding"]
+
+    @staticmethod
+    def _is_rate_limited(error: Exception) -> bool:
+        """True for OpenAI RateLimitError and Google ResourceExhausted (429)."""
+        if RateLimitError is not None and isinstance(error, RateLimitError):
+            return True
+        return getattr(error, "code", None) == 429
+
+    @staticmethod
+    def _point_digest(review_id: int, vector: list) -> bytes:
+        digest = hashlib.blake2b(array("f", vector).tobytes(), digest_size=16)
+        digest.update(str(review_id).encode())
+        return digest.digest()
 
     async def store_review_embedding(
         self,
@@ -137,43 +498,80 @@ class EmbeddingService:
     ) -> bool:
         """Generate embedding for review content and store in Qdrant.
 
-        Returns True if stored successfully, False otherwise.
+        Returns True if the point was written, or queued for the background
+        writer (whose failures are logged, not reported here); False otherwise.
         """
-        if not self._qdrant or not self._provider:
-            return False
+        stored = await self.store_review_embeddings([{
+            "review_id": review_id,
+            "product_id": product_id,
+            "product_name": product_name,
+            "reviewer_name": reviewer_name,
+            "content": content,
+            "source_url": source_url,
+        }])
+        return stored == 1
+
+    async def store_review_embeddings(self, rows: List[Dict[str, Any]]) -> int:
+        """Embed several reviews with batched API calls and store them in Qdrant.
+
+        Once initialize() has started the background writer, points are queued
+        and upserted in batches; otherwise they are written with one upsert.
+        Each row needs the keys accepted by store_review_embedding.
+        Returns the number of reviews written, or queued for the background writer.
+        """
+        if not self._qdrant or not self._provider or not rows:
+            return 0
 
         try:
-            vector = await self.generate_embedding(content)
-            if not vector:
-                return False
-
-            from qdrant_client.models import PointStruct
-
-            point = PointStruct(
-                id=review_id,
-                vector=vector,
-                payload={
-                    "review_id": review_id,
-                    "product_id": product_id,
-                    "product_name": product_name,
-                    "reviewer_name": reviewer_name,
-                    "content": content[:2000],  # Store truncated content in payload
-                    "source_url": source_url,
-                },
-            )
+            if len(rows) == 1:
+                # Single rows go through the coalescing path so concurrent
+                # ingestions still share provider requests
+                vectors = [await self.generate_embedding(rows[0]["content"])]
+            else:
+                vectors = await self.generate_embeddings([row["content"] for row in rows])
 
-            await asyncio.to_thread(
-                self._qdrant.upsert,
-                collection_name=settings.QDRANT_COLLECTION,
-                points=[point],
-            )
+            points = []
+            digests = []
+            for row, vector in zip(rows, vectors):
+                # All-zero vectors come back for blocked content and can't be searched
+                if not vector or not any(vector):
+                    continue
+                digest = self._point_digest(row["review_id"], vector)
+                if self._stored_digests.get(digest):
+                    continue  # identical point already written
+                digests.append(digest)
+                points.append(PointStruct(
+                    id=row["review_id"],
+                    vector=vector,
+                    payload={
+                        "review_id": row["review_id"],
+                        "product_id": row["product_id"],
+                        "product_name": row["product_name"],
+                        "reviewer_name": row["reviewer_name"],
+                        "content": row["content"][:2000],  # Store truncated content in payload
+                        "source_url": row["source_url"],
+                    },
+                ))
+            if not points:
+                return 0
 
-            logger.debug(f"Stored embedding for review {review_id} ({product_name})")
-            return True
+            if self._upsert_queue is not None:
+                # Background writer batches points across concurrent ingestions
+                # and records their digests once the upsert succeeds
+                for point, digest in zip(points, digests):
+                    self._upsert_queue.put_nowait((point, digest))
+                logger.debug(f"Queued {len(points)} review embedding(s)")
+            else:
+                await self._upsert_points(points)
+                for digest in digests:
+                    self._stored_digests.set(digest, True)
+                logger.debug(f"Stored {len(points)} review embedding(s)")
+            return len(points)
 
         except Exception as e:
-            logger.debug(f"Failed to store embedding for review {review_id}: {e}")
-            return False
+            review_ids = [row.get("review_id") for row in rows]
+            logger.debug(f"Failed to store embeddings for reviews {review_ids}: {e}")
+            return 0
 
 
 # Module-level singleton
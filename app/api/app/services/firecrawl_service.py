@@ -1,61 +1,100 @@
 """Firecrawl service for scraping tech blog reviews."""
 
-import json
-from typing import Dict, Any, Optional, List
+import asyncio
+import re
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.exc import IntegrityError
+import orjson
 from firecrawl import FirecrawlApp
+from pydantic import BaseModel, Field
 
 from app.core.config import settings
+from app.core.llm import get_genai_client
 from app.core.logging import get_logger
 from app.models.reviewer import Reviewer, Platform
 from app.models.review import Review, ReviewType, ProcessingStatus
 from app.models.opinion import Opinion
 from app.models.product import Product
+from app.services.cache_service import LRUCache, cache
 
 logger = get_logger(__name__)
 
-# Gemini prompt for extracting structured review data from blog content
+
+class ExtractedOpinion(BaseModel):
+    """A single aspect-level opinion extracted from a blog review."""
+
+    aspect: str = Field(description="The aspect being discussed (e.g., camera, battery, display, performance, build_quality, software, value)")
+    sentiment: float = Field(description="A number from -1.0 (very negative) to 1.0 (very positive)")
+    confidence: float = Field(description="A number from 0.0 to 1.0 indicating how clear the opinion was")
+    quote: Optional[str] = Field(None, description="A short direct quote from the review that supports this opinion")
+    summary: Optional[str] = Field(None, description="A one-sentence summary of the opinion")
+
+
+class ExtractedReview(BaseModel):
+    """Response schema for Gemini blog review extraction."""
+
+    product_name: Optional[str] = Field(None, description="Full product name being reviewed (e.g., 'iPhone 15 Pro Max')")
+    product_brand: Optional[str] = Field(None, description="Brand name (e.g., 'Apple')")
+    product_category: Optional[str] = Field(None, description="Category: smartphones, laptops, headphones, tablets, smartwatches, cameras, monitors, keyboards, mice, or other")
+    reviewer_name: Optional[str] = Field(None, description="Name of the reviewer or publication")
+    reviewer_description: Optional[str] = Field(None, description="Brief description of the reviewer/publication if available")
+    review_title: Optional[str] = Field(None, description="Title of the review article")
+    overall_rating: Optional[float] = Field(None, description="A number from 0-10, only if explicitly stated")
+    summary: Optional[str] = Field(None, description="A 2-3 sentence summary of the overall verdict")
+    pros: List[str] = Field(default_factory=list, description="Positive points mentioned")
+    cons: List[str] = Field(default_factory=list, description="Negative points mentioned")
+    opinions: List[ExtractedOpinion] = Field(default_factory=list)
+
+
+# Normalized names for aspects extracted from blog reviews
+_ASPECT_MAP = {
+    "camera": "camera",
+    "battery": "battery",
+    "display": "display",
+    "screen": "display",
+    "performance": "performance",
+    "speed": "performance",
+    "build": "build_quality",
+    "build_quality": "build_quality",
+    "design": "build_quality",
+    "software": "software",
+    "value": "value",
+    "price": "value",
+    "sound": "audio",
+    "audio": "audio",
+    "speaker": "audio",
+}
+
+# Outermost JSON object in a model response (tolerates code fences and chatter)
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.S)
+
+
+def _parse_extraction(text: str) -> ExtractedReview:
+    """Parse a raw extraction response that bypassed the structured output."""
+    match = _JSON_OBJECT_RE.search(text)
+    if not match:
+        raise ValueError("No JSON object in response")
+    return ExtractedReview.model_validate(orjson.loads(match.group(0)))
+
+
+# Gemini prompt for extracting structured review data from blog content.
+# The output shape is enforced through ExtractedReview as the response schema.
 EXTRACTION_PROMPT = """You are an expert at extracting structured data from tech product reviews.
 
-Analyze the following blog post content and extract the review information in a structured JSON format.
+Analyze the following blog post content and extract the review information.
 
 IMPORTANT: Only extract information that is explicitly stated in the content. Do not make up or infer data.
 
-Return a JSON object with this structure:
-{
-    "product_name": "Full product name being reviewed (e.g., 'iPhone 15 Pro Max')",
-    "product_brand": "Brand name (e.g., 'Apple')",
-    "product_category": "Category: smartphones, laptops, headphones, tablets, smartwatches, cameras, monitors, keyboards, mice, or other",
-    "reviewer_name": "Name of the reviewer or publication",
-    "reviewer_description": "Brief description of the reviewer/publication if available",
-    "review_title": "Title of the review article",
-    "overall_rating": null or a number from 0-10 if explicitly stated,
-    "summary": "A 2-3 sentence summary of the overall verdict",
-    "pros": ["List of positive points mentioned"],
-    "cons": ["List of negative points mentioned"],
-    "opinions": [
-        {
-            "aspect": "The aspect being discussed (e.g., camera, battery, display, performance, build_quality, software, value)",
-            "sentiment": "A number from -1.0 (very negative) to 1.0 (very positive)",
-            "confidence": "A number from 0.0 to 1.0 indicating how clear the opinion was",
-            "quote": "A direct quote from the review that supports this opinion (keep it short)",
-            "summary": "A one-sentence summary of the opinion"
-        }
-    ]
-}
-
 If you cannot determine certain fields, use null for optional fields or empty arrays for lists.
 
 Blog post content:
 ---
 {content}
----
-
-Return ONLY the JSON object, no additional text."""
+---"""
 
 
 class FirecrawlService:
@@ -72,6 +111,10 @@ class FirecrawlService:
         """Initialize Firecrawl and Gemini clients."""
         self.firecrawl_client = None
         self.genai_client = None
+        # Caps concurrent Firecrawl requests across all callers of this service
+        self._scrape_semaphore = asyncio.Semaphore(settings.FIRECRAWL_MAX_CONCURRENCY)
+        # Normalized extracted product name -> Product.id from earlier lookups
+        self._product_ids = LRUCache(maxsize=2048)
         self._init_clients()
 
     def _init_clients(self):
@@ -89,8 +132,7 @@ class FirecrawlService:
         # Initialize Gemini client for extraction
         if settings.GEMINI_API_KEY:
             try:
-                from google import genai
-                self.genai_client = genai.Client(api_key=settings.GEMINI_API_KEY)
+                self.genai_client = get_genai_client()
                 logger.info("Gemini client initialized for extraction")
             except Exception as e:
                 logger.error(f"Failed to initialize Gemini client: {e}")
@@ -120,15 +162,25 @@ class FirecrawlService:
                 "Gemini client not initialized. Please set GEMINI_API_KEY."
             )
 
+        content, metadata = await self._scrape_content(url)
+        return await self._extract_review_data(url, content, metadata)
+
+    async def _scrape_content(self, url: str) -> Tuple[str, Dict[str, Any]]:
+        """Scrape a URL with Firecrawl and return its markdown and metadata."""
+        if not self.firecrawl_client:
+            raise RuntimeError(
+                "Firecrawl client not initialized. Please set FIRECRAWL_API_KEY."
+            )
+
         logger.info(f"Scraping blog review from: {url}")
 
-        # Step 1: Scrape the URL with Firecrawl
         try:
-            # Firecrawl SDK v4.x uses scrape() method, not scrape_url()
-            scrape_result = self.firecrawl_client.scrape(
-                url,
-                formats=['markdown']
-            )
+            # Firecrawl SDK v4.x uses scrape() method, not scrape_url(). It is
+            # synchronous, so run it in a thread to keep the event loop free.
+            async with self._scrape_semaphore:
+                scrape_result = await asyncio.to_thread(
+                    lambda: self.firecrawl_client.scrape(url, formats=['markdown'])
+                )
         except Exception as e:
             logger.error(f"Firecrawl scraping failed for {url}: {e}")
             raise RuntimeError(f"Failed to scrape URL: {str(e)}")
@@ -147,42 +199,56 @@ class FirecrawlService:
             raise RuntimeError("Firecrawl returned empty content")
 
         logger.info(f"Scraped {len(content)} characters from {url}")
+        return content, metadata
 
-        # Step 2: Extract structured data using Gemini
-        try:
-            from google.genai import types
-            extraction_prompt = EXTRACTION_PROMPT.format(content=content[:50000])  # Limit content size
-            response = await self.genai_client.aio.models.generate_content(
-                model=settings.LLM_MODEL,
-                contents=extraction_prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.1,  # Low temperature for extraction
-                    top_p=0.95,
-                    max_output_tokens=4096,
-                )
+    async def _extract_review_data(
+        self,
+        url: str,
+        content: str,
+        metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Extract structured review data from scraped content using Gemini."""
+        if not self.genai_client:
+            raise RuntimeError(
+                "Gemini client not initialized. Please set GEMINI_API_KEY."
             )
 
-            # Parse the JSON response
-            response_text = (response.text or "").strip()
-            if not response_text:
-                logger.warning(f"Empty response from Gemini for blog extraction: {url}")
-                raise RuntimeError("Empty response from Gemini for extraction")
-            # Remove markdown code blocks if present
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-
-            extracted_data = json.loads(response_text.strip())
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Gemini extraction response: {e}")
-            raise RuntimeError(f"Failed to extract structured data: Invalid JSON response")
-        except Exception as e:
-            logger.error(f"Gemini extraction failed: {e}")
-            raise RuntimeError(f"Failed to extract structured data: {str(e)}")
+        content = content[:50000]  # Limit content size
+        cache_key = cache.hash_key("blog_extract", f"{settings.LLM_MODEL}:{content}")
+        extracted_data = await cache.get(cache_key)
+
+        if extracted_data is None:
+            try:
+                from google.genai import types
+                response = await self.genai_client.aio.models.generate_content(
+                    model=settings.LLM_MODEL,
+                    contents=EXTRACTION_PROMPT.format(content=content),
+                    config=types.GenerateContentConfig(
+                        temperature=0.1,  # Low temperature for extraction
+                        top_p=0.95,
+                        max_output_tokens=4096,
+                        response_mime_type="application/json",
+                        response_schema=ExtractedReview,
+                    )
+                )
+
+                parsed = response.parsed
+                if parsed is None:
+                    if not response.text:
+                        logger.warning(f"Empty response from Gemini for blog extraction: {url}")
+                        raise RuntimeError("Empty response from Gemini for extraction")
+                    parsed = _parse_extraction(response.text)
+
+            except ValueError as e:
+                logger.error(f"Failed to parse Gemini extraction response: {e}")
+                raise RuntimeError("Failed to extract structured data: Invalid JSON response")
+            except Exception as e:
+                logger.error(f"Gemini extraction failed: {e}")
+                raise RuntimeError(f"Failed to extract structured data: {str(e)}")
+
+            # Omit unset fields so .get() defaults (reviewer_name, ...) still apply
+            extracted_data = parsed.model_dump(exclude_none=True)
+            await cache.set(cache_key, extracted_data, ttl=settings.CACHE_EXTRACTION_TTL)
 
         # Add source metadata
         extracted_data["source_url"] = url
@@ -205,8 +271,8 @@ class FirecrawlService:
         This method:
         1. Scrapes the blog URL
         2. Extracts structured data using Gemini
-        3. Creates/updates Reviewer if needed
-        4. Creates/finds Product if needed
+        3. Finds the Product (or stops if there is none)
+        4. Creates/updates Reviewer if needed
         5. Creates Review record
         6. Creates Opinion records
 
@@ -233,10 +299,90 @@ class FirecrawlService:
         # Scrape and extract data
         extracted_data = await self.scrape_blog_review(url)
 
-        # Step 1: Find or create reviewer
-        reviewer = await self._get_or_create_reviewer(db, extracted_data)
+        return await self._store_review(db, url, product_id, extracted_data)
 
-        # Step 2: Find or create product
+    async def ingest_many(
+        self,
+        db: AsyncSession,
+        urls: List[str],
+        product_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Ingest several blog reviews, overlapping the pipeline stages.
+
+        Firecrawl scrapes and Gemini extractions run concurrently (each stage
+        bounded by BLOG_INGEST_CONCURRENCY), while a single writer stores the
+        extracted reviews on the shared session as they complete. Scraping of
+        one URL therefore overlaps extraction and DB writes of others.
+
+        Args:
+            db: Database session
+            urls: Blog review URLs
+            product_id: Optional product ID if already known
+
+        Returns:
+            One result dictionary per input URL, in input order. Failures are
+            reported as {"status": "error", "message": ...} instead of raising.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        unique_urls = list(dict.fromkeys(urls))
+
+        # One round-trip for the whole batch (platform_url has a unique index)
+        if unique_urls:
+            existing = await db.execute(
+                select(Review.platform_url, Review.id)
+                .where(Review.platform_url.in_(unique_urls))
+            )
+            for url, review_id in existing:
+                results[url] = {
+                    "status": "already_exists",
+                    "review_id": review_id,
+                    "message": f"Review from this URL already exists (ID: {review_id})"
+                }
+        pending = [url for url in unique_urls if url not in results]
+
+        scrape_sem = asyncio.Semaphore(settings.BLOG_INGEST_CONCURRENCY)
+        extract_sem = asyncio.Semaphore(settings.BLOG_INGEST_CONCURRENCY)
+        extracted: asyncio.Queue = asyncio.Queue()
+
+        async def fetch(url: str) -> None:
+            try:
+                async with scrape_sem:
+                    content, metadata = await self._scrape_content(url)
+                async with extract_sem:
+                    data = await self._extract_review_data(url, content, metadata)
+                await extracted.put((url, data, None))
+            except Exception as e:
+                await extracted.put((url, None, e))
+
+        fetchers = [asyncio.create_task(fetch(url)) for url in pending]
+        try:
+            for _ in pending:
+                url, data, error = await extracted.get()
+                if error is None:
+                    try:
+                        results[url] = await self._store_review(db, url, product_id, data)
+                        continue
+                    except Exception as e:
+                        await db.rollback()
+                        error = e
+                logger.error(f"Failed to ingest blog review {url}: {error}")
+                results[url] = {"status": "error", "message": str(error)}
+        finally:
+            for task in fetchers:
+                task.cancel()
+
+        return [results[url] for url in urls]
+
+    async def _store_review(
+        self,
+        db: AsyncSession,
+        url: str,
+        product_id: Optional[int],
+        extracted_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Persist extracted review data (reviewer, product, review, opinions)."""
+        # Step 1: Find product (first, so a miss doesn't leave a new reviewer behind)
         product = await self._get_or_find_product(db, product_id, extracted_data)
         if not product:
             return {
@@ -244,6 +390,9 @@ class FirecrawlService:
                 "message": f"Could not find or create product: {extracted_data.get('product_name', 'Unknown')}. Please create the product first or provide a product_id."
             }
 
+        # Step 2: Find or create reviewer
+        reviewer = await self._get_or_create_reviewer(db, extracted_data)
+
         # Step 3: Create review (with duplicate handling for race conditions)
         try:
             review = await self._create_review(db, product, reviewer, extracted_data, url)
@@ -342,10 +491,9 @@ class FirecrawlService:
         """Get product by ID or try to find by name."""
         # If product_id provided, use it
         if product_id:
-            result = await db.execute(
-                select(Product).where(Product.id == product_id)
-            )
-            product = result.scalar_one_or_none()
+            # Session.get() is served from the identity map when the product
+            # was already loaded (e.g. earlier URLs in ingest_many)
+            product = await db.get(Product, product_id)
             if product:
                 return product
             logger.warning(f"Product ID {product_id} not found")
@@ -353,12 +501,20 @@ class FirecrawlService:
         # Try to find by name
         product_name = extracted_data.get("product_name")
         if product_name:
+            name_key = product_name.strip().lower()
+            cached_id = self._product_ids.get(name_key)
+            if cached_id is not None:
+                product = await db.get(Product, cached_id)
+                if product:
+                    return product
+
             result = await db.execute(
                 select(Product).where(Product.name.ilike(f"%{product_name}%"))
             )
             product = result.scalar_one_or_none()
             if product:
                 logger.info(f"Found existing product: {product.name} (ID: {product.id})")
+                self._product_ids.set(name_key, product.id)
                 return product
 
         # Product not found - we could create it, but better to require explicit product
@@ -431,69 +587,51 @@ class FirecrawlService:
         extracted_data: Dict[str, Any]
     ) -> int:
         """Create opinion records from extracted data."""
-        opinions = extracted_data.get("opinions", [])
-        created_count = 0
-
-        for opinion_data in opinions:
+        rows = []
+        for opinion_data in extracted_data.get("opinions", []):
             aspect = opinion_data.get("aspect", "").lower()
             if not aspect:
                 continue
 
-            # Normalize aspect names
-            aspect_mapping = {
-                "camera": "camera",
-                "battery": "battery",
-                "display": "display",
-                "screen": "display",
-                "performance": "performance",
-                "speed": "performance",
-                "build": "build_quality",
-                "build_quality": "build_quality",
-                "design": "build_quality",
-                "software": "software",
-                "value": "value",
-                "price": "value",
-                "sound": "audio",
-                "audio": "audio",
-                "speaker": "audio",
-            }
-            normalized_aspect = aspect_mapping.get(aspect, aspect)
-
-            opinion = Opinion(
-                review_id=review.id,
-                aspect=normalized_aspect,
-                sentiment=float(opinion_data.get("sentiment", 0)),
-                confidence=float(opinion_data.get("confidence", 0.5)),
-                quote=opinion_data.get("quote"),
-                summary=opinion_data.get("summary"),
-            )
-            db.add(opinion)
-            created_count += 1
-
-        await db.flush()
-        logger.info(f"Created {created_count} opinions for review {review.id}")
-        return created_count
+            rows.append({
+                "review_id": review.id,
+                "aspect": _ASPECT_MAP.get(aspect, aspect),
+                "sentiment": float(opinion_data.get("sentiment", 0)),
+                "confidence": float(opinion_data.get("confidence", 0.5)),
+                "quote": opinion_data.get("quote"),
+                "summary": opinion_data.get("summary"),
+            })
+
+        # Core executemany: one multi-row INSERT, no ORM unit-of-work per opinion
+        if rows:
+            await db.execute(insert(Opinion), rows)
+        logger.info(f"Created {len(rows)} opinions for review {review.id}")
+        return len(rows)
 
     async def _update_product_stats(self, db: AsyncSession, product: Product):
-        """Update product review count and average rating."""
-        from sqlalchemy import func as sql_func
-
-        # Get review count and average rating
+        """Update product review count and average rating in one atomic UPDATE."""
         result = await db.execute(
-            select(
-                sql_func.count(Review.id).label("count"),
-                sql_func.avg(Review.overall_rating).label("avg_rating")
-            ).where(Review.product_id == product.id)
+            update(Product)
+            .where(Product.id == product.id)
+            .values(
+                review_count=select(func.count(Review.id))
+                .where(Review.product_id == product.id)
+                .scalar_subquery(),
+                # Keep the previous rating when no review has one
+                average_rating=func.coalesce(
+                    select(func.avg(Review.overall_rating))
+                    .where(Review.product_id == product.id)
+                    .scalar_subquery(),
+                    Product.average_rating,
+                ),
+            )
+            .returning(Product.review_count, Product.average_rating)
         )
         stats = result.one()
 
-        product.review_count = stats.count or 0
-        if stats.avg_rating is not None:
-            product.average_rating = float(stats.avg_rating)
-
         logger.info(
             f"Updated product stats: {product.name} - "
-            f"{product.review_count} reviews, avg rating: {product.average_rating}"
+            f"{stats.review_count} reviews, avg rating: {stats.average_rating}"
         )
 
 
@@ -1,15 +1,60 @@
 """Multi-provider LLM service supporting Gemini and OpenAI."""
 
-import json
+import asyncio
+import functools
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+import orjson
 
 from app.core.config import settings
 from app.core.circuit_breaker import gemini_breaker
+from app.core.http import get_http_client
+from app.core.llm import get_genai_client
+from app.core.llm_cache import llm_cache
 from app.core.logging import get_logger
+from app.services.cache_service import LRUCache
 
 logger = get_logger(__name__)
 
+# Import provider SDKs at module load so their (slow) schema setup never runs
+# on the event loop during a request. Each is optional: only the configured
+# provider's SDK needs to be installed.
+try:
+    from google import genai
+    from google.genai import types as genai_types
+except ImportError:
+    genai = None
+    genai_types = None
+
+try:
+    from openai import AsyncOpenAI
+    from openai.types.chat import ChatCompletion, ChatCompletionMessage, ChatCompletionMessageToolCall
+    from openai.types.chat.chat_completion import Choice as ChatCompletionChoice
+    from openai.types.chat.chat_completion_message_tool_call import Function as ToolCallFunction
+except ImportError:
+    AsyncOpenAI = None
+
+_MISSING = object()
+
+# Recent chat-history messages kept as built Gemini contents
+_CONTENT_CACHE_SIZE = 512
+
+
+def _tool_result_json(result: Any) -> str:
+    """Serialize a tool result for the model (compact); strings are passed through as-is."""
+    if isinstance(result, str):
+        return result
+    return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+class FunctionCall(NamedTuple):
+    """A function call requested by the model."""
+
+    name: str
+    args: Mapping[str, Any]
+
 
 class BaseLLMProvider(ABC):
     """Abstract base for LLM providers."""
@@ -23,10 +68,10 @@ class BaseLLMProvider(ABC):
         """Check if the response contains a function call."""
 
     @abstractmethod
-    def extract_function_call(self, response: Any) -> Optional[Dict[str, Any]]:
+    def extract_function_call(self, response: Any) -> Optional[FunctionCall]:
         """Extract function name and args from a function call response.
 
-        Returns: {"name": str, "args": dict} or None
+        Returns: FunctionCall(name, args) or None
         """
 
     @abstractmethod
@@ -58,79 +103,291 @@ class BaseLLMProvider(ABC):
     def build_config(self, system_instruction: str, tools: Any, **kwargs) -> Any:
         """Build provider-specific generation config."""
 
+    @abstractmethod
+    async def _generate_uncached(self, contents: List[Any], config: Any) -> Any:
+        """Send one request to the provider, bypassing the response cache."""
+
+    @abstractmethod
+    def _load_response(self, data: str) -> Any:
+        """Rebuild a response serialized by _dump_response."""
+
+    # Whether generate_streamed() actually streams (the base class falls back to generate())
+    supports_streaming: bool = False
+
+    async def generate_streamed(self, contents: List[Any], config: Any) -> Any:
+        """Like generate(), but may return as soon as a complete function call arrives.
+
+        Streaming providers start tool dispatch on the first complete function
+        call instead of waiting for the full generation. The result works with
+        the same has_function_call/extract_* helpers as generate()'s.
+        """
+        return await self.generate(contents, config)
+
+    @staticmethod
+    def _dump_response(response: Any) -> str:
+        """Serialize a response for the shared (Redis) LLM cache."""
+        return response.model_dump_json(exclude_none=True)
+
+    async def _generate_cached(
+        self, key_parts: Tuple, config: Any, call: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run call(), reusing the response of an identical temperature-0 request.
+
+        key_parts must capture everything the provider sends (contents,
+        config, tools). Identical requests already in flight share one
+        upstream call. Function-call responses are not cached because the
+        caller executes the tool on each of them.
+        """
+        if not llm_cache.enabled or _config_value(config, "temperature") != 0:
+            return await call()
+
+        key = llm_cache.make_key(type(self).__name__, self.model, *key_parts)
+        cached = await llm_cache.get(key, decode=self._load_response)
+        if cached is not None:
+            return cached
+
+        async def call_and_store() -> Any:
+            response = await call()
+            if not self.has_function_call(response):
+                await llm_cache.set(key, response, encode=self._dump_response)
+            return response
+
+        return await llm_cache.single_flight(key, call_and_store)
+
+
+@functools.cache
+def _gemini_type_mapping(types: Any) -> Dict[str, Any]:
+    """JSON-schema type names mapped to google.genai Schema types (built once)."""
+    return {
+        "string": types.Type.STRING,
+        "integer": types.Type.INTEGER,
+        "number": types.Type.NUMBER,
+        "boolean": types.Type.BOOLEAN,
+        "array": types.Type.ARRAY,
+        "object": types.Type.OBJECT,
+    }
+
+
+def _config_value(config: Any, name: str) -> Any:
+    """Read a generation parameter from a Gemini config object or OpenAI config dict."""
+    if isinstance(config, dict):
+        return config.get(name)
+    return getattr(config, name, None)
+
 
 class GeminiProvider(BaseLLMProvider):
     """Google Gemini LLM provider."""
 
+    supports_streaming = True
+
     def __init__(self):
-        from google import genai
-        from google.genai import types
+        if genai is None:
+            raise RuntimeError("google-genai is not installed")
 
         self.genai = genai
-        self.types = types
-        self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        self.types = types = genai_types
+        self._type_mapping = _gemini_type_mapping(types)
+        # Shared client on the process-wide HTTP/2 pool: concurrent calls
+        # multiplex over one kept-alive TLS connection
+        self.client = get_genai_client()
         self.model = settings.LLM_MODEL
 
+        # Server-side cached system prompt + tools: key -> (cache name, expiry)
+        self._prompt_caches: Dict[str, Tuple[str, float]] = {}
+        self._prompt_cache_retry_at: Dict[str, float] = {}
+        self._prompt_cache_lock = asyncio.Lock()
+
+        # Converted tool declarations, keyed by their canonical (sorted-key) JSON
+        self._declaration_cache: Dict[bytes, Any] = {}
+        # Built text contents, keyed by (role, text)
+        self._content_cache = LRUCache(maxsize=_CONTENT_CACHE_SIZE)
+
     async def generate(self, contents: List[Any], config: Any, tools: Any = None) -> Any:
-        return await self.client.aio.models.generate_content(
-            model=self.model,
-            contents=contents,
-            config=config,
+        return await self._generate_cached(
+            (contents, config), config, lambda: self._generate_uncached(contents, config)
         )
 
-    def has_function_call(self, response: Any) -> bool:
+    async def _generate_uncached(self, contents: List[Any], config: Any) -> Any:
+        return await self._call_with_cached_prompt(
+            config,
+            lambda cfg: self.client.aio.models.generate_content(
+                model=self.model, contents=contents, config=cfg
+            ),
+        )
+
+    async def generate_streamed(self, contents: List[Any], config: Any) -> Any:
+        stream = await self._call_with_cached_prompt(
+            config,
+            lambda cfg: self.client.aio.models.generate_content_stream(
+                model=self.model, contents=contents, config=cfg
+            ),
+        )
+        return await self._collect_stream(stream)
+
+    async def _call_with_cached_prompt(
+        self, config: Any, request: Callable[[Any], Awaitable[Any]]
+    ) -> Any:
+        """Run request(config) with the cached system prompt, falling back to the full one."""
+        cached_config = await self._with_cached_prompt(config)
         try:
-            if not response.candidates:
-                return False
-            content = response.candidates[0].content
-            if not content or not content.parts:
-                return False
-            parts = content.parts
-            return (
-                hasattr(parts[0], "function_call")
-                and parts[0].function_call
-                and parts[0].function_call.name
-            )
-        except (AttributeError, IndexError):
-            return False
+            return await request(cached_config)
+        except self.genai.errors.ClientError as e:
+            # Cache expired or was evicted server-side — drop it and retry once uncached
+            if cached_config is config or e.code not in (403, 404):
+                raise
+            logger.info(f"Cached prompt unavailable ({e.code}), retrying without cache")
+            self._prompt_caches.pop(self._prompt_cache_key(config), None)
+            return await request(config)
+
+    async def _collect_stream(self, stream: Any) -> Any:
+        """Assemble streamed chunks into one response, stopping at the first function call."""
+        types = self.types
+        parts: List[Any] = []
+        last = None
+        try:
+            async for chunk in stream:
+                last = chunk
+                candidates = chunk.candidates
+                content = candidates[0].content if candidates else None
+                chunk_parts = (content.parts if content else None) or []
+                for part in chunk_parts:
+                    _append_stream_part(parts, part)
+                if any(getattr(part, "function_call", None) for part in chunk_parts):
+                    break
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+        if last is None:
+            return types.GenerateContentResponse(candidates=[])
+        finish_reason = last.candidates[0].finish_reason if last.candidates else None
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(
+                content=types.Content(role="model", parts=parts),
+                finish_reason=finish_reason,
+            )],
+            usage_metadata=last.usage_metadata,
+        )
 
-    def extract_function_call(self, response: Any) -> Optional[Dict[str, Any]]:
-        part = self.extract_function_call_part(response)
-        if part and part.function_call:
-            fc = part.function_call
-            return {
-                "name": fc.name,
-                "args": dict(fc.args) if fc.args else {},
-            }
-        return None
+    @staticmethod
+    def _prompt_cache_key(config: Any) -> str:
+        # Full declarations, so a changed schema or description under the
+        # same tool name gets a fresh server-side cache
+        return llm_cache.make_key(config.system_instruction, config.tools or [])
+
+    async def _with_cached_prompt(self, config: Any) -> Any:
+        """Swap the system instruction and tools for a Gemini cached-content handle.
+
+        The system prompt and tool declarations are identical on every turn of
+        every conversation, so they are uploaded once and referenced by name.
+        Falls back to the uncached config if caching is disabled or fails
+        (e.g. the prompt is below the model's minimum cacheable size).
+        """
+        ttl = settings.LLM_PROMPT_CACHE_TTL
+        if ttl <= 0 or config is None or not getattr(config, "system_instruction", None):
+            return config
+
+        key = self._prompt_cache_key(config)
+        now = time.time()
+        if now < self._prompt_cache_retry_at.get(key, 0.0):
+            return config
+
+        cached = self._prompt_caches.get(key)
+        # Refresh a minute before the server-side TTL runs out
+        if cached is None or cached[1] - 60 <= now:
+            async with self._prompt_cache_lock:
+                cached = self._prompt_caches.get(key)
+                if cached is None or cached[1] - 60 <= time.time():
+                    try:
+                        cache = await self.client.aio.caches.create(
+                            model=self.model,
+                            config=self.types.CreateCachedContentConfig(
+                                system_instruction=config.system_instruction,
+                                tools=config.tools,
+                                ttl=f"{ttl}s",
+                            ),
+                        )
+                    except Exception as e:
+                        logger.info(f"Prompt caching unavailable, sending full prompt: {e}")
+                        self._prompt_cache_retry_at[key] = time.time() + ttl
+                        return config
+                    cached = (cache.name, time.time() + ttl)
+                    self._prompt_caches[key] = cached
+                    logger.debug(f"Cached system prompt as {cache.name}")
+
+        return config.model_copy(
+            update={"system_instruction": None, "tools": None, "cached_content": cached[0]}
+        )
+
+    def _load_response(self, data: str) -> Any:
+        return self.types.GenerateContentResponse.model_validate_json(data)
+
+    def has_function_call(self, response: Any) -> bool:
+        return self._get_function_call_part(response) is not None
+
+    def extract_function_call(self, response: Any) -> Optional[FunctionCall]:
+        part = self._get_function_call_part(response)
+        if part is None:
+            return None
+        fc = part.function_call
+        # google-genai already returns a plain dict and no caller mutates it
+        return FunctionCall(fc.name, fc.args or {})
 
     def extract_function_call_part(self, response: Any) -> Any:
+        return self._get_function_call_part(response)
+
+    @staticmethod
+    def _parts(response: Any) -> Any:
+        """Return the first candidate's parts (or None), computed once per response.
+
+        The agent loop inspects each response several times (has_function_call,
+        extract_*), so the lookup is stored on the response object when it
+        accepts attributes.
+        """
+        parts = getattr(response, "_cached_parts", _MISSING)
+        if parts is not _MISSING:
+            return parts
         try:
-            if not response.candidates:
-                return None
-            content = response.candidates[0].content
-            if not content or not content.parts:
-                return None
-            for part in content.parts:
-                if hasattr(part, "function_call") and part.function_call:
-                    return part
-            return None
-        except (AttributeError, IndexError):
+            content = response.candidates[0].content if response.candidates else None
+            parts = content.parts if content else None
+        except (AttributeError, IndexError, TypeError):
+            parts = None
+        try:
+            response._cached_parts = parts
+        except (AttributeError, TypeError, ValueError):
+            pass
+        return parts
+
+    @classmethod
+    def _get_function_call_part(cls, response: Any) -> Any:
+        """Return the first part carrying a named function call, or None."""
+        parts = cls._parts(response)
+        if not parts:
             return None
+        # Tool-call responses are almost always a single part
+        first = parts[0]
+        function_call = getattr(first, "function_call", None)
+        if function_call and function_call.name:
+            return first
+        for part in parts[1:]:
+            function_call = getattr(part, "function_call", None)
+            if function_call and function_call.name:
+                return part
+        return None
 
     def extract_text(self, response: Any) -> str:
-        try:
-            if not response.candidates:
-                return ""
-            content = response.candidates[0].content
-            if not content or not content.parts:
-                return ""
-            for part in content.parts:
-                if hasattr(part, "text") and part.text:
-                    return part.text
-            return ""
-        except (AttributeError, IndexError):
+        parts = self._parts(response)
+        if not parts:
             return ""
+        text = getattr(parts[0], "text", None)
+        if text:
+            return text
+        for part in parts[1:]:
+            text = getattr(part, "text", None)
+            if text:
+                return text
+        return ""
 
     def build_function_response(
         self, name: str, result: Dict[str, Any], response: Any, function_call_part: Any
@@ -148,14 +405,14 @@ class GeminiProvider(BaseLLMProvider):
             function_response_part = types.Part(
                 function_response=types.FunctionResponse(
                     name=name,
-                    response={"result": json.dumps(result)},
+                    response={"result": _tool_result_json(result)},
                 ),
                 thought_signature=thought_sig,
             )
         else:
             function_response_part = types.Part.from_function_response(
                 name=name,
-                response={"result": json.dumps(result)},
+                response={"result": _tool_result_json(result)},
             )
 
         items.append(
@@ -164,12 +421,25 @@ class GeminiProvider(BaseLLMProvider):
         return items
 
     def build_content(self, role: str, text: str) -> Any:
-        return self.types.Content(
-            role=role,
-            parts=[self.types.Part(text=text)],
-        )
+        # Chat history is rebuilt from the same messages every turn; reuse the
+        # validated objects instead of constructing two pydantic models again.
+        # Contents are never mutated after being built, so sharing is safe.
+        key = (role, text)
+        content = self._content_cache.get(key)
+        if content is None:
+            content = self.types.Content(role=role, parts=[self.types.Part(text=text)])
+            self._content_cache.set(key, content)
+        return content
 
     def convert_function_declarations(self, declarations: List[Dict[str, Any]]) -> Any:
+        # The tool catalog is static, so the SDK objects are built once per process
+        key = orjson.dumps(declarations, option=orjson.OPT_SORT_KEYS)
+        tools = self._declaration_cache.get(key)
+        if tools is None:
+            tools = self._declaration_cache[key] = self._build_tools(declarations)
+        return tools
+
+    def _build_tools(self, declarations: List[Dict[str, Any]]) -> Any:
         types = self.types
         function_decls = []
         for func in declarations:
@@ -192,14 +462,7 @@ class GeminiProvider(BaseLLMProvider):
 
     def _convert_param_schema(self, param: Dict[str, Any]) -> Any:
         types = self.types
-        type_mapping = {
-            "string": types.Type.STRING,
-            "integer": types.Type.INTEGER,
-            "number": types.Type.NUMBER,
-            "boolean": types.Type.BOOLEAN,
-            "array": types.Type.ARRAY,
-            "object": types.Type.OBJECT,
-        }
+        type_mapping = self._type_mapping
         schema_type = type_mapping.get(param.get("type", "string"), types.Type.STRING)
         schema_kwargs: Dict[str, Any] = {"type": schema_type}
         if "description" in param:
@@ -224,20 +487,87 @@ class GeminiProvider(BaseLLMProvider):
 class OpenAIProvider(BaseLLMProvider):
     """OpenAI LLM provider."""
 
+    supports_streaming = True
+
     def __init__(self):
-        from openai import AsyncOpenAI
+        if AsyncOpenAI is None:
+            raise RuntimeError("openai is not installed")
 
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=get_http_client())
         self.model = settings.OPENAI_MODEL
         self._system_instruction: Optional[str] = None
         self._tools: Optional[List[Dict[str, Any]]] = None
+        # Converted tool declarations, keyed by their canonical (sorted-key) JSON
+        self._declaration_cache: Dict[bytes, List[Dict[str, Any]]] = {}
 
     async def generate(self, contents: List[Any], config: Any, tools: Any = None) -> Any:
         """Generate using OpenAI chat completions."""
-        messages = self._contents_to_messages(contents, config)
+        return await self._generate_cached(
+            (contents, config, self._tools),
+            config,
+            lambda: self._generate_uncached(contents, config),
+        )
+
+    async def _generate_uncached(self, contents: List[Any], config: Any) -> Any:
+        return await self.client.chat.completions.create(**self._request_kwargs(contents, config))
+
+    async def generate_streamed(self, contents: List[Any], config: Any) -> Any:
+        stream = await self.client.chat.completions.create(
+            **self._request_kwargs(contents, config), stream=True
+        )
+        text: List[str] = []
+        calls: Dict[int, Dict[str, Any]] = {}
+        completion_id, created, model, finish_reason = "", 0, self.model, None
+        try:
+            async for chunk in stream:
+                completion_id, created, model = chunk.id, chunk.created, chunk.model
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                delta = choice.delta
+                if delta.content:
+                    text.append(delta.content)
+                for tool_delta in delta.tool_calls or ():
+                    call = calls.setdefault(tool_delta.index, {"id": "", "name": "", "arguments": []})
+                    if tool_delta.id:
+                        call["id"] = tool_delta.id
+                    if tool_delta.function:
+                        call["name"] += tool_delta.function.name or ""
+                        call["arguments"].append(tool_delta.function.arguments or "")
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                    break
+        finally:
+            await stream.close()
+
+        tool_calls = [
+            ChatCompletionMessageToolCall(
+                id=call["id"],
+                type="function",
+                function=ToolCallFunction(name=call["name"], arguments="".join(call["arguments"])),
+            )
+            for _, call in sorted(calls.items())
+        ]
+        return ChatCompletion(
+            id=completion_id,
+            object="chat.completion",
+            created=created,
+            model=model,
+            choices=[ChatCompletionChoice(
+                index=0,
+                finish_reason=finish_reason or "stop",
+                message=ChatCompletionMessage(
+                    role="assistant",
+                    content="".join(text) or None,
+                    tool_calls=tool_calls or None,
+                ),
+            )],
+        )
+
+    def _request_kwargs(self, contents: List[Any], config: Any) -> Dict[str, Any]:
         kwargs: Dict[str, Any] = {
             "model": self.model,
-            "messages": messages,
+            "messages": self._contents_to_messages(contents, config),
         }
 
         # Extract config params
@@ -251,8 +581,7 @@ class OpenAIProvider(BaseLLMProvider):
 
         if self._tools:
             kwargs["tools"] = self._tools
-
-        return await self.client.chat.completions.create(**kwargs)
+        return kwargs
 
     def _contents_to_messages(self, contents: List[Any], config: Any) -> List[Dict[str, Any]]:
         """Convert our content list into OpenAI messages format."""
@@ -269,26 +598,14 @@ class OpenAIProvider(BaseLLMProvider):
             messages.append({"role": "system", "content": sys_instruction})
 
         for content in contents:
-            if isinstance(content, dict):
-                messages.append(content)
-            elif hasattr(content, "role"):
-                # Gemini-style Content object — convert
-                role = "assistant" if content.role == "model" else content.role
-                if hasattr(content, "parts"):
-                    for part in content.parts:
-                        if hasattr(part, "text") and part.text:
-                            messages.append({"role": role, "content": part.text})
-                        elif hasattr(part, "function_response") and part.function_response:
-                            messages.append({
-                                "role": "tool",
-                                "tool_call_id": getattr(part.function_response, "_tool_call_id", "call_0"),
-                                "content": json.dumps(part.function_response.response) if hasattr(part.function_response, "response") else "",
-                            })
-            else:
-                messages.append({"role": "user", "content": str(content)})
+            convert = _CONTENT_CONVERTERS.get(type(content)) or _register_content_type(content)
+            messages.extend(convert(content))
 
         return messages
 
+    def _load_response(self, data: str) -> Any:
+        return ChatCompletion.model_validate_json(data)
+
     def has_function_call(self, response: Any) -> bool:
         try:
             choice = response.choices[0]
@@ -296,14 +613,12 @@ class OpenAIProvider(BaseLLMProvider):
         except (AttributeError, IndexError):
             return False
 
-    def extract_function_call(self, response: Any) -> Optional[Dict[str, Any]]:
+    def extract_function_call(self, response: Any) -> Optional[FunctionCall]:
         try:
             tool_call = response.choices[0].message.tool_calls[0]
-            return {
-                "name": tool_call.function.name,
-                "args": json.loads(tool_call.function.arguments) if tool_call.function.arguments else {},
-            }
-        except (AttributeError, IndexError, json.JSONDecodeError):
+            arguments = tool_call.function.arguments
+            return FunctionCall(tool_call.function.name, orjson.loads(arguments) if arguments else {})
+        except (AttributeError, IndexError, orjson.JSONDecodeError):
             return None
 
     def extract_function_call_part(self, response: Any) -> Any:
@@ -344,7 +659,7 @@ class OpenAIProvider(BaseLLMProvider):
         tool_msg = {
             "role": "tool",
             "tool_call_id": function_call_part.id,
-            "content": json.dumps(result),
+            "content": _tool_result_json(result),
         }
 
         return [assistant_msg, tool_msg]
@@ -354,17 +669,20 @@ class OpenAIProvider(BaseLLMProvider):
 
     def convert_function_declarations(self, declarations: List[Dict[str, Any]]) -> Any:
         """Convert function declarations to OpenAI tool format."""
-        tools = []
-        for func in declarations:
-            tool = {
-                "type": "function",
-                "function": {
-                    "name": func["name"],
-                    "description": func["description"],
-                    "parameters": func["parameters"],
-                },
-            }
-            tools.append(tool)
+        key = orjson.dumps(declarations, option=orjson.OPT_SORT_KEYS)
+        tools = self._declaration_cache.get(key)
+        if tools is None:
+            tools = self._declaration_cache[key] = [
+                {
+                    "type": "function",
+                    "function": {
+                        "name": func["name"],
+                        "description": func["description"],
+                        "parameters": func["parameters"],
+                    },
+                }
+                for func in declarations
+            ]
         self._tools = tools
         return tools
 
@@ -375,18 +693,117 @@ class OpenAIProvider(BaseLLMProvider):
         return config
 
 
+def _append_stream_part(parts: List[Any], part: Any) -> None:
+    """Append a streamed Gemini part, joining consecutive text fragments into one part."""
+    previous = parts[-1] if parts else None
+    if (
+        previous is not None
+        and previous.text is not None
+        and part.text is not None
+        and not previous.function_call
+        and not part.function_call
+        and bool(previous.thought) == bool(part.thought)
+    ):
+        parts[-1] = previous.model_copy(update={
+            "text": previous.text + part.text,
+            "thought_signature": part.thought_signature or previous.thought_signature,
+        })
+    else:
+        parts.append(part)
+
+
+def _messages_from_content(content: Any) -> List[Dict[str, Any]]:
+    """Convert a Gemini-style Content object to OpenAI messages."""
+    messages = []
+    role = "assistant" if content.role == "model" else content.role
+    for part in getattr(content, "parts", None) or ():
+        text = getattr(part, "text", None)
+        if text:
+            messages.append({"role": role, "content": text})
+            continue
+        function_response = getattr(part, "function_response", None)
+        if function_response:
+            result = getattr(function_response, "response", None)
+            messages.append({
+                "role": "tool",
+                "tool_call_id": getattr(function_response, "_tool_call_id", "call_0"),
+                "content": _tool_result_json(result) if result is not None else "",
+            })
+    return messages
+
+
+def _message_from_other(content: Any) -> List[Dict[str, Any]]:
+    return [{"role": "user", "content": str(content)}]
+
+
+# Content type -> converter to OpenAI messages; other types are registered on first use
+_CONTENT_CONVERTERS: Dict[type, Callable[[Any], List[Dict[str, Any]]]] = {
+    dict: lambda content: [content],
+    str: _message_from_other,
+}
+
+
+def _register_content_type(content: Any) -> Callable[[Any], List[Dict[str, Any]]]:
+    if isinstance(content, dict):
+        convert = _CONTENT_CONVERTERS[dict]
+    elif hasattr(content, "role"):
+        convert = _messages_from_content
+    else:
+        convert = _message_from_other
+    _CONTENT_CONVERTERS[type(content)] = convert
+    return convert
+
+
+@functools.lru_cache(maxsize=4)
+def _create_provider(name: str, api_key: str, model: str) -> BaseLLMProvider:
+    """Build a provider once per (name, api_key, model).
+
+    Cached process-wide so the SDK client and its connection pool are reused
+    across requests; the arguments only key the cache (providers read
+    settings themselves), and maxsize bounds stale providers after rotation.
+    """
+    if name == "openai":
+        logger.info(f"Using OpenAI provider (model: {model})")
+        return OpenAIProvider()
+    logger.info(f"Using Gemini provider (model: {model})")
+    return GeminiProvider()
+
+
 def get_llm_provider() -> BaseLLMProvider:
-    """Factory: return the configured LLM provider."""
+    """Factory: return the configured LLM provider (created once per process)."""
     provider_name = settings.LLM_PROVIDER.lower()
 
     if provider_name == "openai":
         if not settings.OPENAI_API_KEY:
             raise RuntimeError("OPENAI_API_KEY is required when LLM_PROVIDER=openai")
-        logger.info(f"Using OpenAI provider (model: {settings.OPENAI_MODEL})")
-        return OpenAIProvider()
+        return _create_provider("openai", settings.OPENAI_API_KEY, settings.OPENAI_MODEL)
 
     # Default to Gemini
     if not settings.GEMINI_API_KEY:
         raise RuntimeError("GEMINI_API_KEY is required when LLM_PROVIDER=gemini")
-    logger.info(f"Using Gemini provider (model: {settings.LLM_MODEL})")
-    return GeminiProvider()
+    return _create_provider("gemini", settings.GEMINI_API_KEY, settings.LLM_MODEL)
+
+
+async def warmup_llm_provider(timeout: float = 10.0) -> None:
+    """Prime the provider's HTTP connection pool with a tiny generate call.
+
+    Moves the TCP+TLS handshake off the first user request. Failures are
+    logged and ignored — they never trip the circuit breaker or block startup.
+    """
+    try:
+        provider = get_llm_provider()
+        config = provider.build_config(
+            system_instruction="",
+            tools=None,
+            temperature=0,
+            max_output_tokens=1,
+        )
+        # Bypass the response cache: a cached answer would skip the network
+        # call on every later boot and leave the pool cold
+        await asyncio.wait_for(
+            provider._generate_uncached([provider.build_content("user", "ok")], config),
+            timeout=timeout,
+        )
+        logger.info("LLM provider warmed up")
+    except Exception as e:
+        logger.warning(f"LLM provider warm-up skipped: {e}")
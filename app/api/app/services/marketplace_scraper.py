@@ -1,19 +1,27 @@
 """Marketplace scraper service for fetching product listings from Amazon and eBay."""
 
-import json
+import asyncio
 import re
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timezone
 from decimal import Decimal
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
+import orjson
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import insert, select
 
 from app.core.config import settings
+from app.core.http import get_http_client
+from app.core.llm import get_genai_client
+from app.core.llm_cache import SingleFlight
 from app.core.logging import get_logger
 from app.models.marketplace import MarketplaceListing
 from app.models.product import Product
 from app.crud.product import product_crud
+from app.services.cache_service import cache
 
 logger = get_logger(__name__)
 
@@ -59,6 +67,337 @@ Marketplace content:
 Return ONLY the JSON object, no additional text."""
 
 
+# Static search instructions, sent as the system instruction so every request
+# shares the same prompt prefix and only the short query varies
+AMAZON_SEARCH_INSTRUCTIONS = """You find current product listings on Amazon using Google Search.
+
+For each listing, I need:
+1. Product title
+2. Current price (in USD)
+3. Original price if discounted
+4. Direct product URL on Amazon
+5. Seller/store name
+6. Seller rating (out of 5)
+7. Number of customer reviews
+8. Stock availability
+9. Whether it's a Best Seller
+10. Shipping information
+
+Only include real product listings. Do not make up data."""
+
+EBAY_SEARCH_INSTRUCTIONS = """You find current product listings on eBay using Google Search.
+
+For each listing, I need:
+1. Product title
+2. Current price (in USD)
+3. Original price if applicable
+4. Direct product URL on eBay
+5. Seller name
+6. Seller rating percentage
+7. Number of items sold or reviews
+8. Stock availability
+9. Shipping information
+
+Only include real product listings. Do not make up data."""
+
+
+class ScrapedListing(BaseModel):
+    """A single marketplace listing found by the search model."""
+
+    title: str = Field(description="Full product title")
+    price: Optional[float] = Field(None, description="Current price")
+    currency: str = Field("USD", description="ISO currency code of the price")
+    original_price: Optional[float] = Field(None, description="Price before discount, if discounted")
+    url: Optional[str] = Field(None, description="Direct product URL on the marketplace")
+    seller_name: Optional[str] = Field(None, description="Seller or store name")
+    seller_rating: Optional[float] = Field(None, description="Seller rating out of 5, or positive feedback percentage on eBay")
+    review_count: Optional[int] = Field(None, description="Number of customer reviews or items sold")
+    availability: str = Field("unknown", description="One of: in_stock, out_of_stock, pre_order, unknown")
+    is_best_seller: bool = Field(False, description="Whether the listing is marked as a Best Seller")
+    shipping_info: Optional[str] = Field(None, description="Shipping information")
+    image_url: Optional[str] = Field(None, description="Product image URL")
+
+
+class ScrapedListings(BaseModel):
+    """Response schema for Gemini marketplace searches."""
+
+    listings: List[ScrapedListing] = Field(default_factory=list)
+
+
+# Output token budget for a search returning `limit` listings
+_LISTING_OUTPUT_TOKENS = 300
+_OUTPUT_TOKENS_OVERHEAD = 200
+
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.S)
+
+
+def _parse_listings(text: str) -> List[Dict[str, Any]]:
+    """Parse listings from a complete search response text.
+
+    Raises ValueError if the text holds no valid listings object.
+    """
+    match = _JSON_OBJECT_RE.search(text)
+    if not match:
+        raise ValueError("No JSON object in response")
+    parsed = ScrapedListings.model_validate(orjson.loads(match.group(0)))
+    # Omit unknown fields so callers' .get() defaults still apply
+    return [listing.model_dump(exclude_none=True) for listing in parsed.listings]
+
+
+def _listing_from_json(raw: str) -> Optional[Dict[str, Any]]:
+    """Validate one streamed listing object; None if it is malformed."""
+    try:
+        listing = ScrapedListing.model_validate(orjson.loads(raw))
+    except ValueError as e:
+        logger.debug(f"Skipping malformed streamed listing: {e}")
+        return None
+    return listing.model_dump(exclude_none=True)
+
+
+class _ListingStreamParser:
+    """Incrementally extract complete items of the `listings` array.
+
+    Feed it the streamed text of a ``{"listings": [{...}, ...]}`` response;
+    each call returns the raw JSON of the listing objects completed so far.
+    """
+
+    # Container stack while inside the top-level object's array
+    _ITEM_DEPTH = ["{", "["]
+
+    def __init__(self):
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._item: Optional[List[str]] = None
+
+    def feed(self, text: str) -> List[str]:
+        items = []
+        for ch in text:
+            if self._item is not None:
+                self._item.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if ch == "{" and self._stack == self._ITEM_DEPTH:
+                    self._item = [ch]
+                self._stack.append(ch)
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if ch == "}" and self._item is not None and self._stack == self._ITEM_DEPTH:
+                    items.append("".join(self._item))
+                    self._item = None
+        return items
+
+
+# Query parameters that only track the referral, not the listing
+_TRACKING_PARAMS = {"tag", "ref", "ref_", "_trkparms", "_trksid"}
+
+
+def _normalize_url(url: str) -> str:
+    """Normalize a listing URL for duplicate detection."""
+    parts = urlsplit(url.strip())
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in _TRACKING_PARAMS and not key.lower().startswith("utm_")
+    ]
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path.rstrip("/"),
+        urlencode(sorted(query)),
+        "",
+    ))
+
+
+def _dedupe_listings(listings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop listings whose normalized URL was already seen (first one wins).
+
+    Listings without a URL cannot be compared and are kept.
+    """
+    seen = set()
+    deduped = []
+    for listing in listings:
+        url = listing.get("url")
+        if url:
+            key = _normalize_url(url)
+            if key in seen:
+                continue
+            seen.add(key)
+        deduped.append(listing)
+    return deduped
+
+
+def _to_decimal(value: Any) -> Optional[Decimal]:
+    """Convert a scraped numeric value to Decimal; None for missing/zero."""
+    if not value:
+        return None
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, (int, str)):
+        return Decimal(value)
+    # Floats go through their shortest repr, not their binary expansion
+    return Decimal(repr(value))
+
+
+def _normalize_listing(
+    listing_data: Dict[str, Any], product_id: int, country: str, checked_at: datetime
+) -> Dict[str, Any]:
+    """Map a scraped listing to a marketplace_listings row.
+
+    Raises on malformed values (e.g. a non-numeric price) so the caller can
+    skip that listing.
+    """
+    # Map availability string to boolean
+    availability_str = listing_data.get("availability", "unknown").lower()
+    is_available = availability_str == "in_stock"
+
+    # Convert seller_rating to Decimal if it's a percentage (for eBay)
+    seller_rating = listing_data.get("seller_rating")
+    if seller_rating and seller_rating > 5:
+        # eBay uses percentage ratings, convert to 5-star scale
+        seller_rating = seller_rating / 20.0  # 100% -> 5.0
+
+    return {
+        "product_id": product_id,
+        "marketplace_name": listing_data.get("marketplace", "unknown"),
+        "country_code": country,
+        "listing_url": listing_data.get("url", ""),
+        "price_current": _to_decimal(listing_data.get("price")),
+        "price_original": _to_decimal(listing_data.get("original_price")),
+        "currency": listing_data.get("currency", "USD"),
+        "is_available": is_available,
+        "seller_name": listing_data.get("seller_name"),
+        "seller_rating": _to_decimal(seller_rating),
+        "shipping_info": listing_data.get("shipping_info"),
+        "listing_metadata": {
+            "title": listing_data.get("title"),
+            "review_count": listing_data.get("review_count"),
+            "is_best_seller": listing_data.get("is_best_seller", False),
+            "image_url": listing_data.get("image_url"),
+            # Serialized by the engine's orjson JSONB serializer
+            "scraped_at": checked_at
+        },
+        "last_checked": checked_at,
+    }
+
+
+def _build_listing_rows(
+    listings: List[Dict[str, Any]], product_id: int, country: str, checked_at: datetime
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Normalize a batch of listings into rows in a single pass.
+
+    Returns the rows and the listings they came from; malformed listings are
+    logged and left out of both.
+    """
+    rows = []
+    stored = []
+    for listing_data in listings:
+        try:
+            rows.append(_normalize_listing(listing_data, product_id, country, checked_at))
+        except Exception as e:
+            logger.error(f"Error storing listing: {e}")
+            continue
+        stored.append(listing_data)
+    return rows, stored
+
+
+EBAY_OAUTH_URL = "https://api.ebay.com/identity/v1/oauth2/token"
+EBAY_BROWSE_SEARCH_URL = "https://api.ebay.com/buy/browse/v1/item_summary/search"
+EBAY_OAUTH_SCOPE = "https://api.ebay.com/oauth/api_scope"
+
+
+class EbayBrowseClient:
+    """
+    Minimal eBay Browse API client for item search.
+
+    Uses an application (client-credentials) token, refreshed shortly before
+    it expires. Listings are returned in the same shape as ScrapedListing.
+    """
+
+    def __init__(self, client_id: str, client_secret: str, marketplace_id: str = "EBAY_US"):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.marketplace_id = marketplace_id
+        self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.client_id and self.client_secret)
+
+    async def _get_token(self) -> str:
+        async with self._token_lock:
+            if self._token and time.monotonic() < self._token_expires_at:
+                return self._token
+            resp = await get_http_client().post(
+                EBAY_OAUTH_URL,
+                auth=(self.client_id, self.client_secret),
+                data={"grant_type": "client_credentials", "scope": EBAY_OAUTH_SCOPE},
+                timeout=10.0,
+            )
+            resp.raise_for_status()
+            data = resp.json()
+            self._token = data["access_token"]
+            # Refresh a minute early so in-flight searches never use an expired token
+            self._token_expires_at = time.monotonic() + int(data.get("expires_in", 7200)) - 60
+            return self._token
+
+    async def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Search active eBay listings; raises httpx errors on failure."""
+        resp = await get_http_client().get(
+            EBAY_BROWSE_SEARCH_URL,
+            params={"q": query, "limit": limit},
+            headers={
+                "Authorization": f"Bearer {await self._get_token()}",
+                "X-EBAY-C-MARKETPLACE-ID": self.marketplace_id,
+            },
+            timeout=10.0,
+        )
+        resp.raise_for_status()
+        return [_ebay_item_to_listing(item) for item in resp.json().get("itemSummaries", [])]
+
+
+def _ebay_item_to_listing(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a Browse API item summary to the ScrapedListing dict shape."""
+    price = item.get("price") or {}
+    original = (item.get("marketingPrice") or {}).get("originalPrice") or {}
+    seller = item.get("seller") or {}
+    shipping = (item.get("shippingOptions") or [{}])[0].get("shippingCost") or {}
+
+    shipping_info = None
+    if shipping.get("value") is not None:
+        cost = float(shipping["value"])
+        shipping_info = "Free shipping" if cost == 0 else f"{cost:.2f} {shipping.get('currency', '')} shipping".strip()
+
+    listing = {
+        "title": item.get("title"),
+        "price": float(price["value"]) if price.get("value") else None,
+        "currency": price.get("currency", "USD"),
+        "original_price": float(original["value"]) if original.get("value") else None,
+        "url": item.get("itemWebUrl"),
+        "seller_name": seller.get("username"),
+        # Percentage; converted to a 5-star scale when stored
+        "seller_rating": float(seller["feedbackPercentage"]) if seller.get("feedbackPercentage") else None,
+        # Search only returns active listings
+        "availability": "in_stock",
+        "is_best_seller": False,
+        "shipping_info": shipping_info,
+        "image_url": (item.get("image") or {}).get("imageUrl"),
+    }
+    return {k: v for k, v in listing.items() if v is not None}
+
+
 class MarketplaceScraperService:
     """
     Service for scraping product listings from marketplaces like Amazon and eBay.
@@ -69,6 +408,11 @@ class MarketplaceScraperService:
     def __init__(self):
         """Initialize Gemini client."""
         self.genai_client = None
+        # Concurrent searches for the same product share one Gemini call
+        self._searches = SingleFlight()
+        self.ebay = EbayBrowseClient(
+            settings.EBAY_CLIENT_ID, settings.EBAY_CLIENT_SECRET, settings.EBAY_MARKETPLACE_ID
+        )
         self._init_clients()
 
     def _init_clients(self):
@@ -76,14 +420,65 @@ class MarketplaceScraperService:
         # Initialize Gemini client
         if settings.GEMINI_API_KEY:
             try:
-                from google import genai
-                self.genai_client = genai.Client(api_key=settings.GEMINI_API_KEY)
+                self.genai_client = get_genai_client()
                 logger.info("Marketplace scraper Gemini client initialized")
             except Exception as e:
                 logger.error(f"Failed to initialize Gemini client: {e}")
         else:
             logger.warning("GEMINI_API_KEY not set - marketplace scraping will not work")
 
+    @staticmethod
+    def _search_cache_key(marketplace: str, product_name: str, limit: int) -> str:
+        """Cache key for a marketplace search (case/whitespace-insensitive name)."""
+        return cache.hash_key(
+            f"marketplace:{marketplace}", f"{settings.LLM_MODEL}:{limit}:{product_name.strip()}"
+        )
+
+    async def _stream_listings(
+        self, instructions: str, prompt: str, limit: int
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Run a grounded search, stopping as soon as `limit` listings are complete.
+
+        Returns the text received so far and the listings parsed from it.
+        """
+        from google.genai import types
+
+        stream = await self.genai_client.aio.models.generate_content_stream(
+            model=settings.LLM_MODEL,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                system_instruction=instructions,
+                tools=[types.Tool(google_search=types.GoogleSearch())],
+                temperature=0.2,
+                candidate_count=1,
+                # Decode time grows with output length: budget per listing
+                max_output_tokens=_LISTING_OUTPUT_TOKENS * limit + _OUTPUT_TOKENS_OVERHEAD,
+                # Extraction from search results needs little reasoning
+                thinking_config=types.ThinkingConfig(thinking_level=types.ThinkingLevel.LOW),
+                response_mime_type="application/json",
+                response_schema=ScrapedListings,
+            )
+        )
+        parser = _ListingStreamParser()
+        chunks: List[str] = []
+        listings: List[Dict[str, Any]] = []
+        try:
+            async for chunk in stream:
+                text = chunk.text
+                if not text:
+                    continue
+                chunks.append(text)
+                for raw in parser.feed(text):
+                    listing = _listing_from_json(raw)
+                    if listing is not None:
+                        listings.append(listing)
+                if len(listings) >= limit:
+                    # Skip generating listings that would be cut off anyway
+                    break
+        finally:
+            await stream.aclose()
+        return "".join(chunks), listings
+
     async def search_amazon(self, product_name: str, limit: int = 5) -> Dict[str, Any]:
         """
         Search Amazon for product listings using Gemini with Google Search grounding.
@@ -98,56 +493,23 @@ class MarketplaceScraperService:
         if not self.genai_client:
             return {"error": "Gemini client not initialized", "listings": []}
 
-        logger.info(f"Searching Amazon for: {product_name}")
+        cache_key = self._search_cache_key("amazon", product_name, limit)
+        return await self._searches.run(
+            cache_key, lambda: self._search_amazon(product_name, limit, cache_key)
+        )
 
-        search_prompt = f"""Search Amazon for "{product_name}" and find the top {limit} product listings.
+    async def _search_amazon(self, product_name: str, limit: int, cache_key: str) -> Dict[str, Any]:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Amazon listings cache hit for: {product_name}")
+            return cached
 
-For each listing, I need:
-1. Product title
-2. Current price (in USD)
-3. Original price if discounted
-4. Direct product URL on Amazon
-5. Seller/store name
-6. Seller rating (out of 5)
-7. Number of customer reviews
-8. Stock availability
-9. Whether it's a Best Seller
-10. Shipping information
-
-Return your response as a JSON object:
-{{
-    "listings": [
-        {{
-            "title": "Product title",
-            "price": 99.99,
-            "currency": "USD",
-            "original_price": 129.99,
-            "url": "https://www.amazon.com/dp/...",
-            "seller_name": "Amazon.com" or seller name,
-            "seller_rating": 4.5,
-            "review_count": 12345,
-            "availability": "in_stock",
-            "is_best_seller": true,
-            "shipping_info": "Free Prime shipping"
-        }}
-    ],
-    "marketplace": "amazon"
-}}
+        logger.info(f"Searching Amazon for: {product_name}")
 
-Only include real product listings. Do not make up data."""
+        search_prompt = f'Search Amazon for "{product_name}" and find the top {limit} product listings.'
 
         try:
-            from google.genai import types
-            response = await self.genai_client.aio.models.generate_content(
-                model=settings.LLM_MODEL,
-                contents=search_prompt,
-                config=types.GenerateContentConfig(
-                    tools=[types.Tool(google_search=types.GoogleSearch())],
-                    temperature=0.2
-                )
-            )
-
-            response_text = response.text or ""
+            response_text, listings = await self._stream_listings(AMAZON_SEARCH_INSTRUCTIONS, search_prompt, limit)
 
             if not response_text:
                 logger.warning(f"Empty response from Gemini for Amazon search: {product_name}")
@@ -158,21 +520,22 @@ Only include real product listings. Do not make up data."""
                     "product_name": product_name
                 }
 
-            # Parse JSON response
             try:
-                json_match = re.search(r'\{[\s\S]*\}', response_text)
-                if json_match:
-                    data = json.loads(json_match.group())
-                    listings = data.get("listings", [])
-                    logger.info(f"Found {len(listings)} Amazon listings for {product_name}")
-                    return {
-                        "status": "success",
-                        "marketplace": "amazon",
-                        "listings": listings[:limit],
-                        "product_name": product_name
-                    }
-            except json.JSONDecodeError as e:
+                if not listings:
+                    # Not in the expected {"listings": [...]} shape; validate the whole text
+                    listings = _parse_listings(response_text)
+            except ValueError as e:
                 logger.warning(f"Failed to parse Amazon search JSON: {e}")
+            else:
+                logger.info(f"Found {len(listings)} Amazon listings for {product_name}")
+                result = {
+                    "status": "success",
+                    "marketplace": "amazon",
+                    "listings": listings[:limit],
+                    "product_name": product_name
+                }
+                await cache.set(cache_key, result, ttl=MARKETPLACE_CACHE_TTL_HOURS * 3600)
+                return result
 
             return {
                 "status": "no_results",
@@ -192,7 +555,10 @@ Only include real product listings. Do not make up data."""
 
     async def search_ebay(self, product_name: str, limit: int = 5) -> Dict[str, Any]:
         """
-        Search eBay for product listings using Gemini with Google Search grounding.
+        Search eBay for product listings.
+
+        Uses the eBay Browse API when configured, falling back to Gemini with
+        Google Search grounding when it is not, fails, or finds nothing.
 
         Args:
             product_name: Product to search for
@@ -201,58 +567,51 @@ Only include real product listings. Do not make up data."""
         Returns:
             Dictionary with listings data
         """
-        if not self.genai_client:
+        if not self.genai_client and not self.ebay.enabled:
             return {"error": "Gemini client not initialized", "listings": []}
 
-        logger.info(f"Searching eBay for: {product_name}")
+        cache_key = self._search_cache_key("ebay", product_name, limit)
+        return await self._searches.run(
+            cache_key, lambda: self._search_ebay(product_name, limit, cache_key)
+        )
 
-        search_prompt = f"""Search eBay for "{product_name}" and find the top {limit} product listings.
+    async def _search_ebay(self, product_name: str, limit: int, cache_key: str) -> Dict[str, Any]:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"eBay listings cache hit for: {product_name}")
+            return cached
 
-For each listing, I need:
-1. Product title
-2. Current price (in USD)
-3. Original price if applicable
-4. Direct product URL on eBay
-5. Seller name
-6. Seller rating percentage
-7. Number of items sold or reviews
-8. Stock availability
-9. Shipping information
+        logger.info(f"Searching eBay for: {product_name}")
 
-Return your response as a JSON object:
-{{
-    "listings": [
-        {{
-            "title": "Product title",
-            "price": 99.99,
-            "currency": "USD",
-            "original_price": null,
-            "url": "https://www.ebay.com/itm/...",
-            "seller_name": "seller_username",
-            "seller_rating": 99.5,
-            "review_count": 5000,
-            "availability": "in_stock",
-            "is_best_seller": false,
-            "shipping_info": "Free shipping"
-        }}
-    ],
-    "marketplace": "ebay"
-}}
+        if self.ebay.enabled:
+            try:
+                listings = await self.ebay.search(product_name, limit)
+            except Exception as e:
+                logger.warning(f"eBay Browse API search failed, falling back to Gemini: {e}")
+            else:
+                if listings:
+                    logger.info(f"Found {len(listings)} eBay listings via Browse API for {product_name}")
+                    result = {
+                        "status": "success",
+                        "marketplace": "ebay",
+                        "listings": listings[:limit],
+                        "product_name": product_name
+                    }
+                    await cache.set(cache_key, result, ttl=MARKETPLACE_CACHE_TTL_HOURS * 3600)
+                    return result
 
-Only include real product listings. Do not make up data."""
+        if not self.genai_client:
+            return {
+                "status": "no_results",
+                "marketplace": "ebay",
+                "listings": [],
+                "product_name": product_name
+            }
 
-        try:
-            from google.genai import types
-            response = await self.genai_client.aio.models.generate_content(
-                model=settings.LLM_MODEL,
-                contents=search_prompt,
-                config=types.GenerateContentConfig(
-                    tools=[types.Tool(google_search=types.GoogleSearch())],
-                    temperature=0.2
-                )
-            )
+        search_prompt = f'Search eBay for "{product_name}" and find the top {limit} product listings.'
 
-            response_text = response.text or ""
+        try:
+            response_text, listings = await self._stream_listings(EBAY_SEARCH_INSTRUCTIONS, search_prompt, limit)
 
             if not response_text:
                 logger.warning(f"Empty response from Gemini for eBay search: {product_name}")
@@ -263,21 +622,22 @@ Only include real product listings. Do not make up data."""
                     "product_name": product_name
                 }
 
-            # Parse JSON response
             try:
-                json_match = re.search(r'\{[\s\S]*\}', response_text)
-                if json_match:
-                    data = json.loads(json_match.group())
-                    listings = data.get("listings", [])
-                    logger.info(f"Found {len(listings)} eBay listings for {product_name}")
-                    return {
-                        "status": "success",
-                        "marketplace": "ebay",
-                        "listings": listings[:limit],
-                        "product_name": product_name
-                    }
-            except json.JSONDecodeError as e:
+                if not listings:
+                    # Not in the expected {"listings": [...]} shape; validate the whole text
+                    listings = _parse_listings(response_text)
+            except ValueError as e:
                 logger.warning(f"Failed to parse eBay search JSON: {e}")
+            else:
+                logger.info(f"Found {len(listings)} eBay listings for {product_name}")
+                result = {
+                    "status": "success",
+                    "marketplace": "ebay",
+                    "listings": listings[:limit],
+                    "product_name": product_name
+                }
+                await cache.set(cache_key, result, ttl=MARKETPLACE_CACHE_TTL_HOURS * 3600)
+                return result
 
             return {
                 "status": "no_results",
@@ -301,7 +661,9 @@ Only include real product listings. Do not make up data."""
         product_name: str,
         product_id: Optional[int] = None,
         marketplaces: List[str] = None,
-        country: str = "US"
+        country: str = "US",
+        max_total: Optional[int] = None,
+        prefer_marketplace: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Scrape marketplace listings and store them in the database.
@@ -312,6 +674,9 @@ Only include real product listings. Do not make up data."""
             product_id: Optional product ID to associate listings with
             marketplaces: List of marketplaces to search (default: amazon, ebay)
             country: Country code for listings
+            max_total: If set, search marketplaces one at a time and stop once
+                this many listings are found (otherwise all run in parallel)
+            prefer_marketplace: Marketplace to search first when max_total is set
 
         Returns:
             Dictionary with stored listings summary
@@ -322,30 +687,58 @@ Only include real product listings. Do not make up data."""
         logger.info(f"Scraping listings for '{product_name}' from {marketplaces}")
 
         all_listings = []
-        results_by_marketplace = {}
+        # Per-marketplace counts, built while collecting results
+        marketplace_summary = {}
 
         # Search each marketplace
-        import asyncio
-        search_tasks = []
-
-        if "amazon" in marketplaces:
-            search_tasks.append(("amazon", self.search_amazon(product_name, limit=5)))
-        if "ebay" in marketplaces:
-            search_tasks.append(("ebay", self.search_ebay(product_name, limit=5)))
-
-        # Execute searches in parallel
-        for marketplace, task in search_tasks:
-            try:
-                result = await task
-                results_by_marketplace[marketplace] = result
-                if result.get("listings"):
-                    all_listings.extend([
-                        {**listing, "marketplace": marketplace}
-                        for listing in result["listings"]
-                    ])
-            except Exception as e:
-                logger.error(f"Error searching {marketplace}: {e}")
-                results_by_marketplace[marketplace] = {"error": str(e), "listings": []}
+        search_fns = {"amazon": self.search_amazon, "ebay": self.search_ebay}
+        labels = [m for m in search_fns if m in marketplaces]
+        if prefer_marketplace in labels:
+            labels.remove(prefer_marketplace)
+            labels.insert(0, prefer_marketplace)
+
+        def collect(marketplace: str, result: Any) -> None:
+            if isinstance(result, Exception):
+                logger.error(f"Error searching {marketplace}: {result}")
+                marketplace_summary[marketplace] = {"count": 0, "status": "unknown"}
+                return
+            listings = result.get("listings") or []
+            marketplace_summary[marketplace] = {
+                "count": len(listings), "status": result.get("status", "unknown")
+            }
+            # Tag in place rather than copying: a listing dict is only ever
+            # shared with concurrent callers of the same search, which tag it
+            # with the same marketplace
+            for listing in listings:
+                listing["marketplace"] = marketplace
+            all_listings.extend(listings)
+
+        if max_total is None:
+            # Execute searches in parallel
+            results = await asyncio.gather(
+                *(search_fns[m](product_name, limit=5) for m in labels),
+                return_exceptions=True,
+            )
+            for marketplace, result in zip(labels, results):
+                collect(marketplace, result)
+        else:
+            # Search in preference order and skip the remaining marketplaces
+            # once enough listings are in
+            for i, marketplace in enumerate(labels):
+                try:
+                    result = await search_fns[marketplace](product_name, limit=5)
+                except Exception as e:
+                    result = e
+                collect(marketplace, result)
+                if len(all_listings) >= max_total:
+                    for skipped in labels[i + 1:]:
+                        marketplace_summary[skipped] = {"count": 0, "status": "skipped"}
+                    break
+
+        # Marketplaces often return the same product twice (tracking params, variants)
+        all_listings = _dedupe_listings(all_listings)
+        if max_total is not None:
+            all_listings = all_listings[:max_total]
 
         if not all_listings:
             return {
@@ -374,66 +767,25 @@ Only include real product listings. Do not make up data."""
                     "seller_name": l.get("seller_name"),
                     "is_available": l.get("availability", "unknown").lower() == "in_stock"
                 } for l in all_listings],
-                "results_by_marketplace": {
-                    k: {"count": len(v.get("listings", [])), "status": v.get("status", "unknown")}
-                    for k, v in results_by_marketplace.items()
-                }
+                "results_by_marketplace": marketplace_summary
             }
 
-        # Store listings in database
-        stored_count = 0
-        stored_listings = []
-
-        for listing_data in all_listings:
-            try:
-                # Map availability string to boolean
-                availability_str = listing_data.get("availability", "unknown").lower()
-                is_available = availability_str == "in_stock"
-
-                # Convert seller_rating to Decimal if it's a percentage (for eBay)
-                seller_rating = listing_data.get("seller_rating")
-                if seller_rating and seller_rating > 5:
-                    # eBay uses percentage ratings, convert to 5-star scale
-                    seller_rating = seller_rating / 20.0  # 100% -> 5.0
-
-                # Create listing record with correct column names matching the DB schema
-                listing = MarketplaceListing(
-                    product_id=product_id,
-                    marketplace_name=listing_data.get("marketplace", "unknown"),
-                    country_code=country,
-                    listing_url=listing_data.get("url", ""),
-                    price_current=Decimal(str(listing_data.get("price", 0))) if listing_data.get("price") else None,
-                    price_original=Decimal(str(listing_data.get("original_price", 0))) if listing_data.get("original_price") else None,
-                    currency=listing_data.get("currency", "USD"),
-                    is_available=is_available,
-                    seller_name=listing_data.get("seller_name"),
-                    seller_rating=Decimal(str(seller_rating)) if seller_rating else None,
-                    shipping_info=listing_data.get("shipping_info"),
-                    listing_metadata={
-                        "title": listing_data.get("title"),
-                        "review_count": listing_data.get("review_count"),
-                        "is_best_seller": listing_data.get("is_best_seller", False),
-                        "image_url": listing_data.get("image_url"),
-                        "scraped_at": datetime.now(timezone.utc).isoformat()
-                    },
-                    last_checked=datetime.now(timezone.utc)
-                )
-
-                db.add(listing)
-                stored_count += 1
-                stored_listings.append({
-                    "marketplace": listing_data.get("marketplace"),
-                    "title": listing_data.get("title"),
-                    "price": listing_data.get("price"),
-                    "url": listing_data.get("url")
-                })
-
-            except Exception as e:
-                logger.error(f"Error storing listing: {e}")
-                continue
-
-        # Commit changes
+        # Store listings in database (one timestamp for the whole batch)
+        rows, stored = _build_listing_rows(
+            all_listings, product_id, country, datetime.now(timezone.utc)
+        )
+        stored_listings = [{
+            "marketplace": l.get("marketplace"),
+            "title": l.get("title"),
+            "price": l.get("price"),
+            "url": l.get("url")
+        } for l in stored]
+
+        # Core executemany: one multi-row INSERT, no ORM unit-of-work per listing
+        if rows:
+            await db.execute(insert(MarketplaceListing), rows)
         await db.commit()
+        stored_count = len(rows)
 
         logger.info(f"Stored {stored_count} listings for '{product_name}'")
 
@@ -445,10 +797,7 @@ Only include real product listings. Do not make up data."""
             "listings_found": len(all_listings),
             "listings_stored": stored_count,
             "listings": stored_listings,
-            "results_by_marketplace": {
-                k: {"count": len(v.get("listings", [])), "status": v.get("status", "unknown")}
-                for k, v in results_by_marketplace.items()
-            }
+            "results_by_marketplace": marketplace_summary
         }
 
 
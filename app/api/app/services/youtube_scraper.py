@@ -1,25 +1,211 @@
 """YouTube scraper service using Gemini with Google Search grounding."""
 
+import asyncio
+import hashlib
 import re
 import json
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timezone
 from urllib.parse import urlparse, parse_qs
 
+import orjson
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from app.core.config import settings
+from app.core.llm import get_genai_client
 from app.core.logging import get_logger
+from app.models.product import Product
 from app.models.reviewer import Reviewer, Platform
 from app.models.review import Review, ReviewType, ProcessingStatus
 from app.models.opinion import Opinion
 from app.crud.reviewer import reviewer_crud
 from app.crud.review import review_crud
 from app.crud.product import product_crud
+from app.services.cache_service import LRUCache, cache
+
+try:
+    import json5
+except ImportError:  # pragma: no cover - optional dependency
+    json5 = None
 
 logger = get_logger(__name__)
 
+# Bump when the scrape/analysis prompts change so cached responses are not reused
+PROMPT_VERSION = 5
+
+
+class VideoOpinion(BaseModel):
+    """A single aspect-level opinion extracted from a video review."""
+
+    aspect: str = Field(description="The product aspect being discussed (e.g., camera, battery, display, performance, build quality, value, software)")
+    sentiment: float = Field(description="A score from -1.0 (very negative) to 1.0 (very positive)")
+    confidence: float = Field(description="How confident you are in this extraction (0.0 to 1.0)")
+    quote: Optional[str] = Field(None, description="A relevant quote or paraphrase from the content")
+    summary: Optional[str] = Field(None, description="Brief summary of the opinion")
+
+
+class ScrapedVideo(BaseModel):
+    """Response schema for the grounded YouTube video scrape."""
+
+    title: Optional[str] = Field(None, description="Video title")
+    channel_name: Optional[str] = Field(None, description="The YouTube channel that uploaded this video")
+    channel_url: Optional[str] = Field(None, description="Channel URL")
+    channel_id: Optional[str] = Field(None, description="Channel ID, extracted from the channel URL if possible")
+    view_count: Optional[int] = Field(None, description="Approximate view count")
+    like_count: Optional[int] = Field(None, description="Approximate like count")
+    publish_date: Optional[str] = Field(None, description="Publish or upload date as YYYY-MM-DD")
+    duration_seconds: Optional[int] = Field(None, description="Video duration in seconds")
+    description_summary: Optional[str] = Field(None, description="Summary of the video description")
+    transcript_summary: Optional[str] = Field(None, description="Summary of the video content")
+    products_mentioned: List[str] = Field(default_factory=list, description="Products reviewed or mentioned")
+    key_points: List[str] = Field(default_factory=list, description="Key points discussed in the video")
+    recommendation: Optional[str] = Field(None, description="One of: positive, negative, neutral, mixed")
+    overall_rating: Optional[float] = Field(None, description="Overall rating on a 0-10 scale, only if the reviewer gives one")
+    cons: List[str] = Field(default_factory=list, description="Negative points raised in the video")
+    opinions: List[VideoOpinion] = Field(default_factory=list, description="Aspect-level opinions stated in the video")
+    raw_content: Optional[str] = Field(None, description="Any detailed transcript or content you can find")
+
+
+class VideoReviewAnalysis(BaseModel):
+    """Response schema for YouTube review analysis."""
+
+    product_name: Optional[str] = Field(None, description="Product being reviewed, with model numbers if mentioned")
+    product_brand: Optional[str] = Field(None, description="Brand name")
+    product_category: Optional[str] = Field(None, description="Category: smartphones, laptops, headphones, tablets, smartwatches, cameras, monitors, keyboards, mice, or other")
+    overall_rating: Optional[float] = Field(None, description="Overall rating on a 0-10 scale")
+    recommendation: Optional[str] = Field(None, description="One of: buy, conditional_buy, dont_buy, neutral")
+    review_type: Optional[str] = Field(None, description="One of: full_review, quick_look, comparison, long_term, unboxing")
+    summary: Optional[str] = Field(None, description="2-3 sentence summary of the review")
+    pros: List[str] = Field(default_factory=list, description="Positive points")
+    cons: List[str] = Field(default_factory=list, description="Negative points")
+    opinions: List[VideoOpinion] = Field(default_factory=list)
+
+
+# Static instructions for the video scrape; the request itself carries only the URL
+VIDEO_SCRAPE_INSTRUCTIONS = """Search for information about the YouTube video you are given.
+
+I need you to find and provide the following information:
+1. Video title
+2. Channel name (the YouTube channel that uploaded this video)
+3. Channel URL
+4. Approximate view count (if available)
+5. Approximate like count (if available)
+6. Publish date or upload date
+7. Video description summary
+8. Video duration (if available)
+
+Additionally, search for the transcript or detailed content summary of this video. If this is a tech product review, I need:
+- What product(s) are being reviewed
+- Key points discussed in the video
+- Any ratings or recommendations given
+- Negative points and per-aspect opinions (camera, battery, display, ...), if the content states them
+
+If you cannot find specific information, leave that field null.
+"""
+
+# Static instructions for review analysis, sent as the system instruction so
+# the per-video content is the only part of the request that varies
+REVIEW_ANALYSIS_INSTRUCTIONS = """Analyze the tech product review content you are given and extract structured information.
+
+Please analyze this review and provide:
+1. Product name being reviewed (be specific with model numbers if mentioned)
+2. Overall rating or score (convert to 0-10 scale if possible)
+3. Overall recommendation (buy/don't buy/conditional)
+4. List of pros (positive points)
+5. List of cons (negative points)
+6. Detailed opinions by aspect (camera, battery, display, performance, build quality, value, software, etc.)
+
+For each opinion, provide:
+- aspect: The product aspect being discussed
+- sentiment: A score from -1.0 (very negative) to 1.0 (very positive)
+- confidence: How confident you are in this extraction (0.0 to 1.0)
+- quote: A relevant quote or paraphrase from the content
+- summary: Brief summary of the opinion
+
+Also determine the review type:
+- full_review: Complete, detailed review
+- quick_look: Brief first impressions
+- comparison: Comparing multiple products
+- long_term: Long-term usage review
+- unboxing: Unboxing video
+"""
+
+# Scrape sentiment -> analysis recommendation, for reviews promoted without analysis
+_SCRAPE_RECOMMENDATIONS = {
+    "positive": "buy",
+    "mixed": "conditional_buy",
+    "negative": "dont_buy",
+    "neutral": "neutral",
+}
+
+# watch?v=, /v/, youtu.be/ and embed/ URL formats in one pass
+_VIDEO_ID_RE = re.compile(r"(?:v=|/v/|youtu\.be/|embed/)([a-zA-Z0-9_-]{11})")
+_JSON_DECODER = json.JSONDecoder()
+# Leading YYYY-MM-DD of a publish date; "2024" or "Jan 2024" simply don't match
+_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+# Text longer than this is parsed or hashed off the event loop
+_OFFLOAD_CHARS = 100_000
+
+
+def _find_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Parse the first JSON object in text, or return None if there is none.
+
+    The common case (one object, maybe fenced) is parsed with orjson. Trailing
+    prose containing braces falls back to raw_decode, which stops at the end
+    of the first balanced object; malformed output (trailing commas, single
+    quotes) falls back to json5. Raises json.JSONDecodeError if all fail.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    span = text[start:text.rfind("}") + 1]
+    try:
+        return orjson.loads(span)
+    except orjson.JSONDecodeError:
+        pass
+    try:
+        return _JSON_DECODER.raw_decode(text, start)[0]
+    except json.JSONDecodeError:
+        if json5 is None:
+            raise
+    try:
+        data = json5.loads(span)
+    except ValueError as e:
+        raise json.JSONDecodeError(str(e), span, 0) from e
+    logger.info("Parsed malformed JSON response with json5 fallback")
+    return data
+
+
+def _parse_publish_date(value: Any) -> Optional[datetime]:
+    """Parse the date part of a YYYY-MM-DD[...] publish date as UTC, else None."""
+    match = _DATE_RE.match(value) if isinstance(value, str) else None
+    if not match:
+        return None
+    try:
+        return datetime(int(match[1]), int(match[2]), int(match[3]), tzinfo=timezone.utc)
+    except ValueError:  # Out-of-range month or day
+        return None
+
+
+def _response_cache_key(kind: str, prompt: str) -> str:
+    """Cache key for a Gemini response to prompt.
+
+    Hashes the exact prompt rather than using cache.hash_key, which lowercases
+    its input: video IDs are case-sensitive.
+    """
+    digest = hashlib.sha256(f"v{PROMPT_VERSION}:{settings.LLM_MODEL}:{prompt}".encode()).hexdigest()
+    return f"youtube_{kind}:{digest}"
+
+
+async def _parse_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """_find_json_object, run in a worker thread for very large responses."""
+    if len(text) > _OFFLOAD_CHARS:
+        return await asyncio.to_thread(_find_json_object, text)
+    return _find_json_object(text)
+
 
 class YouTubeScraperService:
     """
@@ -34,6 +220,11 @@ class YouTubeScraperService:
     def __init__(self):
         """Initialize the scraper with Gemini model configured for grounding."""
         self.client = None
+        # video_url -> id of the already-ingested Review, for idempotent re-ingests.
+        # Entries expire so a deleted or rolled-back review is not reported forever
+        self._review_ids = LRUCache(maxsize=2048, ttl=settings.CACHE_REVIEW_ID_TTL)
+        # video_url -> future of the ingestion currently running for it
+        self._inflight: Dict[str, asyncio.Future] = {}
         self._init_gemini()
 
     def _init_gemini(self):
@@ -43,30 +234,47 @@ class YouTubeScraperService:
             return
 
         try:
-            from google import genai
-            # Initialize the new genai client
-            self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
+            self.client = get_genai_client()
             logger.info("YouTube scraper Gemini client initialized successfully")
 
         except Exception as e:
             logger.error(f"Failed to initialize Gemini client for scraper: {e}", exc_info=True)
             self.client = None
 
+    async def _generate_text(
+        self,
+        kind: str,
+        prompt: str,
+        config: Any = None
+    ) -> str:
+        """Return Gemini's response text for prompt, served from cache when possible.
+
+        Responses are cached by prompt hash (plus model and PROMPT_VERSION), so
+        re-ingesting the same video skips the Gemini round-trip entirely.
+        """
+        if len(prompt) > _OFFLOAD_CHARS:
+            # Hashing a long transcript would stall the event loop
+            cache_key = await asyncio.to_thread(_response_cache_key, kind, prompt)
+        else:
+            cache_key = _response_cache_key(kind, prompt)
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        response = await self.client.aio.models.generate_content(
+            model=settings.LLM_MODEL,
+            contents=prompt,
+            config=config
+        )
+        response_text = response.text or ""
+        if response_text:
+            await cache.set(cache_key, response_text, ttl=settings.CACHE_YOUTUBE_TTL)
+        return response_text
+
     def _extract_video_id(self, video_url: str) -> Optional[str]:
         """Extract YouTube video ID from various URL formats."""
-        # Handle different YouTube URL formats
-        patterns = [
-            r'(?:v=|/v/|youtu\.be/)([a-zA-Z0-9_-]{11})',
-            r'(?:embed/)([a-zA-Z0-9_-]{11})',
-            r'(?:watch\?.*v=)([a-zA-Z0-9_-]{11})',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, video_url)
-            if match:
-                return match.group(1)
-
-        return None
+        match = _VIDEO_ID_RE.search(video_url)
+        return match.group(1) if match else None
 
     async def scrape_youtube_video(self, video_url: str) -> Dict[str, Any]:
         """
@@ -87,58 +295,21 @@ class YouTubeScraperService:
 
         logger.info(f"Scraping YouTube video: {video_id}")
 
-        # Prompt for Gemini to search and extract video information
-        scrape_prompt = f"""
-Search for information about this YouTube video: {video_url}
-
-I need you to find and provide the following information:
-1. Video title
-2. Channel name (the YouTube channel that uploaded this video)
-3. Channel URL
-4. Approximate view count (if available)
-5. Approximate like count (if available)
-6. Publish date or upload date
-7. Video description summary
-8. Video duration (if available)
-
-Additionally, search for the transcript or detailed content summary of this video. If this is a tech product review, I need:
-- What product(s) are being reviewed
-- Key points discussed in the video
-- Any ratings or recommendations given
-
-Please provide the information in a structured format. If you cannot find specific information, indicate that it was not found.
-
-Format your response as JSON with the following structure:
-{{
-    "video_id": "{video_id}",
-    "title": "...",
-    "channel_name": "...",
-    "channel_url": "...",
-    "channel_id": "...",  // Extract from channel URL if possible
-    "view_count": number or null,
-    "like_count": number or null,
-    "publish_date": "YYYY-MM-DD" or null,
-    "duration_seconds": number or null,
-    "description_summary": "...",
-    "transcript_summary": "...",  // Summary of the video content
-    "products_mentioned": ["product1", "product2"],
-    "key_points": ["point1", "point2", ...],
-    "recommendation": "positive/negative/neutral/mixed" or null,
-    "raw_content": "..."  // Any detailed transcript or content you can find
-}}
-"""
+        scrape_prompt = f"YouTube video: {video_url}"
 
         try:
             from google.genai import types
             # Use the new SDK with Google Search grounding
-            response = await self.client.aio.models.generate_content(
-                model=settings.LLM_MODEL,
-                contents=scrape_prompt,
+            response_text = await self._generate_text(
+                "scrape",
+                scrape_prompt,
                 config=types.GenerateContentConfig(
-                    tools=[types.Tool(google_search=types.GoogleSearch())]
+                    system_instruction=VIDEO_SCRAPE_INSTRUCTIONS,
+                    tools=[types.Tool(google_search=types.GoogleSearch())],
+                    response_mime_type="application/json",
+                    response_schema=ScrapedVideo
                 )
             )
-            response_text = response.text or ""
 
             # Check if we got a valid response
             if not response_text:
@@ -153,9 +324,10 @@ Format your response as JSON with the following structure:
                 }
 
             # Try to extract JSON from the response
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                video_data = json.loads(json_match.group())
+            video_data = await _parse_json_object(response_text)
+            if video_data is not None:
+                # Omit unset fields so .get() defaults (channel_name, ...) still apply
+                video_data = ScrapedVideo.model_validate(video_data).model_dump(exclude_none=True)
             else:
                 # If no JSON found, create a basic structure from the response
                 video_data = {
@@ -183,7 +355,7 @@ Format your response as JSON with the following structure:
             logger.info(f"Successfully scraped video: {video_data.get('title', 'Unknown')}")
             return video_data
 
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, ValidationError) as e:
             logger.warning(f"Failed to parse JSON response: {e}")
             return {
                 "video_id": video_id,
@@ -236,65 +408,20 @@ Format your response as JSON with the following structure:
                 "opinions": []
             }
 
-        analysis_prompt = f"""
-Analyze the following tech product review content and extract structured information.
-
-CONTENT:
-{content_text}
-
-Please analyze this review and provide:
-1. Product name being reviewed (be specific with model numbers if mentioned)
-2. Overall rating or score (convert to 0-10 scale if possible)
-3. Overall recommendation (buy/don't buy/conditional)
-4. List of pros (positive points)
-5. List of cons (negative points)
-6. Detailed opinions by aspect (camera, battery, display, performance, build quality, value, software, etc.)
-
-For each opinion, provide:
-- aspect: The product aspect being discussed
-- sentiment: A score from -1.0 (very negative) to 1.0 (very positive)
-- confidence: How confident you are in this extraction (0.0 to 1.0)
-- quote: A relevant quote or paraphrase from the content
-- summary: Brief summary of the opinion
-
-Also determine the review type:
-- full_review: Complete, detailed review
-- quick_look: Brief first impressions
-- comparison: Comparing multiple products
-- long_term: Long-term usage review
-- unboxing: Unboxing video
-
-Format your response as JSON:
-{{
-    "product_name": "...",
-    "product_brand": "...",
-    "product_category": "smartphones/laptops/headphones/tablets/smartwatches/cameras/monitors/keyboards/mice/other",
-    "overall_rating": number (0-10) or null,
-    "recommendation": "buy/conditional_buy/dont_buy/neutral",
-    "review_type": "full_review/quick_look/comparison/long_term/unboxing",
-    "summary": "2-3 sentence summary of the review",
-    "pros": ["pro1", "pro2", ...],
-    "cons": ["con1", "con2", ...],
-    "opinions": [
-        {{
-            "aspect": "camera",
-            "sentiment": 0.8,
-            "confidence": 0.9,
-            "quote": "...",
-            "summary": "..."
-        }},
-        ...
-    ]
-}}
-"""
+        analysis_prompt = f"CONTENT:\n{content_text}"
 
         try:
+            from google.genai import types
             # Use the new SDK for analysis (no grounding needed)
-            response = await self.client.aio.models.generate_content(
-                model=settings.LLM_MODEL,
-                contents=analysis_prompt
+            response_text = await self._generate_text(
+                "analyze",
+                analysis_prompt,
+                config=types.GenerateContentConfig(
+                    system_instruction=REVIEW_ANALYSIS_INSTRUCTIONS,
+                    response_mime_type="application/json",
+                    response_schema=VideoReviewAnalysis
+                )
             )
-            response_text = response.text or ""
 
             # Check if we got a valid response
             if not response_text:
@@ -310,9 +437,9 @@ Format your response as JSON:
                 }
 
             # Extract JSON from response
-            json_match = re.search(r'\{[\s\S]*\}', response_text)
-            if json_match:
-                review_data = json.loads(json_match.group())
+            review_data = await _parse_json_object(response_text)
+            if review_data is not None:
+                review_data = VideoReviewAnalysis.model_validate(review_data).model_dump(exclude_none=True)
             else:
                 review_data = {
                     "error": "Failed to extract structured review data",
@@ -322,7 +449,7 @@ Format your response as JSON:
             logger.info(f"Extracted review data for product: {review_data.get('product_name', 'Unknown')}")
             return review_data
 
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, ValidationError) as e:
             logger.warning(f"Failed to parse review analysis JSON: {e}")
             return {
                 "error": "Failed to parse review analysis",
@@ -349,26 +476,79 @@ Format your response as JSON:
         Returns:
             Dictionary containing the created Review and related data
         """
-        logger.info(f"Starting YouTube review ingestion for: {video_url}")
+        # Concurrent requests for the same URL share one pipeline run instead
+        # of each paying for the Gemini calls and racing on the insert
+        inflight = self._inflight.get(video_url)
+        if inflight is not None:
+            logger.info(f"Joining in-flight ingestion for URL: {video_url}")
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[video_url] = future
+        try:
+            result = await self._ingest_youtube_review(db, video_url, product_id)
+        except BaseException as e:
+            if not future.done():
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    future.exception()  # Mark retrieved when no one joined
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(video_url, None)
 
-        # Check if review already exists
-        existing_review = await review_crud.get_by_platform_url(db, video_url)
-        if existing_review:
+    async def _ingest_youtube_review(
+        self,
+        db: AsyncSession,
+        video_url: str,
+        product_id: Optional[int]
+    ) -> Dict[str, Any]:
+        """Run the ingestion pipeline for one URL (see ingest_youtube_review)."""
+        # Check if review already exists (hot URLs skip the DB round-trip)
+        review_id = self._review_ids.get(video_url)
+        if review_id is None:
+            existing_review = await review_crud.get_by_platform_url(db, video_url)
+            if existing_review:
+                review_id = existing_review.id
+                self._review_ids.set(video_url, review_id)
+        if review_id is not None:
             logger.info(f"Review already exists for URL: {video_url}")
             return {
                 "status": "exists",
                 "message": "Review already ingested",
-                "review_id": existing_review.id
+                "review_id": review_id
             }
 
+        logger.info(f"Starting YouTube review ingestion for: {video_url}")
+
         # Step 1: Scrape video information
         video_content = await self.scrape_youtube_video(video_url)
 
         if video_content.get("error"):
             logger.warning(f"Scraping returned error: {video_content['error']}")
 
-        # Step 2: Extract structured review data
-        review_data = await self.extract_review_data(video_content)
+        # Step 2: Extract structured review data, looking up the channel's
+        # reviewer meanwhile. The lookup is read-only, so nothing is written if
+        # extraction fails, and it is the only branch using the session.
+        # A well-populated scrape is used as-is, skipping the analysis call.
+        platform_id = self._reviewer_platform_id(video_content)
+        review_data = self._review_data_from_scrape(video_content)
+        if review_data is not None:
+            logger.info(f"Using scraped review fields without analysis for: {video_url}")
+            reviewer = await reviewer_crud.get_by_platform_id(db, platform_id)
+        else:
+            review_data, reviewer = await asyncio.gather(
+                self.extract_review_data(video_content),
+                reviewer_crud.get_by_platform_id(db, platform_id),
+                return_exceptions=True
+            )
+            for outcome in (review_data, reviewer):
+                if isinstance(outcome, BaseException):
+                    raise outcome
 
         if review_data.get("error") and not review_data.get("product_name"):
             return {
@@ -377,8 +557,9 @@ Format your response as JSON:
                 "video_content": video_content
             }
 
-        # Step 3: Create or get Reviewer
-        reviewer = await self._get_or_create_reviewer(db, video_content)
+        # Step 3: Create the Reviewer if this channel is new
+        if reviewer is None:
+            reviewer = await self._create_reviewer(db, video_content, platform_id)
 
         # Step 4: Get or create Product if not provided
         if not product_id and review_data.get("product_name"):
@@ -408,6 +589,7 @@ Format your response as JSON:
             # Get the existing review that was inserted
             existing_review = await review_crud.get_by_platform_url(db, video_url)
             if existing_review:
+                self._review_ids.set(video_url, existing_review.id)
                 logger.info(f"Review already exists (race condition): {video_url}")
                 return {
                     "status": "exists",
@@ -419,7 +601,7 @@ Format your response as JSON:
                 raise
 
         # Step 6: Create Opinion records
-        opinions = await self._create_opinions(db, review.id, review_data.get("opinions", []))
+        opinions_count = await self._create_opinions(db, review.id, review_data.get("opinions", []))
 
         # Step 7: Update reviewer stats
         await self._update_reviewer_stats(db, reviewer)
@@ -429,6 +611,7 @@ Format your response as JSON:
 
         # Commit all changes
         await db.commit()
+        self._review_ids.set(video_url, review.id)
 
         logger.info(f"Successfully ingested review {review.id} for product {product_id}")
 
@@ -439,53 +622,74 @@ Format your response as JSON:
             "reviewer_id": reviewer.id,
             "product_id": product_id,
             "product_name": review_data.get("product_name"),
-            "opinions_count": len(opinions),
+            "opinions_count": opinions_count,
             "summary": review_data.get("summary")
         }
 
-    async def _get_or_create_reviewer(
-        self,
-        db: AsyncSession,
-        video_content: Dict[str, Any]
-    ) -> Reviewer:
-        """Get existing reviewer or create a new one."""
+    @staticmethod
+    def _review_data_from_scrape(video_content: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build review data from the scrape's own fields, or None if they are incomplete.
+
+        The scrape routinely fills products, key points and a sentiment, so it
+        only stands in for the analysis when it also carries opinions, cons and
+        a rating; anything less would store a review stripped of those.
+        """
+        products = video_content.get("products_mentioned")
+        key_points = video_content.get("key_points")
+        recommendation = _SCRAPE_RECOMMENDATIONS.get(video_content.get("recommendation"))
+        opinions = video_content.get("opinions")
+        cons = video_content.get("cons")
+        rating = video_content.get("overall_rating")
+        if not (products and key_points and recommendation and opinions and cons) or rating is None:
+            return None
+
+        return {
+            "product_name": products[0],
+            "overall_rating": rating,
+            "summary": video_content.get("transcript_summary") or video_content.get("description_summary"),
+            "recommendation": recommendation,
+            "review_type": "full_review",
+            "pros": key_points,
+            "cons": cons,
+            "opinions": opinions
+        }
+
+    @staticmethod
+    def _reviewer_platform_id(video_content: Dict[str, Any]) -> str:
+        """Derive the reviewer's platform_id from the scraped channel info."""
         channel_id = video_content.get("channel_id")
-        channel_name = video_content.get("channel_name", "Unknown Channel")
         channel_url = video_content.get("channel_url")
 
-        # Generate a platform_id from channel info
         if channel_id:
-            platform_id = channel_id
-        elif channel_url:
+            return channel_id
+        if channel_url:
             # Extract ID from URL if possible
-            platform_id = channel_url.rstrip("/").split("/")[-1]
-        else:
-            # Use channel name as fallback (not ideal but functional)
-            platform_id = channel_name.lower().replace(" ", "_")
-
-        # Check if reviewer exists
-        existing_reviewer = await reviewer_crud.get_by_platform_id(db, platform_id)
-        if existing_reviewer:
-            return existing_reviewer
-
-        # Create new reviewer
-        reviewer = Reviewer(
-            name=channel_name,
-            platform=Platform.YOUTUBE,
-            platform_id=platform_id,
-            profile_url=channel_url,
-            description=f"YouTube tech reviewer - {channel_name}",
-            credibility_score=0.5,  # Default score for new reviewers
-            is_active=True,
-            is_verified=False,
-            stats={}
-        )
-
-        db.add(reviewer)
-        await db.flush()
-        await db.refresh(reviewer)
+            return channel_url.rstrip("/").split("/")[-1]
+        # Use channel name as fallback (not ideal but functional)
+        channel_name = video_content.get("channel_name", "Unknown Channel")
+        return channel_name.lower().replace(" ", "_")
 
-        logger.info(f"Created new reviewer: {reviewer.name} (ID: {reviewer.id})")
+    async def _create_reviewer(
+        self,
+        db: AsyncSession,
+        video_content: Dict[str, Any],
+        platform_id: str
+    ) -> Reviewer:
+        """Create the reviewer for the video's channel (atomic upsert on platform_id)."""
+        channel_name = video_content.get("channel_name", "Unknown Channel")
+        reviewer = await reviewer_crud.upsert_by_platform_id(db, {
+            "name": channel_name,
+            "platform": Platform.YOUTUBE,
+            "platform_id": platform_id,
+            "profile_url": video_content.get("channel_url"),
+            "description": f"YouTube tech reviewer - {channel_name}",
+            "credibility_score": 0.5,  # Default score for new reviewers
+            "is_active": True,
+            "is_verified": False,
+            "stats": {}
+        })
+
+        logger.info(f"Upserted reviewer: {reviewer.name} (ID: {reviewer.id})")
         return reviewer
 
     async def _get_or_create_product(
@@ -494,13 +698,14 @@ Format your response as JSON:
         review_data: Dict[str, Any]
     ):
         """Get existing product or create a new one based on review data."""
-        from app.models.product import Product
-
         product_name = review_data.get("product_name")
         if not product_name:
             return None
 
-        # Search for existing product
+        # Exact name first; fall back to the (trigram-indexed) fuzzy search
+        product = await product_crud.get_by_name(db, product_name)
+        if product:
+            return product
         products = await product_crud.search(db, query=product_name, limit=1)
         if products:
             return products[0]
@@ -518,7 +723,6 @@ Format your response as JSON:
 
         db.add(product)
         await db.flush()
-        await db.refresh(product)
 
         logger.info(f"Created new product: {product.name} (ID: {product.id})")
         return product
@@ -532,13 +736,7 @@ Format your response as JSON:
         product_id: int
     ) -> Review:
         """Create a new Review record."""
-        # Parse publish date
-        publish_date = None
-        if video_content.get("publish_date"):
-            try:
-                publish_date = datetime.fromisoformat(video_content["publish_date"])
-            except (ValueError, TypeError):
-                pass
+        publish_date = _parse_publish_date(video_content.get("publish_date"))
 
         # Map review type
         review_type_map = {
@@ -592,7 +790,6 @@ Format your response as JSON:
 
         db.add(review)
         await db.flush()
-        await db.refresh(review)
 
         logger.info(f"Created review: {review.id} for product {product_id}")
         return review
@@ -602,65 +799,51 @@ Format your response as JSON:
         db: AsyncSession,
         review_id: int,
         opinions_data: List[Dict[str, Any]]
-    ) -> List[Opinion]:
+    ) -> int:
         """Create Opinion records from extracted opinions."""
-        opinions = []
-
-        for opinion_data in opinions_data:
-            opinion = Opinion(
-                review_id=review_id,
-                aspect=opinion_data.get("aspect", "general"),
-                sentiment=float(opinion_data.get("sentiment", 0.0)),
-                confidence=float(opinion_data.get("confidence", 0.5)),
-                quote=opinion_data.get("quote"),
-                summary=opinion_data.get("summary")
-            )
-            db.add(opinion)
-            opinions.append(opinion)
-
-        if opinions:
-            await db.flush()
-            logger.info(f"Created {len(opinions)} opinions for review {review_id}")
-
-        return opinions
+        rows = [{
+            "review_id": review_id,
+            "aspect": opinion_data.get("aspect", "general"),
+            "sentiment": float(opinion_data.get("sentiment", 0.0)),
+            "confidence": float(opinion_data.get("confidence", 0.5)),
+            "quote": opinion_data.get("quote"),
+            "summary": opinion_data.get("summary")
+        } for opinion_data in opinions_data]
+
+        # Core executemany: one multi-row INSERT, no ORM unit-of-work per opinion
+        if rows:
+            await db.execute(insert(Opinion), rows)
+            logger.info(f"Created {len(rows)} opinions for review {review_id}")
+
+        return len(rows)
 
     async def _update_reviewer_stats(self, db: AsyncSession, reviewer: Reviewer):
-        """Update reviewer's total review count."""
-        from sqlalchemy import select, func
-
-        result = await db.execute(
-            select(func.count()).where(Review.reviewer_id == reviewer.id)
+        """Update reviewer's total review count in one UPDATE."""
+        await db.execute(
+            update(Reviewer)
+            .where(Reviewer.id == reviewer.id)
+            .values(
+                total_reviews=select(func.count(Review.id))
+                .where(Review.reviewer_id == reviewer.id)
+                .scalar_subquery()
+            )
         )
-        review_count = result.scalar() or 0
-
-        reviewer.total_reviews = review_count
-        db.add(reviewer)
 
     async def _update_product_stats(self, db: AsyncSession, product_id: int):
-        """Update product's review count and average rating."""
-        from sqlalchemy import select, func
-        from app.models.product import Product
-
-        # Get review count
-        count_result = await db.execute(
-            select(func.count()).where(Review.product_id == product_id)
-        )
-        review_count = count_result.scalar() or 0
-
-        # Get average rating
-        avg_result = await db.execute(
-            select(func.avg(Review.overall_rating))
-            .where(Review.product_id == product_id)
-            .where(Review.overall_rating.isnot(None))
+        """Update product's review count and average rating in one UPDATE."""
+        await db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(
+                review_count=select(func.count(Review.id))
+                .where(Review.product_id == product_id)
+                .scalar_subquery(),
+                # NULL when no review has a rating
+                average_rating=select(func.avg(Review.overall_rating))
+                .where(Review.product_id == product_id)
+                .scalar_subquery(),
+            )
         )
-        avg_rating = avg_result.scalar()
-
-        # Update product
-        product = await product_crud.get(db, id=product_id)
-        if product:
-            product.review_count = review_count
-            product.average_rating = float(avg_rating) if avg_rating else None
-            db.add(product)
 
 
 # Singleton instance
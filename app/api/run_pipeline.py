@@ -14,16 +14,50 @@ Usage:
   python run_pipeline.py "Samsung Galaxy S25"
   python run_pipeline.py "iPhone 16 Pro" --youtube-limit 5 --blog-limit 3
   python run_pipeline.py "Pixel 9" --skip-marketplace
+  python run_pipeline.py "Pixel 9" --max-concurrent-ingests 5
   python run_pipeline.py "MacBook Pro M4" --db-host localhost
 """
 
 import argparse
 import asyncio
 import json
+import re
 import sys
+import textwrap
 import time
 import os
 
+from app.core.config import settings
+
+
+# Host part of DATABASE_URL (between the credentials' "@" and the port)
+_DB_HOST_RE = re.compile(r"@[^:]+:")
+
+
+# Bound by _load_pipeline(): importing app.db.session creates the engine, so
+# the --db-host override has to be applied first
+AsyncSessionLocal = None
+execute_function = None
+cache = None
+
+
+def _load_pipeline(db_host: str | None = None) -> None:
+    """Apply the DB host override, then import the engine and registered functions.
+
+    Only the first call has an effect; once the engine exists its URL is fixed.
+    """
+    global AsyncSessionLocal, execute_function, cache
+    if AsyncSessionLocal is not None:
+        return
+    if db_host:
+        settings.DATABASE_URL = _DB_HOST_RE.sub(f"@{db_host}:", settings.DATABASE_URL, count=1)
+
+    from app.db.session import AsyncSessionLocal
+    from app.functions.registry import execute_function
+    import app.functions.review_tools  # noqa: F401 — triggers @register_function
+    from app.services.cache_service import cache
+
+
 # ── ANSI colors ──────────────────────────────────────────────────────────────
 
 BOLD = "\033[1m"
@@ -41,6 +75,16 @@ if not sys.stdout.isatty():
     BOLD = DIM = RED = GREEN = YELLOW = BLUE = MAGENTA = CYAN = RESET = ""
 
 
+# Summary text: ~65 chars per line after a 4-space indent
+_SUMMARY_WRAPPER = textwrap.TextWrapper(
+    width=4 + 65,
+    initial_indent=" " * 4,
+    subsequent_indent=" " * 4,
+    break_long_words=False,
+    break_on_hyphens=False,
+)
+
+
 def header(step: int, total: int, title: str):
     print(f"\n{'─' * 70}")
     print(f"{BOLD}{CYAN}[Step {step}/{total}]{RESET} {BOLD}{title}{RESET}")
@@ -83,29 +127,33 @@ def print_json_compact(data, indent=4):
 
 # ── Pipeline ─────────────────────────────────────────────────────────────────
 
+async def _execute_in_session(session_factory, name: str, args: dict) -> dict:
+    """Run one registered function on its own session, so calls can run concurrently.
+
+    Failures are returned as ``{"error": ...}`` like the functions' own errors,
+    so one failing provider doesn't abort the others.
+    """
+    async with session_factory() as db:
+        try:
+            result = await execute_function(db, name, args)
+            await db.commit()
+            return result
+        except Exception as e:
+            await db.rollback()
+            return {"error": str(e)}
+
+
 async def run_pipeline(
     product_name: str,
     youtube_limit: int = 3,
     blog_limit: int = 2,
     skip_marketplace: bool = False,
+    max_concurrent_ingests: int = 3,
     db_host: str | None = None,
 ):
     """Run the full review scraping pipeline."""
 
-    # ── 0. Setup ─────────────────────────────────────────────────────────────
-
-    # Override DB host before importing session (engine is created at import time)
-    if db_host:
-        from app.core.config import settings as _settings
-        original_url = _settings.DATABASE_URL
-        import re as _re
-        new_url = _re.sub(r"@[^:]+:", f"@{db_host}:", original_url)
-        _settings.DATABASE_URL = new_url
-        print(f"{DIM}DB host overridden: {new_url}{RESET}")
-
-    from app.db.session import AsyncSessionLocal
-    from app.functions.registry import execute_function
-    import app.functions.review_tools  # noqa: F401 — triggers @register_function
+    _load_pipeline(db_host)
 
     total_steps = 6 if skip_marketplace else 7
     pipeline_start = time.time()
@@ -114,11 +162,16 @@ async def run_pipeline(
     ingested_reviews: list[dict] = []
     summary_data: dict = {}
     marketplace_data: dict = {}
+    # Once the product row exists, ingests can run concurrently without each
+    # creating its own copy of the product
+    product_known = False
 
+    if db_host:
+        print(f"{DIM}DB host overridden: {settings.DATABASE_URL}{RESET}")
     print(f"\n{BOLD}{'═' * 70}{RESET}")
     print(f"{BOLD}  ShopLens Pipeline — {MAGENTA}{product_name}{RESET}")
     print(f"{BOLD}{'═' * 70}{RESET}")
-    print(f"  YouTube limit: {youtube_limit} | Blog limit: {blog_limit} | Marketplace: {'skip' if skip_marketplace else 'yes'}")
+    print(f"  YouTube limit: {youtube_limit} | Blog limit: {blog_limit} | Marketplace: {'skip' if skip_marketplace else 'yes'} | Concurrent ingests: {max_concurrent_ingests}")
 
     async with AsyncSessionLocal() as db:
         try:
@@ -159,26 +212,48 @@ async def run_pipeline(
                     _print_final_summary(product_name, ingested_reviews, summary_data, marketplace_data, pipeline_start, skip_marketplace)
                     return
             elif result.get("status") == "no_reviews":
+                product_known = True
                 warning(f"Product exists but has no reviews — will scrape {elapsed(t)}")
             else:
                 info(f"Not cached — starting fresh scrape {elapsed(t)}")
 
-            # ── Step 2: Search YouTube ───────────────────────────────────────
+            # ── Steps 2, 4, 7: Searches (run concurrently) ───────────────────
 
-            header(2, total_steps, "Searching YouTube reviews (Firecrawl)")
+            # YouTube, blog and marketplace searches hit different providers and
+            # don't depend on each other, so they run together, each on its own
+            # session (an AsyncSession can't be shared between tasks)
             t = time.time()
+            searches = [
+                _execute_in_session(AsyncSessionLocal, "search_youtube_reviews", {
+                    "product_name": product_name,
+                    "limit": youtube_limit,
+                }),
+                _execute_in_session(AsyncSessionLocal, "search_blog_reviews", {
+                    "product_name": product_name,
+                    "limit": blog_limit,
+                }),
+            ]
+            if not skip_marketplace:
+                searches.append(_execute_in_session(AsyncSessionLocal, "find_marketplace_listings", {
+                    "product_name": product_name,
+                    "count_per_marketplace": 3,
+                }))
+            search_results = await asyncio.gather(*searches)
+            yt_result, blog_result = search_results[:2]
+            if not skip_marketplace:
+                marketplace_data = search_results[2]
+            search_time = elapsed(t)
 
-            yt_result = await execute_function(db, "search_youtube_reviews", {
-                "product_name": product_name,
-                "limit": youtube_limit,
-            })
+            # ── Step 2: Search YouTube ───────────────────────────────────────
+
+            header(2, total_steps, "Searching YouTube reviews (Firecrawl)")
 
             if yt_result.get("error"):
-                error(f"YouTube search failed: {yt_result['error']} {elapsed(t)}")
+                error(f"YouTube search failed: {yt_result['error']} {search_time}")
             elif yt_result.get("status") == "success":
                 youtube_urls = yt_result.get("urls", [])
                 videos = yt_result.get("videos", [])
-                success(f"Found {len(youtube_urls)} YouTube video(s) {elapsed(t)}")
+                success(f"Found {len(youtube_urls)} YouTube video(s) {search_time}")
                 for v in videos:
                     title = v.get("title", "")
                     url = v.get("url", "")
@@ -188,32 +263,17 @@ async def run_pipeline(
                     if desc:
                         info(f"    {DIM}{desc[:100]}{RESET}")
             else:
-                warning(f"No YouTube results: {yt_result.get('status')} {elapsed(t)}")
+                warning(f"No YouTube results: {yt_result.get('status')} {search_time}")
 
             # ── Step 3: Ingest YouTube reviews ───────────────────────────────
 
             if youtube_urls:
                 header(3, total_steps, f"Ingesting {len(youtube_urls)} YouTube review(s)")
-                for i, url in enumerate(youtube_urls, 1):
-                    t = time.time()
-                    print(f"\n  {BOLD}[{i}/{len(youtube_urls)}]{RESET} {url}")
-
-                    ingest_result = await execute_function(db, "ingest_youtube_review", {
-                        "video_url": url,
-                        "product_name": product_name,
-                    })
-
-                    if ingest_result.get("error"):
-                        error(f"Failed: {ingest_result['error']} {elapsed(t)}")
-                    elif ingest_result.get("status") == "already_exists":
-                        warning(f"Already ingested — skipped {elapsed(t)}")
-                        ingested_reviews.append(ingest_result)
-                    elif ingest_result.get("status") == "success":
-                        success(f"Ingested: {ingest_result.get('title', '?')} by {ingest_result.get('reviewer_name', '?')} {elapsed(t)}")
-                        info(f"  review_id={ingest_result.get('review_id')} product_id={ingest_result.get('product_id')}")
-                        ingested_reviews.append(ingest_result)
-                    else:
-                        warning(f"Unexpected status: {ingest_result.get('status')} {elapsed(t)}")
+                results = await _ingest_urls(
+                    AsyncSessionLocal, "ingest_youtube_review", "video_url", youtube_urls,
+                    product_name, max_concurrent_ingests, seed_first=not product_known,
+                )
+                product_known |= _print_ingest_results(youtube_urls, results, ingested_reviews)
             else:
                 header(3, total_steps, "Ingesting YouTube reviews")
                 warning("No YouTube URLs to ingest — skipping")
@@ -221,19 +281,13 @@ async def run_pipeline(
             # ── Step 4: Search blog reviews ──────────────────────────────────
 
             header(4, total_steps, "Searching blog reviews (Firecrawl)")
-            t = time.time()
-
-            blog_result = await execute_function(db, "search_blog_reviews", {
-                "product_name": product_name,
-                "limit": blog_limit,
-            })
 
             if blog_result.get("error"):
-                error(f"Blog search failed: {blog_result['error']} {elapsed(t)}")
+                error(f"Blog search failed: {blog_result['error']} {search_time}")
             elif blog_result.get("status") == "success":
                 blog_urls = blog_result.get("urls", [])
                 articles = blog_result.get("articles", [])
-                success(f"Found {len(blog_urls)} blog article(s) {elapsed(t)}")
+                success(f"Found {len(blog_urls)} blog article(s) {search_time}")
                 for a in articles:
                     title = a.get("title", "")
                     url = a.get("url", "")
@@ -243,32 +297,17 @@ async def run_pipeline(
                     if desc:
                         info(f"    {DIM}{desc[:100]}{RESET}")
             else:
-                warning(f"No blog results: {blog_result.get('status')} {elapsed(t)}")
+                warning(f"No blog results: {blog_result.get('status')} {search_time}")
 
             # ── Step 5: Ingest blog reviews ──────────────────────────────────
 
             if blog_urls:
                 header(5, total_steps, f"Ingesting {len(blog_urls)} blog review(s)")
-                for i, url in enumerate(blog_urls, 1):
-                    t = time.time()
-                    print(f"\n  {BOLD}[{i}/{len(blog_urls)}]{RESET} {url}")
-
-                    ingest_result = await execute_function(db, "ingest_blog_review", {
-                        "url": url,
-                        "product_name": product_name,
-                    })
-
-                    if ingest_result.get("error"):
-                        error(f"Failed: {ingest_result['error']} {elapsed(t)}")
-                    elif ingest_result.get("status") == "already_exists":
-                        warning(f"Already ingested — skipped {elapsed(t)}")
-                        ingested_reviews.append(ingest_result)
-                    elif ingest_result.get("status") == "success":
-                        success(f"Ingested: {ingest_result.get('title', '?')} by {ingest_result.get('reviewer_name', '?')} {elapsed(t)}")
-                        info(f"  review_id={ingest_result.get('review_id')} product_id={ingest_result.get('product_id')}")
-                        ingested_reviews.append(ingest_result)
-                    else:
-                        warning(f"Unexpected status: {ingest_result.get('status')} {elapsed(t)}")
+                results = await _ingest_urls(
+                    AsyncSessionLocal, "ingest_blog_review", "url", blog_urls,
+                    product_name, max_concurrent_ingests, seed_first=not product_known,
+                )
+                _print_ingest_results(blog_urls, results, ingested_reviews)
             else:
                 header(5, total_steps, "Ingesting blog reviews")
                 warning("No blog URLs to ingest — skipping")
@@ -294,21 +333,15 @@ async def run_pipeline(
 
             if not skip_marketplace:
                 header(7, total_steps, "Finding marketplace listings")
-                t = time.time()
-
-                marketplace_data = await execute_function(db, "find_marketplace_listings", {
-                    "product_name": product_name,
-                    "count_per_marketplace": 3,
-                })
 
                 if marketplace_data.get("error"):
-                    error(f"Marketplace search failed: {marketplace_data['error']} {elapsed(t)}")
+                    error(f"Marketplace search failed: {marketplace_data['error']} {search_time}")
                 elif marketplace_data.get("status") in ("success", "partial"):
                     amazon = marketplace_data.get("amazon", [])
                     ebay = marketplace_data.get("ebay", [])
-                    success(f"Found {len(amazon)} Amazon + {len(ebay)} eBay listing(s) {elapsed(t)}")
+                    success(f"Found {len(amazon)} Amazon + {len(ebay)} eBay listing(s) {search_time}")
                 else:
-                    warning(f"No listings found: {marketplace_data.get('status')} {elapsed(t)}")
+                    warning(f"No listings found: {marketplace_data.get('status')} {search_time}")
 
             # ── Commit ───────────────────────────────────────────────────────
 
@@ -324,6 +357,66 @@ async def run_pipeline(
     _print_final_summary(product_name, ingested_reviews, summary_data, marketplace_data, pipeline_start, skip_marketplace)
 
 
+async def _ingest_urls(
+    session_factory,
+    name: str,
+    url_key: str,
+    urls: list[str],
+    product_name: str,
+    max_concurrent: int,
+    seed_first: bool,
+) -> list[tuple[dict, str]]:
+    """Ingest URLs concurrently, at most ``max_concurrent`` at a time.
+
+    With ``seed_first`` the first URL is ingested alone so it creates the
+    product before the rest fan out. Returns ``(result, elapsed)`` per URL, in
+    input order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def ingest(url: str) -> tuple[dict, str]:
+        async with semaphore:
+            t = time.time()
+            result = await _execute_in_session(session_factory, name, {
+                url_key: url,
+                "product_name": product_name,
+            })
+            return result, elapsed(t)
+
+    results = []
+    if seed_first:
+        results.append(await ingest(urls[0]))
+        urls = urls[1:]
+    results.extend(await asyncio.gather(*(ingest(url) for url in urls)))
+    return results
+
+
+def _print_ingest_results(
+    urls: list[str],
+    results: list[tuple[dict, str]],
+    ingested_reviews: list[dict],
+) -> bool:
+    """Print per-URL ingest outcomes once all have finished; True if any succeeded."""
+    any_stored = False
+    for i, (url, (ingest_result, took)) in enumerate(zip(urls, results), 1):
+        print(f"\n  {BOLD}[{i}/{len(urls)}]{RESET} {url}")
+
+        if ingest_result.get("error"):
+            error(f"Failed: {ingest_result['error']} {took}")
+        elif ingest_result.get("status") == "already_exists":
+            warning(f"Already ingested — skipped {took}")
+            ingested_reviews.append(ingest_result)
+            any_stored = True
+        elif ingest_result.get("status") == "success":
+            success(f"Ingested: {ingest_result.get('title', '?')} by {ingest_result.get('reviewer_name', '?')} {took}")
+            info(f"  review_id={ingest_result.get('review_id')} product_id={ingest_result.get('product_id')}")
+            ingested_reviews.append(ingest_result)
+            any_stored = True
+        else:
+            warning(f"Unexpected status: {ingest_result.get('status')} {took}")
+    return any_stored
+
+
 def _print_final_summary(
     product_name: str,
     ingested_reviews: list[dict],
@@ -332,104 +425,107 @@ def _print_final_summary(
     pipeline_start: float,
     skip_marketplace: bool,
 ):
-    """Print the final formatted summary."""
+    """Print the final formatted summary in a single write."""
 
     total_time = time.time() - pipeline_start
+    out: list[str] = []
 
-    print(f"\n\n{'═' * 70}")
-    print(f"{BOLD}{MAGENTA}  PIPELINE RESULTS — {product_name}{RESET}")
-    print(f"{'═' * 70}")
+    out.append(f"\n\n{'═' * 70}")
+    out.append(f"{BOLD}{MAGENTA}  PIPELINE RESULTS — {product_name}{RESET}")
+    out.append(f"{'═' * 70}")
 
     # ── Product info ─────────────────────────────────────────────────────
     product = summary_data.get("product", {})
     if product:
-        print(f"\n  {BOLD}Product:{RESET} {product.get('name', product_name)}")
+        out.append(f"\n  {BOLD}Product:{RESET} {product.get('name', product_name)}")
         if product.get("brand"):
-            print(f"  {BOLD}Brand:{RESET}   {product['brand']}")
+            out.append(f"  {BOLD}Brand:{RESET}   {product['brand']}")
         if product.get("category"):
-            print(f"  {BOLD}Category:{RESET} {product['category']}")
+            out.append(f"  {BOLD}Category:{RESET} {product['category']}")
 
     # ── Reviews ingested ─────────────────────────────────────────────────
     total_reviews = summary_data.get("total_reviews", len(ingested_reviews))
-    print(f"\n  {BOLD}Reviews in DB:{RESET} {total_reviews}")
+    out.append(f"\n  {BOLD}Reviews in DB:{RESET} {total_reviews}")
 
     # ── Per-reviewer summaries ───────────────────────────────────────────
     reviewer_summaries = summary_data.get("reviewer_summaries", [])
     if reviewer_summaries:
-        print(f"\n  {BOLD}{CYAN}── Reviewer Summaries ──{RESET}")
+        out.append(f"\n  {BOLD}{CYAN}── Reviewer Summaries ──{RESET}")
         for rs in reviewer_summaries:
             platform_icon = "🎬" if rs.get("platform") == "youtube" else "📝"
-            print(f"\n  {BOLD}{platform_icon} {rs.get('reviewer_name', '?')}{RESET}")
+            out.append(f"\n  {BOLD}{platform_icon} {rs.get('reviewer_name', '?')}{RESET}")
             if rs.get("url"):
-                print(f"  {DIM}{rs['url']}{RESET}")
+                out.append(f"  {DIM}{rs['url']}{RESET}")
             summary_text = rs.get("summary", "")
-            # Word-wrap the summary at ~65 chars
-            _print_wrapped(summary_text, indent=4, width=65)
+            if summary_text:
+                out.append(_SUMMARY_WRAPPER.fill(summary_text))
 
     # ── Overall summary ──────────────────────────────────────────────────
     overall = summary_data.get("overall_summary", "")
     if overall:
-        print(f"\n  {BOLD}{CYAN}── Overall Summary ──{RESET}")
-        _print_wrapped(overall, indent=4, width=65)
+        out.append(f"\n  {BOLD}{CYAN}── Overall Summary ──{RESET}")
+        out.append(_SUMMARY_WRAPPER.fill(overall))
 
     # ── Pros & Cons ──────────────────────────────────────────────────────
     pros = summary_data.get("common_pros", [])
     cons = summary_data.get("common_cons", [])
     if pros or cons:
-        print(f"\n  {BOLD}{CYAN}── Consensus ──{RESET}")
+        out.append(f"\n  {BOLD}{CYAN}── Consensus ──{RESET}")
     if pros:
-        print(f"\n  {GREEN}{BOLD}Pros:{RESET}")
+        out.append(f"\n  {GREEN}{BOLD}Pros:{RESET}")
         for p in pros:
-            print(f"    {GREEN}+{RESET} {p}")
+            out.append(f"    {GREEN}+{RESET} {p}")
     if cons:
-        print(f"\n  {RED}{BOLD}Cons:{RESET}")
+        out.append(f"\n  {RED}{BOLD}Cons:{RESET}")
         for c in cons:
-            print(f"    {RED}-{RESET} {c}")
+            out.append(f"    {RED}-{RESET} {c}")
 
     # ── Marketplace listings ─────────────────────────────────────────────
     if not skip_marketplace and marketplace_data:
         amazon = marketplace_data.get("amazon", [])
         ebay = marketplace_data.get("ebay", [])
         if amazon or ebay:
-            print(f"\n  {BOLD}{CYAN}── Where to Buy ──{RESET}")
+            out.append(f"\n  {BOLD}{CYAN}── Where to Buy ──{RESET}")
         if amazon:
-            print(f"\n  {YELLOW}{BOLD}Amazon:{RESET}")
+            out.append(f"\n  {YELLOW}{BOLD}Amazon:{RESET}")
             for item in amazon:
                 price = item.get("price", "N/A")
-                print(f"    • {item.get('title', '?')} — {BOLD}{price}{RESET}")
+                out.append(f"    • {item.get('title', '?')} — {BOLD}{price}{RESET}")
                 if item.get("url"):
-                    print(f"      {DIM}{item['url']}{RESET}")
+                    out.append(f"      {DIM}{item['url']}{RESET}")
         if ebay:
-            print(f"\n  {YELLOW}{BOLD}eBay:{RESET}")
+            out.append(f"\n  {YELLOW}{BOLD}eBay:{RESET}")
             for item in ebay:
                 price = item.get("price", "N/A")
-                print(f"    • {item.get('title', '?')} — {BOLD}{price}{RESET}")
+                out.append(f"    • {item.get('title', '?')} — {BOLD}{price}{RESET}")
                 if item.get("url"):
-                    print(f"      {DIM}{item['url']}{RESET}")
+                    out.append(f"      {DIM}{item['url']}{RESET}")
 
     # ── Timing ───────────────────────────────────────────────────────────
-    print(f"\n{'─' * 70}")
-    print(f"  {BOLD}Total time:{RESET} {total_time:.1f}s")
-    print(f"{'═' * 70}\n")
-
-
-def _print_wrapped(text: str, indent: int = 4, width: int = 65):
-    """Print text with word wrapping."""
-    prefix = " " * indent
-    words = text.split()
-    line = prefix
-    for word in words:
-        if len(line) + len(word) + 1 > width + indent:
-            print(line)
-            line = prefix + word
-        else:
-            line = line + " " + word if line.strip() else prefix + word
-    if line.strip():
-        print(line)
+    out.append(f"\n{'─' * 70}")
+    out.append(f"  {BOLD}Total time:{RESET} {total_time:.1f}s")
+    out.append(f"{'═' * 70}\n")
+
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
 
 
 # ── CLI ──────────────────────────────────────────────────────────────────────
 
+async def _run_with_cache(**kwargs):
+    """Run the pipeline connected to Redis, as the API does in its lifespan.
+
+    Lets repeat runs reuse cached search results and review summaries (a
+    summary is invalidated whenever a review is ingested for the product).
+    """
+    _load_pipeline(kwargs.get("db_host"))
+    await cache.connect()
+    try:
+        await run_pipeline(**kwargs)
+    finally:
+        await cache.disconnect()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="ShopLens — Run the full review scraping pipeline for a product",
@@ -439,22 +535,25 @@ Examples:
   python run_pipeline.py "Samsung Galaxy S25"
   python run_pipeline.py "iPhone 16 Pro" --youtube-limit 5 --blog-limit 3
   python run_pipeline.py "Pixel 9" --skip-marketplace
+  python run_pipeline.py "Pixel 9" --max-concurrent-ingests 5
   python run_pipeline.py "MacBook Pro M4" --db-host localhost
         """,
     )
     parser.add_argument("product_name", help="Name of the product to research")
     parser.add_argument("--youtube-limit", type=int, default=3, help="Max YouTube videos to find (default: 3)")
     parser.add_argument("--blog-limit", type=int, default=2, help="Max blog articles to find (default: 2)")
+    parser.add_argument("--max-concurrent-ingests", type=int, default=3, help="Max reviews ingested at once (default: 3)")
     parser.add_argument("--skip-marketplace", action="store_true", help="Skip marketplace listing search")
     parser.add_argument("--db-host", type=str, default=None, help="Override database hostname (e.g. 'localhost' when running outside Docker)")
 
     args = parser.parse_args()
 
-    asyncio.run(run_pipeline(
+    asyncio.run(_run_with_cache(
         product_name=args.product_name,
         youtube_limit=args.youtube_limit,
         blog_limit=args.blog_limit,
         skip_marketplace=args.skip_marketplace,
+        max_concurrent_ingests=args.max_concurrent_ingests,
         db_host=args.db_host,
     ))
 
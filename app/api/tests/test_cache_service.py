@@ -122,3 +122,34 @@ class TestCacheServiceWithMockRedis:
 
         # Should not raise
         await cs.set("test_key", {"data": "value"})
+
+
+class TestLRUCache:
+    """Test the in-process LRU cache."""
+
+    def test_evicts_least_recently_used(self):
+        from app.services.cache_service import LRUCache
+
+        lru = LRUCache(maxsize=2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        assert lru.get("a") == 1  # "a" is now most recent
+        lru.set("c", 3)
+
+        assert lru.get("b") is None
+        assert lru.get("a") == 1
+        assert lru.get("c") == 3
+        assert len(lru) == 2
+
+    def test_entries_expire_after_ttl(self):
+        from app.services.cache_service import LRUCache
+
+        lru = LRUCache(maxsize=2, ttl=60)
+        with patch("app.services.cache_service.time.monotonic", return_value=1000.0):
+            lru.set("a", 1)
+        with patch("app.services.cache_service.time.monotonic", return_value=1059.0):
+            assert lru.get("a") == 1
+        with patch("app.services.cache_service.time.monotonic", return_value=1060.0):
+            assert lru.get("a") is None
+
+        assert len(lru) == 0
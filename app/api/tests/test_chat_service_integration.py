@@ -1,12 +1,15 @@
 """Integration tests for the ChatService."""
 
+import asyncio
 import json
+import time
 import pytest
 import pytest_asyncio
 from unittest.mock import AsyncMock, patch, MagicMock, PropertyMock
 from uuid import uuid4
 
 from app.services.chat_service import ChatService, MAX_FUNCTION_CALL_ITERATIONS
+from app.services.llm_service import FunctionCall
 
 
 class MockGeminiResponse:
@@ -63,6 +66,7 @@ class TestMaxIterationLimit:
 
         # Create a provider that always returns function calls
         mock_provider = MagicMock()
+        mock_provider.supports_streaming = False
         mock_provider.build_config.return_value = MagicMock()
         mock_provider.build_content.return_value = MagicMock()
         mock_provider.convert_function_declarations.return_value = []
@@ -74,10 +78,9 @@ class TestMaxIterationLimit:
 
         mock_provider.generate = AsyncMock(return_value=infinite_fc)
         mock_provider.has_function_call.return_value = True
-        mock_provider.extract_function_call.return_value = {
-            "name": "check_product_cache",
-            "args": {"product_name": "Test"}
-        }
+        mock_provider.extract_function_call.return_value = FunctionCall(
+            "check_product_cache", {"product_name": "Test"}
+        )
         mock_provider.extract_function_call_part.return_value = MagicMock()
         mock_provider.extract_text.return_value = ""
         mock_provider.build_function_response.return_value = [MagicMock()]
@@ -165,6 +168,17 @@ class TestMultiProviderSelection:
             provider = get_llm_provider()
             assert isinstance(provider, OpenAIProvider)
 
+    @patch("app.services.llm_service.settings")
+    def test_provider_reused_across_calls(self, mock_settings):
+        mock_settings.LLM_PROVIDER = "openai"
+        mock_settings.OPENAI_API_KEY = "reuse-key"
+        mock_settings.OPENAI_MODEL = "gpt-4o"
+
+        from app.services.llm_service import get_llm_provider
+        with patch("app.services.llm_service.OpenAIProvider.__init__", return_value=None) as init:
+            assert get_llm_provider() is get_llm_provider()
+        init.assert_called_once()
+
     @patch("app.services.llm_service.settings")
     def test_openai_requires_api_key(self, mock_settings):
         mock_settings.LLM_PROVIDER = "openai"
@@ -183,6 +197,19 @@ class TestMultiProviderSelection:
         with pytest.raises(RuntimeError, match="GEMINI_API_KEY"):
             get_llm_provider()
 
+    @pytest.mark.asyncio
+    async def test_genai_client_shared_until_pool_replaced(self):
+        from app.core import llm
+        from app.core.http import close_http_client
+
+        with patch.object(llm, "_client", None), \
+                patch.object(llm.settings, "GEMINI_API_KEY", "test-key"):
+            client = llm.get_genai_client()
+            assert llm.get_genai_client() is client
+            await close_http_client()
+            assert llm.get_genai_client() is not client
+        await close_http_client()
+
 
 class TestFunctionCallingSequence:
     """Test that normal function calling sequences work correctly."""
@@ -210,6 +237,7 @@ class TestFunctionCallingSequence:
         mock_crud.update_context = AsyncMock()
 
         mock_provider = MagicMock()
+        mock_provider.supports_streaming = False
         mock_provider.build_config.return_value = MagicMock()
         mock_provider.build_content.return_value = MagicMock()
         mock_provider.convert_function_declarations.return_value = []
@@ -236,10 +264,9 @@ class TestFunctionCallingSequence:
             return fc_count == 1
 
         mock_provider.has_function_call.side_effect = mock_has_fc
-        mock_provider.extract_function_call.return_value = {
-            "name": "check_product_cache",
-            "args": {"product_name": "iPhone"}
-        }
+        mock_provider.extract_function_call.return_value = FunctionCall(
+            "check_product_cache", {"product_name": "iPhone"}
+        )
         mock_provider.extract_function_call_part.return_value = MagicMock()
         mock_provider.extract_text.return_value = "Here's what I found about the iPhone."
         mock_provider.build_function_response.return_value = [MagicMock()]
@@ -257,3 +284,446 @@ class TestFunctionCallingSequence:
 
             assert response.message.content == "Here's what I found about the iPhone."
             assert mock_exec.call_count == 1
+
+
+class TestShortArg:
+    """Test the bounded log formatter for function arguments."""
+
+    def test_truncates_strings(self):
+        from app.services.chat_service import _short_arg
+        assert _short_arg("x" * 100) == repr("x" * 40)
+
+    def test_summarizes_containers(self):
+        from app.services.chat_service import _short_arg
+        assert _short_arg(["a", "b", "c"]) == "[3 items]"
+        assert _short_arg({"a": 1}) == "{1 keys}"
+
+    def test_scalars_use_repr(self):
+        from app.services.chat_service import _short_arg
+        assert _short_arg(3) == "3"
+        assert _short_arg(None) == "None"
+
+
+class TestGeminiPromptCache:
+    """Test server-side caching of the system prompt in GeminiProvider."""
+
+    def _make_provider(self):
+        from google import genai
+        from google.genai import types
+        from app.services.llm_service import GeminiProvider
+
+        with patch("app.services.llm_service.GeminiProvider.__init__", return_value=None):
+            provider = GeminiProvider()
+        provider.genai = genai
+        provider.types = types
+        provider.model = "gemini-test"
+        provider.client = MagicMock()
+        provider.client.aio.models.generate_content = AsyncMock(return_value="ok")
+        provider._prompt_caches = {}
+        provider._prompt_cache_retry_at = {}
+        provider._prompt_cache_lock = asyncio.Lock()
+        return provider
+
+    @pytest.mark.asyncio
+    async def test_uses_cached_content_handle(self):
+        provider = self._make_provider()
+        cache = MagicMock()
+        cache.name = "cachedContents/abc"
+        provider.client.aio.caches.create = AsyncMock(return_value=cache)
+
+        config = provider.build_config(system_instruction="prompt", tools=None)
+        await provider.generate([], config)
+        await provider.generate([], config)
+
+        provider.client.aio.caches.create.assert_called_once()
+        sent = provider.client.aio.models.generate_content.call_args.kwargs["config"]
+        assert sent.cached_content == "cachedContents/abc"
+        assert sent.system_instruction is None
+
+    def test_key_changes_with_declaration_schema(self):
+        from google.genai import types
+
+        provider = self._make_provider()
+
+        def config_with(description):
+            decl = types.FunctionDeclaration(name="search", description=description)
+            return types.GenerateContentConfig(
+                system_instruction="prompt",
+                tools=[types.Tool(function_declarations=[decl])],
+            )
+
+        assert provider._prompt_cache_key(config_with("v1")) == provider._prompt_cache_key(config_with("v1"))
+        assert provider._prompt_cache_key(config_with("v1")) != provider._prompt_cache_key(config_with("v2"))
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_cache_creation_fails(self):
+        provider = self._make_provider()
+        provider.client.aio.caches.create = AsyncMock(side_effect=Exception("too small"))
+
+        config = provider.build_config(system_instruction="prompt", tools=None)
+        await provider.generate([], config)
+
+        sent = provider.client.aio.models.generate_content.call_args.kwargs["config"]
+        assert sent is config
+
+
+class TestLLMResponseCache:
+    """Test reuse of temperature-0 responses across identical requests."""
+
+    def _make_provider(self):
+        from app.services.llm_service import OpenAIProvider
+
+        with patch("app.services.llm_service.OpenAIProvider.__init__", return_value=None):
+            provider = OpenAIProvider()
+        provider.model = "gpt-test"
+        provider._tools = None
+        provider.client = MagicMock()
+        response = MagicMock()
+        response.choices[0].message.tool_calls = None
+        provider.client.chat.completions.create = AsyncMock(return_value=response)
+        return provider
+
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        from app.core.llm_cache import llm_cache
+        llm_cache.clear()
+        yield
+        llm_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_identical_deterministic_request_hits_cache(self):
+        provider = self._make_provider()
+        contents = [provider.build_content("user", "hi")]
+        config = provider.build_config(system_instruction="sys", tools=None, temperature=0)
+
+        first = await provider.generate(contents, config)
+        second = await provider.generate(list(contents), dict(config))
+
+        assert first is second
+        provider.client.chat.completions.create.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_sampled_request_is_not_cached(self):
+        provider = self._make_provider()
+        contents = [provider.build_content("user", "hi")]
+        config = provider.build_config(system_instruction="sys", tools=None, temperature=0.7)
+
+        await provider.generate(contents, config)
+        await provider.generate(contents, config)
+
+        assert provider.client.chat.completions.create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_call(self):
+        provider = self._make_provider()
+        release = asyncio.Event()
+        response = provider.client.chat.completions.create.return_value
+
+        async def slow_create(**kwargs):
+            await release.wait()
+            return response
+
+        provider.client.chat.completions.create = AsyncMock(side_effect=slow_create)
+        config = provider.build_config(system_instruction="sys", tools=None, temperature=0)
+        tasks = [
+            asyncio.create_task(provider.generate([provider.build_content("user", "hi")], config))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == [response] * 3
+        provider.client.chat.completions.create.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_warmup_bypasses_response_cache(self):
+        from app.services.llm_service import warmup_llm_provider
+
+        provider = self._make_provider()
+        with patch("app.services.llm_service.get_llm_provider", return_value=provider):
+            await warmup_llm_provider()
+            await warmup_llm_provider()
+
+        assert provider.client.chat.completions.create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_single_flight_propagates_errors(self):
+        from app.core.llm_cache import LLMCache
+
+        cache = LLMCache()
+        call = AsyncMock(side_effect=RuntimeError("boom"))
+        with pytest.raises(RuntimeError, match="boom"):
+            await cache.single_flight("k", call)
+        assert len(cache._inflight) == 0
+
+    def test_contents_to_messages_mixed_types(self):
+        from google.genai import types
+
+        provider = self._make_provider()
+        gemini_content = types.Content(role="model", parts=[types.Part(text="earlier answer")])
+        messages = provider._contents_to_messages(
+            [{"role": "user", "content": "hi"}, gemini_content, "plain"],
+            {"system_instruction": "sys"},
+        )
+
+        assert messages == [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": "earlier answer"},
+            {"role": "user", "content": "plain"},
+        ]
+
+    def test_tool_result_serialized_compactly(self):
+        provider = self._make_provider()
+        call_part = MagicMock(id="call_1")
+        call_part.function.name = "search"
+        call_part.function.arguments = "{}"
+
+        _, tool_msg = provider.build_function_response(
+            "search", {"name": "Café", "items": [1, 2]}, None, call_part
+        )
+        assert tool_msg["content"] == '{"name":"Café","items":[1,2]}'
+
+        _, tool_msg = provider.build_function_response("search", "already json", None, call_part)
+        assert tool_msg["content"] == "already json"
+
+    def test_extract_function_call_parses_arguments(self):
+        provider = self._make_provider()
+        response = MagicMock()
+        response.choices[0].message.tool_calls[0].function.name = "search"
+        response.choices[0].message.tool_calls[0].function.arguments = '{"query": "pixel 9"}'
+        assert provider.extract_function_call(response) == ("search", {"query": "pixel 9"})
+
+        response.choices[0].message.tool_calls[0].function.arguments = "{broken"
+        assert provider.extract_function_call(response) is None
+
+    def test_make_key_is_order_and_content_sensitive(self):
+        from app.core.llm_cache import LLMCache
+
+        key = LLMCache.make_key("m", [{"role": "user", "content": "a"}], {"t": 0, "s": "x"})
+        assert key == LLMCache.make_key("m", [{"content": "a", "role": "user"}], {"s": "x", "t": 0})
+        assert key != LLMCache.make_key("m", [{"role": "user", "content": "b"}], {"t": 0, "s": "x"})
+        assert LLMCache.make_key("m", ["a", "b"]) != LLMCache.make_key("m", ["b", "a"])
+        assert len(key) == 32
+
+    @pytest.mark.asyncio
+    async def test_entries_expire(self):
+        from app.core.llm_cache import LLMCache
+
+        cache = LLMCache(maxsize=2, ttl=60)
+        await cache.set("a", 1)
+        with patch("app.core.llm_cache.time.monotonic", return_value=time.monotonic() + 61):
+            assert await cache.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_shared_backend_serves_other_workers(self):
+        from openai.types.chat import ChatCompletion
+        from app.core.llm_cache import LLMCache
+
+        store = {}
+        backend = MagicMock(available=True)
+        backend.get = AsyncMock(side_effect=lambda key: store.get(key))
+        backend.set = AsyncMock(side_effect=lambda key, value, ttl: store.__setitem__(key, value))
+
+        response = ChatCompletion.model_validate({
+            "id": "c1", "object": "chat.completion", "created": 0, "model": "gpt-test",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "cached answer"}}],
+        })
+        provider = self._make_provider()
+        provider.client.chat.completions.create = AsyncMock(return_value=response)
+        config = provider.build_config(system_instruction="sys", tools=None, temperature=0)
+        contents = [provider.build_content("user", "hi")]
+
+        with patch("app.services.llm_service.llm_cache", LLMCache(ttl=60, backend=backend)):
+            await provider.generate(contents, config)
+        # A second worker starts with an empty in-process tier
+        worker_cache = LLMCache(ttl=60, backend=backend)
+        with patch("app.services.llm_service.llm_cache", worker_cache):
+            replayed = await provider.generate(contents, config)
+
+        provider.client.chat.completions.create.assert_awaited_once()
+        assert provider.extract_text(replayed) == "cached answer"
+        assert len(worker_cache) == 1
+
+
+class TestConvertFunctionDeclarations:
+    """Test memoization of provider tool declarations."""
+
+    @pytest.mark.parametrize("provider_cls", ["GeminiProvider", "OpenAIProvider"])
+    def test_conversion_reused_for_same_declarations(self, provider_cls):
+        from google.genai import types
+        from app.services import llm_service
+        from app.functions.registry import FUNCTION_DECLARATIONS
+
+        with patch.object(getattr(llm_service, provider_cls), "__init__", return_value=None):
+            provider = getattr(llm_service, provider_cls)()
+        provider.types = types
+        provider._type_mapping = llm_service._gemini_type_mapping(types)
+        provider._declaration_cache = {}
+
+        first = provider.convert_function_declarations(FUNCTION_DECLARATIONS)
+        second = provider.convert_function_declarations(list(FUNCTION_DECLARATIONS))
+
+        assert first is second
+        assert len(provider._declaration_cache) == 1
+
+
+class TestGeminiFunctionCallParts:
+    """Test function-call detection on Gemini responses."""
+
+    def _provider(self):
+        from app.services.llm_service import GeminiProvider
+
+        with patch("app.services.llm_service.GeminiProvider.__init__", return_value=None):
+            return GeminiProvider()
+
+    def _response(self, *parts):
+        from google.genai import types
+
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))]
+        )
+
+    def test_function_call_after_text_part(self):
+        from google.genai import types
+
+        provider = self._provider()
+        call_part = types.Part(function_call=types.FunctionCall(name="search", args={"q": "x"}))
+        response = self._response(types.Part(text="Let me look."), call_part)
+
+        assert provider.has_function_call(response)
+        assert provider.extract_function_call_part(response) is call_part
+        assert provider.extract_function_call(response) == ("search", {"q": "x"})
+
+    def test_text_only_response(self):
+        from google.genai import types
+
+        provider = self._provider()
+        response = self._response(types.Part(text="Done."))
+
+        assert not provider.has_function_call(response)
+        assert provider.extract_function_call(response) is None
+        assert provider.extract_text(response) == "Done."
+
+    def test_parts_looked_up_once_per_response(self):
+        from google.genai import types
+
+        provider = self._provider()
+        response = self._response(types.Part(text="Done."))
+        provider.has_function_call(response)
+
+        response.candidates = []
+        assert provider.extract_text(response) == "Done."
+        assert not provider.has_function_call(types.GenerateContentResponse(candidates=[]))
+
+    def test_build_content_reuses_built_messages(self):
+        from google.genai import types
+        from app.services.cache_service import LRUCache
+
+        provider = self._provider()
+        provider.types = types
+        provider._content_cache = LRUCache(maxsize=8)
+
+        content = provider.build_content("user", "hello")
+
+        assert content == types.Content(role="user", parts=[types.Part(text="hello")])
+        assert provider.build_content("user", "hello") is content
+        assert provider.build_content("model", "hello") is not content
+
+
+class TestStreamedGeneration:
+    """Test assembling streamed provider responses."""
+
+    @pytest.mark.asyncio
+    async def test_gemini_stops_at_first_function_call(self):
+        from google.genai import types
+        from app.services.llm_service import GeminiProvider
+
+        with patch("app.services.llm_service.GeminiProvider.__init__", return_value=None):
+            provider = GeminiProvider()
+        provider.types = types
+
+        def chunk(*parts):
+            return types.GenerateContentResponse(
+                candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))]
+            )
+
+        consumed = []
+
+        async def stream():
+            for item in (
+                chunk(types.Part(text="Let me ")),
+                chunk(types.Part(text="check.")),
+                chunk(types.Part(function_call=types.FunctionCall(name="search", args={"q": "x"}))),
+                chunk(types.Part(text="never read")),
+            ):
+                consumed.append(item)
+                yield item
+
+        response = await provider._collect_stream(stream())
+
+        assert len(consumed) == 3
+        assert provider.extract_text(response) == "Let me check."
+        assert provider.extract_function_call(response) == ("search", {"q": "x"})
+
+    @pytest.mark.asyncio
+    async def test_openai_reassembles_tool_call_deltas(self):
+        from openai.types.chat import ChatCompletionChunk
+        from app.services.llm_service import OpenAIProvider
+
+        with patch("app.services.llm_service.OpenAIProvider.__init__", return_value=None):
+            provider = OpenAIProvider()
+        provider.model = "gpt-test"
+        provider._tools = None
+
+        def chunk(delta, finish_reason=None):
+            return ChatCompletionChunk(
+                id="c1", object="chat.completion.chunk", created=1, model="gpt-test",
+                choices=[{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            )
+
+        chunks = [
+            chunk({"tool_calls": [{"index": 0, "id": "call_1", "type": "function",
+                                   "function": {"name": "search", "arguments": '{"qu'}}]}),
+            chunk({"tool_calls": [{"index": 0, "function": {"arguments": 'ery": "pixel"}'}}]}),
+            chunk({}, finish_reason="tool_calls"),
+        ]
+
+        class FakeStream:
+            def __init__(self):
+                self.closed = False
+
+            def __aiter__(self):
+                return self._iter()
+
+            async def _iter(self):
+                for item in chunks:
+                    yield item
+
+            async def close(self):
+                self.closed = True
+
+        fake = FakeStream()
+        provider.client = MagicMock()
+        provider.client.chat.completions.create = AsyncMock(return_value=fake)
+
+        response = await provider.generate_streamed([{"role": "user", "content": "hi"}], {})
+
+        assert provider.client.chat.completions.create.call_args.kwargs["stream"] is True
+        assert fake.closed
+        assert provider.has_function_call(response)
+        assert provider.extract_function_call(response) == ("search", {"query": "pixel"})
+
+
+class TestSummarizeResult:
+    """Test the function-result log summary."""
+
+    def test_lists_and_numbers(self):
+        from app.services.chat_service import _summarize_result
+        result = {"status": "success", "urls": ["a", "b"], "total_reviews": 4, "videos": []}
+        assert _summarize_result(result) == ["total_reviews=4", "2 urls"]
+
+    def test_empty_when_no_known_keys(self):
+        from app.services.chat_service import _summarize_result
+        assert _summarize_result({"status": "found"}) == []
@@ -89,3 +89,16 @@ class TestCircuitBreaker:
         # Multiple allow_request checks should all return False
         for _ in range(5):
             assert cb.allow_request() is False
+
+    def test_rejected_count_tracks_short_circuited_requests(self):
+        cb = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60.0)
+        assert cb.allow_request() is True
+        assert cb.rejected_count == 0
+
+        cb.record_failure()
+        for _ in range(3):
+            cb.allow_request()
+        assert cb.rejected_count == 3
+
+        cb.reset()
+        assert cb.rejected_count == 0
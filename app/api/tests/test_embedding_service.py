@@ -0,0 +1,248 @@
+"""Tests for the embedding service module."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.embedding_service import EmbeddingService
+
+
+def _openai_service(dims: int = 3) -> EmbeddingService:
+    """Build an EmbeddingService wired to mocked OpenAI and Qdrant clients."""
+    service = EmbeddingService()
+    service._provider = "openai"
+    service._embedding_model = "text-embedding-3-small"
+    service._openai_client = MagicMock()
+
+    def create(model, input):
+        result = MagicMock()
+        result.data = [MagicMock(embedding=[float(i + 1)] * dims) for i in range(len(input))]
+        return result
+
+    service._openai_client.embeddings.create.side_effect = create
+    service._qdrant = AsyncMock()
+    return service
+
+
+def _row(review_id: int) -> dict:
+    return {
+        "review_id": review_id,
+        "product_id": 1,
+        "product_name": "Pixel 9",
+        "reviewer_name": "MKBHD",
+        "content": f"review {review_id}",
+        "source_url": f"https://example.com/{review_id}",
+    }
+
+
+class TestEmbeddingServiceDisabled:
+    """Test graceful degradation when no provider is configured."""
+
+    @pytest.mark.asyncio
+    async def test_generate_embeddings_returns_none_per_text(self):
+        service = EmbeddingService()
+        assert await service.generate_embeddings(["a", "b"]) == [None, None]
+
+    @pytest.mark.asyncio
+    async def test_store_review_embedding_returns_false(self):
+        service = EmbeddingService()
+        assert await service.store_review_embedding(**_row(1)) is False
+
+
+class TestEmbeddingServiceBatching:
+    """Test batched embedding generation and storage."""
+
+    @pytest.mark.asyncio
+    async def test_generate_embeddings_single_call_per_batch(self):
+        service = _openai_service()
+        vectors = await service.generate_embeddings(["a", "b", "c"])
+
+        assert len(vectors) == 3
+        service._openai_client.embeddings.create.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_store_review_embeddings_single_upsert(self):
+        service = _openai_service()
+        stored = await service.store_review_embeddings([_row(1), _row(2)])
+
+        assert stored == 2
+        service._qdrant.upsert.assert_called_once()
+        points = service._qdrant.upsert.call_args.kwargs["points"]
+        assert [p.id for p in points] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_generate_embedding_is_coalesced(self):
+        service = _openai_service()
+        vectors = await asyncio.gather(
+            service.generate_embedding("a"),
+            service.generate_embedding("b"),
+            service.generate_embedding("c"),
+        )
+
+        assert vectors == [[1.0] * 3, [2.0] * 3, [3.0] * 3]
+        service._openai_client.embeddings.create.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_flush_resolves_waiters(self):
+        service = _openai_service()
+        service.generate_embeddings = AsyncMock(side_effect=asyncio.CancelledError)
+
+        assert await service.generate_embedding("text") is None
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_batch(self):
+        service = _openai_service()
+        with patch("app.services.embedding_service.settings.EMBEDDING_BATCH_WINDOW_MS", 60_000):
+            waiter = asyncio.create_task(service.generate_embedding("text"))
+            await asyncio.sleep(0)
+            await service.close()
+
+        assert await waiter == [1.0, 1.0, 1.0]
+        assert service._flush_handle is None
+        assert not service._flush_tasks
+
+    def test_split_batches_respects_size_and_chars(self):
+        batches = EmbeddingService._split_batches(["x" * 150_000, "y" * 150_000, "z"])
+        assert [len(b) for b in batches] == [1, 2]
+
+
+class TestQuantizationConfig:
+    """Test mapping of the QDRANT_QUANTIZATION setting."""
+
+    def test_modes(self):
+        from qdrant_client.models import BinaryQuantization, ScalarQuantization
+        from app.services.embedding_service import _quantization_config
+
+        assert isinstance(_quantization_config("scalar"), ScalarQuantization)
+        assert isinstance(_quantization_config("Binary"), BinaryQuantization)
+        assert _quantization_config("none") is None
+
+
+class TestBackgroundUpsert:
+    """Test the batched background Qdrant writer."""
+
+    @pytest.mark.asyncio
+    async def test_queued_points_flushed_in_one_upsert(self):
+        service = _openai_service()
+        qdrant = service._qdrant
+        openai_client = service._openai_client
+        service._upsert_queue = asyncio.Queue()
+        service._upsert_task = asyncio.create_task(service._upsert_worker())
+
+        stored = await asyncio.gather(
+            service.store_review_embedding(**_row(1)),
+            service.store_review_embedding(**_row(2)),
+        )
+        await service.close()
+
+        assert stored == [True, True]
+        qdrant.upsert.assert_called_once()
+        assert qdrant.upsert.call_args.kwargs["wait"] is False
+        assert len(qdrant.upsert.call_args.kwargs["points"]) == 2
+        qdrant.close.assert_awaited_once()
+        openai_client.close.assert_called_once()
+
+
+    @pytest.mark.asyncio
+    async def test_failed_background_upsert_is_retried_on_next_store(self):
+        service = _openai_service()
+        qdrant = service._qdrant
+        qdrant.upsert.side_effect = [RuntimeError("qdrant down"), None]
+        service._upsert_queue = asyncio.Queue()
+        service._upsert_task = asyncio.create_task(service._upsert_worker())
+
+        await service.store_review_embedding(**_row(1))
+        await service._upsert_queue.join()
+        await service.store_review_embedding(**_row(1))
+        await service.close()
+
+        assert qdrant.upsert.call_count == 2
+
+
+class TestEmbeddingCache:
+    """Test the exact-match vector cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_text_not_re_embedded(self):
+        service = _openai_service()
+        first = await service.generate_embeddings(["same", "other"])
+        second = await service.generate_embeddings(["same"])
+
+        assert second == [first[0]]
+        assert service._openai_client.embeddings.create.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_duplicates_in_one_call_embedded_once(self):
+        service = _openai_service()
+        vectors = await service.generate_embeddings(["dup", "dup"])
+
+        assert vectors[0] == vectors[1]
+        call = service._openai_client.embeddings.create.call_args
+        assert call.kwargs["input"] == ["dup"]
+
+
+class TestStoreFiltering:
+    """Test skipping of degenerate and already-stored vectors."""
+
+    @pytest.mark.asyncio
+    async def test_zero_vector_not_stored(self):
+        service = _openai_service()
+        service.generate_embedding = AsyncMock(return_value=[0.0, 0.0, 0.0])
+
+        assert await service.store_review_embedding(**_row(1)) is False
+        service._qdrant.upsert.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_identical_point_upserted_once(self):
+        service = _openai_service()
+
+        assert await service.store_review_embeddings([_row(1), _row(2)]) == 2
+        assert await service.store_review_embeddings([_row(1), _row(2)]) == 0
+        service._qdrant.upsert.assert_called_once()
+
+
+class TestTruncation:
+    """Test truncation to the embedding model's input limit."""
+
+    def test_character_fallback_per_provider(self):
+        service = _openai_service()
+        assert len(service._truncate("x" * 100_000)) == 8191 * 3
+
+        service._provider = "gemini"
+        assert len(service._truncate("x" * 100_000)) == 2048 * 4
+
+    def test_tokenizer_limits_tokens(self):
+        service = _openai_service()
+        service._tokenizer = MagicMock()
+        service._tokenizer.encode.side_effect = lambda text, **kwargs: list(text)
+        service._tokenizer.decode.side_effect = "".join
+
+        assert service._truncate("short") == "short"
+        service._tokenizer.encode.assert_not_called()
+        assert service._truncate("y" * 9000) == "y" * 8191
+
+
+class TestRateLimitRetry:
+    """Test backoff on provider rate limiting."""
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_batch_is_retried(self):
+        service = _openai_service()
+        rate_limited = Exception("quota exceeded")
+        rate_limited.code = 429
+        service._request_embeddings = AsyncMock(side_effect=[rate_limited, [[1.0, 2.0, 3.0]]])
+
+        with patch("app.services.embedding_service.asyncio.sleep", AsyncMock()) as mock_sleep:
+            vectors = await service.generate_embeddings(["a"])
+
+        assert vectors == [[1.0, 2.0, 3.0]]
+        assert service._request_embeddings.await_count == 2
+        mock_sleep.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_other_errors_are_not_retried(self):
+        service = _openai_service()
+        service._request_embeddings = AsyncMock(side_effect=ValueError("bad input"))
+
+        assert await service.generate_embeddings(["a"]) == [None]
+        assert service._request_embeddings.await_count == 1
@@ -0,0 +1,186 @@
+"""Tests for the Firecrawl blog ingestion service."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import select
+
+from app.models.opinion import Opinion
+from app.models.product import Product
+from app.services.firecrawl_service import ExtractedReview, FirecrawlService
+
+
+def _extracted(url: str) -> dict:
+    return {
+        "product_name": "Pixel 9",
+        "reviewer_name": "The Verge",
+        "summary": "A solid phone.",
+        "pros": ["Camera"],
+        "cons": ["Price"],
+        "opinions": [{"aspect": "Camera", "sentiment": 0.8, "confidence": 0.9}],
+        "source_url": url,
+        "source_title": "Pixel 9 review",
+        "scraped_at": "2025-01-01T00:00:00+00:00",
+    }
+
+
+@pytest.fixture
+def service():
+    with patch.object(FirecrawlService, "_init_clients"):
+        return FirecrawlService()
+
+
+class TestIngestMany:
+    """Test the concurrent multi-URL blog ingestion pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_results_in_input_order_with_errors_captured(self, service, db_session):
+        product = Product(name="Pixel 9", category="smartphones", brand="Google")
+        db_session.add(product)
+        await db_session.flush()
+
+        urls = ["https://a.example/review", "https://b.example/review"]
+
+        async def scrape(url):
+            if url == urls[1]:
+                raise RuntimeError("Failed to scrape URL: timeout")
+            return "content", {"title": "t"}
+
+        service._scrape_content = AsyncMock(side_effect=scrape)
+        service._extract_review_data = AsyncMock(
+            side_effect=lambda url, content, metadata: _extracted(url)
+        )
+
+        results = await service.ingest_many(db_session, urls, product_id=product.id)
+
+        assert results[0]["status"] == "success"
+        assert results[0]["opinions_created"] == 1
+        await db_session.refresh(product)
+        assert product.review_count == 1
+        assert results[1] == {"status": "error", "message": "Failed to scrape URL: timeout"}
+
+    @pytest.mark.asyncio
+    async def test_existing_urls_are_not_scraped(self, service, db_session):
+        product = Product(name="Pixel 9", category="smartphones", brand="Google")
+        db_session.add(product)
+        await db_session.flush()
+
+        url = "https://a.example/review"
+        service._scrape_content = AsyncMock(return_value=("content", {}))
+        service._extract_review_data = AsyncMock(return_value=_extracted(url))
+
+        await service.ingest_many(db_session, [url], product_id=product.id)
+        results = await service.ingest_many(db_session, [url], product_id=product.id)
+
+        assert results[0]["status"] == "already_exists"
+        assert service._scrape_content.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_opinions_bulk_inserted_with_normalized_aspects(self, service, db_session):
+        product = Product(name="Pixel 9", category="smartphones", brand="Google")
+        db_session.add(product)
+        await db_session.flush()
+
+        url = "https://a.example/review"
+        data = _extracted(url)
+        data["opinions"] = [
+            {"aspect": "Screen", "sentiment": 0.5, "confidence": 0.7},
+            {"aspect": "", "sentiment": 0.1, "confidence": 0.1},
+            {"aspect": "price", "sentiment": -0.4, "confidence": 0.6, "quote": "Too much"},
+        ]
+        service._scrape_content = AsyncMock(return_value=("content", {}))
+        service._extract_review_data = AsyncMock(return_value=data)
+
+        results = await service.ingest_many(db_session, [url], product_id=product.id)
+
+        rows = (await db_session.execute(
+            select(Opinion.aspect, Opinion.quote)
+            .where(Opinion.review_id == results[0]["review_id"])
+            .order_by(Opinion.id)
+        )).all()
+        assert results[0]["opinions_created"] == 2
+        assert rows == [("display", None), ("value", "Too much")]
+
+
+class TestGetOrFindProduct:
+    """Test product resolution for extracted blog reviews."""
+
+    @pytest.mark.asyncio
+    async def test_name_match_is_remembered(self, service, db_session):
+        product = Product(name="Google Pixel 9", category="smartphones", brand="Google")
+        db_session.add(product)
+        await db_session.flush()
+
+        found = await service._get_or_find_product(db_session, None, {"product_name": "Pixel 9"})
+        assert found.id == product.id
+
+        with patch.object(db_session, "execute", AsyncMock()) as mock_execute:
+            again = await service._get_or_find_product(db_session, None, {"product_name": " pixel 9 "})
+
+        assert again.id == product.id
+        mock_execute.assert_not_awaited()
+
+
+class TestExtractReviewData:
+    """Test structured Gemini extraction of blog content."""
+
+    @staticmethod
+    def _genai(parsed=None, text=None):
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(
+            return_value=MagicMock(parsed=parsed, text=text)
+        )
+        return client
+
+    @pytest.mark.asyncio
+    async def test_uses_parsed_schema_response(self, service):
+        service.genai_client = self._genai(parsed=ExtractedReview(product_name="Pixel 9"))
+
+        with patch("app.services.firecrawl_service.cache") as mock_cache:
+            mock_cache.get = AsyncMock(return_value=None)
+            mock_cache.set = AsyncMock()
+            data = await service._extract_review_data("https://a.example", "content", {"title": "t"})
+
+        config = service.genai_client.aio.models.generate_content.call_args.kwargs["config"]
+        assert config.response_mime_type == "application/json"
+        assert data["product_name"] == "Pixel 9"
+        assert data["opinions"] == []
+        assert data["source_title"] == "t"
+        mock_cache.set.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unparsed_text_with_fences_is_recovered(self, service):
+        service.genai_client = self._genai(
+            text='```json\n{"product_name": "Pixel 9", "pros": ["Camera"]}\n```'
+        )
+
+        with patch("app.services.firecrawl_service.cache") as mock_cache:
+            mock_cache.get = AsyncMock(return_value=None)
+            mock_cache.set = AsyncMock()
+            data = await service._extract_review_data("https://a.example", "content", {})
+
+        assert data["product_name"] == "Pixel 9"
+        assert data["pros"] == ["Camera"]
+        assert "reviewer_name" not in data
+
+    @pytest.mark.asyncio
+    async def test_invalid_json_raises_runtime_error(self, service):
+        service.genai_client = self._genai(text="not json")
+
+        with patch("app.services.firecrawl_service.cache") as mock_cache:
+            mock_cache.get = AsyncMock(return_value=None)
+            with pytest.raises(RuntimeError, match="Invalid JSON"):
+                await service._extract_review_data("https://a.example", "content", {})
+
+    @pytest.mark.asyncio
+    async def test_cached_extraction_skips_gemini(self, service):
+        service.genai_client = self._genai()
+
+        with patch("app.services.firecrawl_service.cache") as mock_cache:
+            mock_cache.hash_key.return_value = "blog_extract:abc"
+            mock_cache.get = AsyncMock(return_value={"product_name": "Pixel 9"})
+            data = await service._extract_review_data("https://a.example", "content", {})
+
+        assert data["product_name"] == "Pixel 9"
+        assert data["source_url"] == "https://a.example"
+        service.genai_client.aio.models.generate_content.assert_not_awaited()
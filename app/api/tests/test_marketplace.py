@@ -1,11 +1,32 @@
 """Tests for marketplace functions."""
 
 import pytest
+from datetime import datetime
 from unittest.mock import AsyncMock, patch, MagicMock
 
 from app.functions.registry import FUNCTION_DECLARATIONS, execute_function
 
 
+class _FakeStream:
+    """Async iterator over response chunks, like generate_content_stream."""
+
+    def __init__(self, *texts):
+        self._chunks = iter([MagicMock(text=text) for text in texts])
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def aclose(self):
+        self.closed = True
+
+
 class TestMarketplaceFunctionDeclarations:
     """Test that marketplace function declarations are properly defined."""
 
@@ -97,6 +118,262 @@ class TestMarketplaceScraperService:
         scraper = MarketplaceScraperService()
         assert scraper is not None
 
+    @pytest.mark.asyncio
+    async def test_repeated_search_served_from_cache(self):
+        """Test that a repeated marketplace search skips the Gemini call."""
+        from app.services.marketplace_scraper import MarketplaceScraperService
+
+        store = {}
+        scraper = MarketplaceScraperService()
+        scraper.genai_client = MagicMock()
+        scraper.genai_client.aio.models.generate_content_stream = AsyncMock(
+            side_effect=lambda **kwargs: _FakeStream('{"listings": [{"title": "iPhone 15", "price": 799}]}')
+        )
+
+        with patch("app.services.marketplace_scraper.cache") as mock_cache:
+            mock_cache.hash_key.side_effect = lambda prefix, value: f"{prefix}:{value.lower()}"
+            mock_cache.get = AsyncMock(side_effect=lambda key: store.get(key))
+            mock_cache.set = AsyncMock(side_effect=lambda key, value, ttl: store.__setitem__(key, value))
+
+            first = await scraper.search_amazon("iPhone 15", limit=3)
+            second = await scraper.search_amazon("  iphone 15 ", limit=3)
+
+        assert first["status"] == "success"
+        assert second == first
+        scraper.genai_client.aio.models.generate_content_stream.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_searches_share_one_call(self):
+        """Test that simultaneous searches for the same product make one Gemini call."""
+        import asyncio
+        from app.services.marketplace_scraper import MarketplaceScraperService
+
+        release = asyncio.Event()
+
+        async def slow_stream(**kwargs):
+            await release.wait()
+            return _FakeStream('{"listings": [{"title": "Widget"}]}')
+
+        scraper = MarketplaceScraperService()
+        scraper.genai_client = MagicMock()
+        scraper.genai_client.aio.models.generate_content_stream = AsyncMock(side_effect=slow_stream)
+
+        with patch("app.services.marketplace_scraper.cache") as mock_cache:
+            mock_cache.get = AsyncMock(return_value=None)
+            mock_cache.set = AsyncMock()
+            tasks = [asyncio.create_task(scraper.search_ebay("Widget", limit=2)) for _ in range(3)]
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(*tasks)
+
+        assert all(r["status"] == "success" for r in results)
+        scraper.genai_client.aio.models.generate_content_stream.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_ebay_browse_api_used_before_gemini(self):
+        """Test that configured eBay credentials route searches to the Browse API."""
+        from app.services.marketplace_scraper import EbayBrowseClient, MarketplaceScraperService
+
+        token = MagicMock(json=MagicMock(return_value={"access_token": "tok", "expires_in": 7200}))
+        search = MagicMock(json=MagicMock(return_value={"itemSummaries": [{
+            "title": "Widget",
+            "price": {"value": "17.50", "currency": "USD"},
+            "itemWebUrl": "https://www.ebay.com/itm/1",
+            "seller": {"username": "shop", "feedbackPercentage": "99.1"},
+            "shippingOptions": [{"shippingCost": {"value": "0.00", "currency": "USD"}}],
+        }]}))
+        http = MagicMock()
+        http.post = AsyncMock(return_value=token)
+        http.get = AsyncMock(return_value=search)
+
+        scraper = MarketplaceScraperService()
+        scraper.genai_client = MagicMock()
+        scraper.ebay = EbayBrowseClient("id", "secret")
+
+        with patch("app.services.marketplace_scraper.get_http_client", return_value=http), \
+                patch("app.services.marketplace_scraper.cache") as mock_cache:
+            mock_cache.get = AsyncMock(return_value=None)
+            mock_cache.set = AsyncMock()
+            result = await scraper.search_ebay("Widget", limit=3)
+            await scraper.search_ebay("Other", limit=3)
+
+        assert result["status"] == "success"
+        assert result["listings"] == [{
+            "title": "Widget", "price": 17.5, "currency": "USD",
+            "url": "https://www.ebay.com/itm/1", "seller_name": "shop", "seller_rating": 99.1,
+            "availability": "in_stock", "is_best_seller": False, "shipping_info": "Free shipping",
+        }]
+        http.post.assert_awaited_once()  # token reused across searches
+        scraper.genai_client.aio.models.generate_content_stream.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_ebay_browse_api_failure_falls_back_to_gemini(self):
+        """Test that a Browse API error falls back to the Gemini search."""
+        from app.services.marketplace_scraper import MarketplaceScraperService
+
+        scraper = MarketplaceScraperService()
+        scraper.genai_client = MagicMock()
+        scraper.genai_client.aio.models.generate_content_stream = AsyncMock(
+            return_value=_FakeStream('{"listings": [{"title": "Widget"}]}')
+        )
+        scraper.ebay = MagicMock(enabled=True)
+        scraper.ebay.search = AsyncMock(side_effect=RuntimeError("503"))
+
+        with patch("app.services.marketplace_scraper.cache") as mock_cache:
+            mock_cache.get = AsyncMock(return_value=None)
+            mock_cache.set = AsyncMock()
+            result = await scraper.search_ebay("Widget", limit=3)
+
+        assert result["listings"] == [{
+            "title": "Widget", "currency": "USD", "availability": "unknown", "is_best_seller": False,
+        }]
+
+    @pytest.mark.asyncio
+    async def test_marketplaces_searched_concurrently(self):
+        """Test that marketplace searches overlap and one failure is isolated."""
+        import asyncio
+        from app.services.marketplace_scraper import MarketplaceScraperService
+
+        scraper = MarketplaceScraperService()
+        both_started = asyncio.Event()
+        started = []
+
+        async def search_amazon(product_name, limit):
+            started.append("amazon")
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return {"status": "success", "listings": [{"title": "A", "price": 10}]}
+
+        async def search_ebay(product_name, limit):
+            started.append("ebay")
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            raise RuntimeError("boom")
+
+        scraper.search_amazon = search_amazon
+        scraper.search_ebay = search_ebay
+
+        result = await scraper.scrape_and_store_listings(db=None, product_name="Widget")
+
+        assert result["listings_found"] == 1
+        assert result["results_by_marketplace"] == {
+            "amazon": {"count": 1, "status": "success"},
+            "ebay": {"count": 0, "status": "unknown"},
+        }
+
+    @pytest.mark.asyncio
+    async def test_max_total_skips_remaining_marketplaces(self):
+        """Test that max_total searches in preference order and stops early."""
+        from app.services.marketplace_scraper import MarketplaceScraperService
+
+        scraper = MarketplaceScraperService()
+        scraper.search_ebay = AsyncMock(return_value={
+            "status": "success",
+            "listings": [{"title": "A", "url": "https://ebay.com/1"}, {"title": "B", "url": "https://ebay.com/2"}],
+        })
+        scraper.search_amazon = AsyncMock()
+
+        result = await scraper.scrape_and_store_listings(
+            db=None, product_name="Widget", max_total=2, prefer_marketplace="ebay"
+        )
+
+        assert result["listings_found"] == 2
+        assert result["results_by_marketplace"]["amazon"] == {"count": 0, "status": "skipped"}
+        scraper.search_amazon.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_listings_stored_in_one_batch(self, db_session):
+        """Test that listings are normalized and stored, skipping malformed ones."""
+        from sqlalchemy import select
+        from app.models.marketplace import MarketplaceListing
+        from app.models.product import Product
+        from app.services.marketplace_scraper import MarketplaceScraperService
+
+        product = Product(name="Widget", category="gadgets")
+        db_session.add(product)
+        await db_session.flush()
+
+        scraper = MarketplaceScraperService()
+        scraper.search_amazon = AsyncMock(return_value={"status": "success", "listings": [
+            {"title": "Widget", "price": 19.99, "url": "https://amazon.com/dp/1", "availability": "in_stock"},
+            {"title": "Broken", "price": "N/A", "url": "https://amazon.com/dp/2"},
+        ]})
+        scraper.search_ebay = AsyncMock(return_value={"status": "success", "listings": [
+            {"title": "Widget", "price": 17.5, "url": "https://ebay.com/itm/3", "seller_rating": 99.0},
+        ]})
+
+        result = await scraper.scrape_and_store_listings(
+            db=db_session, product_name="Widget", product_id=product.id
+        )
+
+        assert result["listings_stored"] == 2
+        rows = (await db_session.execute(
+            select(MarketplaceListing).order_by(MarketplaceListing.price_current)
+        )).scalars().all()
+        assert [r.marketplace_name for r in rows] == ["ebay", "amazon"]
+        assert float(rows[0].seller_rating) == pytest.approx(4.95)
+        assert rows[1].is_available is True
+        assert rows[1].listing_metadata["title"] == "Widget"
+        assert datetime.fromisoformat(rows[1].listing_metadata["scraped_at"]).tzinfo is not None
+
+    @pytest.mark.asyncio
+    async def test_stream_stops_once_limit_reached(self):
+        """Test that listings are parsed as they stream and the stream closes at the limit."""
+        from app.services.marketplace_scraper import MarketplaceScraperService
+
+        text = '{"listings": [{"title": "A", "price": 1}, {"title": "B"}, {"title": "C"}]}'
+        stream = _FakeStream(*[text[i:i + 7] for i in range(0, len(text), 7)])
+        scraper = MarketplaceScraperService()
+        scraper.genai_client = MagicMock()
+        scraper.genai_client.aio.models.generate_content_stream = AsyncMock(return_value=stream)
+
+        received, listings = await scraper._stream_listings("instructions", "prompt", limit=2)
+
+        assert [l["title"] for l in listings] == ["A", "B"]
+        assert listings[0] == {
+            "title": "A", "price": 1.0, "currency": "USD",
+            "availability": "unknown", "is_best_seller": False,
+        }
+        assert not received.endswith("}]}")
+        assert stream.closed
+        call = scraper.genai_client.aio.models.generate_content_stream.call_args
+        assert call.kwargs["contents"] == "prompt"
+        assert call.kwargs["config"].system_instruction == "instructions"
+        assert call.kwargs["config"].max_output_tokens == 800
+
+    def test_parse_listings_from_text(self):
+        """Test the whole-text fallback parser."""
+        from app.services.marketplace_scraper import _parse_listings
+
+        assert _parse_listings('Here you go: {"listings": [{"title": "W"}]}')[0]["title"] == "W"
+        with pytest.raises(ValueError):
+            _parse_listings("no results found")
+
+    def test_duplicate_listing_urls_dropped(self):
+        """Test that listings differing only by tracking params are deduplicated."""
+        from app.services.marketplace_scraper import _dedupe_listings
+
+        listings = [
+            {"title": "A", "url": "https://www.amazon.com/dp/B0C?th=1"},
+            {"title": "A again", "url": "https://WWW.amazon.com/dp/B0C/?tag=x-20&utm_source=g&th=1"},
+            {"title": "B", "url": "https://www.amazon.com/dp/B0C?th=2"},
+            {"title": "No URL"},
+        ]
+
+        assert [l["title"] for l in _dedupe_listings(listings)] == ["A", "B", "No URL"]
+
+    def test_malformed_listing_left_out_of_batch(self):
+        """Test that a listing with an unusable price is skipped, not the whole batch."""
+        from app.services.marketplace_scraper import _build_listing_rows
+
+        listings = [{"title": "A", "price": 10}, {"title": "B", "price": "n/a"}]
+        rows, stored = _build_listing_rows(listings, 1, "US", datetime.now())
+
+        assert [r["listing_metadata"]["title"] for r in rows] == ["A"]
+        assert stored == [listings[0]]
+
 
 @pytest.mark.skipif(True, reason="Requires API keys for live testing")
 class TestMarketplaceLiveIntegration:
@@ -125,6 +125,28 @@ class TestSearchYoutubeReviews:
         assert result["urls"] == []
 
 
+class TestScrapeUrlWithFirecrawl:
+    """Test the Firecrawl scrape helper."""
+
+    @pytest.mark.asyncio
+    async def test_scrapes_over_shared_http_client(self):
+        from app.functions.review_tools import FIRECRAWL_SCRAPE_URL, _scrape_url_with_firecrawl
+
+        http = MagicMock()
+        http.post = AsyncMock(return_value=MagicMock(
+            json=MagicMock(return_value={"success": True, "data": {"markdown": "# Review"}})
+        ))
+
+        with patch("app.functions.review_tools.get_http_client", return_value=http), \
+                patch("app.functions.review_tools.settings.FIRECRAWL_API_KEY", "fc-key"):
+            content = await _scrape_url_with_firecrawl("https://example.com/review")
+
+        assert content == "# Review"
+        call = http.post.call_args
+        assert call.args == (FIRECRAWL_SCRAPE_URL,)
+        assert call.kwargs["json"] == {"url": "https://example.com/review", "formats": ["markdown"]}
+
+
 class TestIngestReviewsBatch:
     """Test batch ingestion function."""
 
@@ -186,6 +208,22 @@ class TestIngestReviewsBatch:
 class TestGetReviewsSummary:
     """Test get_reviews_summary with pre-populated data."""
 
+    @pytest.mark.asyncio
+    async def test_invalidation_clears_summary_cache_keys(self):
+        from app.functions.review_tools import _invalidate_summary_cache
+        from app.services.cache_service import CacheService
+
+        with patch("app.functions.review_tools.cache") as mock_cache:
+            mock_cache.hash_key = CacheService.hash_key
+            mock_cache.delete = AsyncMock()
+            await _invalidate_summary_cache("Test Phone", 42)
+
+        deleted = {call.args[0] for call in mock_cache.delete.await_args_list}
+        assert deleted == {
+            CacheService.hash_key("summary", "test phone"),
+            CacheService.hash_key("summary", "42"),
+        }
+
     @pytest.mark.asyncio
     @patch("app.functions.review_tools.cache")
     @patch("app.functions.review_tools._call_gemini_with_timeout")
@@ -0,0 +1,346 @@
+"""Tests for the YouTube scraper service."""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import select
+
+from app.models.opinion import Opinion
+from app.models.product import Product
+from app.models.review import Review
+from app.models.reviewer import Reviewer
+from app.services.youtube_scraper import (
+    PROMPT_VERSION,
+    _find_json_object,
+    _parse_publish_date,
+    REVIEW_ANALYSIS_INSTRUCTIONS,
+    ScrapedVideo,
+    VIDEO_SCRAPE_INSTRUCTIONS,
+    VideoReviewAnalysis,
+    YouTubeScraperService,
+)
+
+VIDEO_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+class _DictCache:
+    """In-memory stand-in for the Redis CacheService."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl=3600):
+        self.data[key] = value
+
+
+@pytest.fixture
+def scraper():
+    with patch.object(YouTubeScraperService, "_init_gemini"):
+        service = YouTubeScraperService()
+    service.client = MagicMock()
+    service.client.aio.models.generate_content = AsyncMock(
+        return_value=MagicMock(text='{"title": "Pixel 9 review", "channel_name": "MKBHD"}')
+    )
+    return service
+
+
+class TestExtractVideoId:
+    """Test video ID extraction across YouTube URL formats."""
+
+    @pytest.mark.parametrize("url", [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ",
+        "https://youtu.be/dQw4w9WgXcQ?t=42",
+        "https://www.youtube.com/embed/dQw4w9WgXcQ",
+        "https://www.youtube.com/v/dQw4w9WgXcQ",
+    ])
+    def test_known_formats(self, scraper, url):
+        assert scraper._extract_video_id(url) == "dQw4w9WgXcQ"
+
+    def test_unrecognized_url(self, scraper):
+        assert scraper._extract_video_id("https://example.com/video") is None
+
+
+class TestFindJsonObject:
+    """Test extraction of the first JSON object from model output."""
+
+    def test_ignores_surrounding_prose_and_fences(self):
+        text = 'Here you go:\n```json\n{"title": "A {b}", "n": [1, {"x": 2}]}\n```\nNote: {not json}'
+        assert _find_json_object(text) == {"title": "A {b}", "n": [1, {"x": 2}]}
+
+    def test_no_object(self):
+        assert _find_json_object("no structured data") is None
+
+    def test_trailing_comma_parsed_with_json5(self):
+        pytest.importorskip("json5")
+        assert _find_json_object("{'title': 'A', 'pros': ['x',],}") == {"title": "A", "pros": ["x"]}
+
+    def test_malformed_object_raises(self):
+        with pytest.raises(json.JSONDecodeError):
+            _find_json_object('{"title": ')
+
+
+class TestParsePublishDate:
+    """Test publish date parsing of noisy model output."""
+
+    @pytest.mark.parametrize("value", ["2024-03-15", "2024-03-15T10:30:00Z"])
+    def test_iso_dates(self, value):
+        assert _parse_publish_date(value) == datetime(2024, 3, 15, tzinfo=timezone.utc)
+
+    @pytest.mark.parametrize("value", [None, "", "2024", "Jan 2024", "2024-13-40", 20240315])
+    def test_unparseable_dates(self, value):
+        assert _parse_publish_date(value) is None
+
+
+class TestResponseCache:
+    """Test that repeated scrapes are served from the response cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_scrape_served_from_cache(self, scraper):
+        with patch("app.services.youtube_scraper.cache", _DictCache()):
+            first = await scraper.scrape_youtube_video(VIDEO_URL)
+            second = await scraper.scrape_youtube_video(VIDEO_URL)
+
+        assert first == second
+        assert first["title"] == "Pixel 9 review"
+        assert first["video_id"] == "dQw4w9WgXcQ"
+        assert first["key_points"] == []  # schema defaults filled in
+        assert "channel_url" not in first  # unset fields left to .get() defaults
+        scraper.client.aio.models.generate_content.assert_awaited_once()
+        config = scraper.client.aio.models.generate_content.call_args.kwargs["config"]
+        assert config.response_schema is ScrapedVideo
+        assert config.system_instruction == VIDEO_SCRAPE_INSTRUCTIONS
+        assert scraper.client.aio.models.generate_content.call_args.kwargs["contents"] == f"YouTube video: {VIDEO_URL}"
+
+    @pytest.mark.asyncio
+    async def test_video_ids_differing_in_case_not_shared(self, scraper):
+        with patch("app.services.youtube_scraper.cache", _DictCache()):
+            await scraper.scrape_youtube_video(VIDEO_URL)
+            await scraper.scrape_youtube_video(VIDEO_URL.replace("dQw4w9WgXcQ", "dqw4w9wgxcq"))
+
+        assert scraper.client.aio.models.generate_content.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_long_transcript_cached(self, scraper):
+        video_content = {"raw_content": "word " * 40000}
+
+        with patch("app.services.youtube_scraper.cache", _DictCache()):
+            await scraper.extract_review_data(video_content)
+            await scraper.extract_review_data(video_content)
+
+        scraper.client.aio.models.generate_content.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_prompt_version_invalidates_cache(self, scraper):
+        with patch("app.services.youtube_scraper.cache", _DictCache()):
+            await scraper.extract_review_data({"title": "Pixel 9 review"})
+            with patch("app.services.youtube_scraper.PROMPT_VERSION", PROMPT_VERSION + 1):
+                await scraper.extract_review_data({"title": "Pixel 9 review"})
+
+        assert scraper.client.aio.models.generate_content.await_count == 2
+
+
+class TestAnalysisRequest:
+    """Test the review analysis request sent to Gemini."""
+
+    @pytest.mark.asyncio
+    async def test_large_content_sent_inline_without_cached_content(self, scraper):
+        scraper.client.aio.caches.create = AsyncMock()
+
+        with patch("app.services.youtube_scraper.cache", _DictCache()):
+            await scraper.extract_review_data({"raw_content": "x" * 20000})
+
+        scraper.client.aio.caches.create.assert_not_called()
+        call = scraper.client.aio.models.generate_content.call_args
+        assert call.kwargs["config"].system_instruction == REVIEW_ANALYSIS_INSTRUCTIONS
+        assert call.kwargs["config"].response_schema is VideoReviewAnalysis
+        assert "x" * 100 in call.kwargs["contents"]
+
+    @pytest.mark.asyncio
+    async def test_small_content_sent_inline(self, scraper):
+        with patch("app.services.youtube_scraper.cache", _DictCache()):
+            await scraper.extract_review_data({"title": "Pixel 9 review"})
+
+        call = scraper.client.aio.models.generate_content.call_args
+        assert call.kwargs["contents"] == "CONTENT:\nTitle: Pixel 9 review"
+
+
+class TestIngestYoutubeReview:
+    """Test the scrape → extract → store ingestion pipeline."""
+
+    VIDEO = {
+        "video_id": "dQw4w9WgXcQ",
+        "platform_url": VIDEO_URL,
+        "title": "Pixel 9 review",
+        "channel_name": "Tech Channel",
+        "channel_id": "UC123",
+    }
+
+    @pytest.mark.asyncio
+    async def test_reviewer_created_after_extraction(self, scraper, db_session):
+        scraper.scrape_youtube_video = AsyncMock(return_value=dict(self.VIDEO))
+        scraper.extract_review_data = AsyncMock(return_value={
+            "product_name": "Pixel 9",
+            "product_category": "smartphones",
+            "summary": "Great phone.",
+            "opinions": [{"aspect": "camera", "sentiment": 0.8}],
+        })
+
+        result = await scraper.ingest_youtube_review(db_session, VIDEO_URL)
+
+        assert result["status"] == "success"
+        assert result["opinions_count"] == 1
+        reviewer = (await db_session.execute(select(Reviewer))).scalar_one()
+        assert reviewer.platform_id == "UC123"
+        assert reviewer.id == result["reviewer_id"]
+        assert reviewer.total_reviews == 1
+        stats = (await db_session.execute(
+            select(Product.review_count, Product.average_rating).where(Product.id == result["product_id"])
+        )).one()
+        assert stats == (1, None)
+        opinion = (await db_session.execute(select(Opinion))).scalar_one()
+        assert (opinion.review_id, opinion.aspect, opinion.sentiment, opinion.confidence) == (
+            result["review_id"], "camera", 0.8, 0.5
+        )
+
+    @pytest.mark.asyncio
+    async def test_failed_extraction_writes_nothing(self, scraper, db_session):
+        scraper.scrape_youtube_video = AsyncMock(return_value=dict(self.VIDEO))
+        scraper.extract_review_data = AsyncMock(return_value={"error": "Empty response from Gemini"})
+
+        result = await scraper.ingest_youtube_review(db_session, VIDEO_URL)
+
+        assert result["status"] == "error"
+        assert (await db_session.execute(select(Reviewer))).first() is None
+
+    @pytest.mark.asyncio
+    async def test_scrape_without_channel_name_uses_default(self, scraper, db_session):
+        scraper.client.aio.models.generate_content = AsyncMock(
+            return_value=MagicMock(text='{"title": "Pixel 9 review"}')
+        )
+        scraper.extract_review_data = AsyncMock(return_value={
+            "product_name": "Pixel 9", "product_category": "smartphones",
+        })
+
+        with patch("app.services.youtube_scraper.cache", _DictCache()):
+            result = await scraper.ingest_youtube_review(db_session, VIDEO_URL)
+
+        assert result["status"] == "success"
+        reviewer = (await db_session.execute(select(Reviewer))).scalar_one()
+        assert (reviewer.name, reviewer.platform_id) == ("Unknown Channel", "unknown_channel")
+
+    @pytest.mark.asyncio
+    async def test_reingest_skips_lookup_for_known_url(self, scraper, db_session):
+        scraper.scrape_youtube_video = AsyncMock(return_value=dict(self.VIDEO))
+        scraper.extract_review_data = AsyncMock(return_value={
+            "product_name": "Pixel 9", "product_category": "smartphones",
+        })
+        first = await scraper.ingest_youtube_review(db_session, VIDEO_URL)
+
+        with patch("app.services.youtube_scraper.review_crud") as review_crud:
+            again = await scraper.ingest_youtube_review(db_session, VIDEO_URL)
+
+        assert again["status"] == "exists"
+        assert again["review_id"] == first["review_id"]
+        review_crud.get_by_platform_url.assert_not_called()
+        scraper.scrape_youtube_video.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_create_reviewer_returns_existing_on_conflict(self, scraper, db_session):
+        first = await scraper._create_reviewer(db_session, dict(self.VIDEO), "UC123")
+        again = await scraper._create_reviewer(db_session, dict(self.VIDEO, channel_name="Renamed"), "UC123")
+
+        assert again.id == first.id
+        assert again.name == "Tech Channel"
+        assert len((await db_session.execute(select(Reviewer))).scalars().all()) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_ingests_share_one_run(self, scraper, db_session):
+        release = asyncio.Event()
+
+        async def slow_scrape(url):
+            await release.wait()
+            return dict(self.VIDEO)
+
+        scraper.scrape_youtube_video = AsyncMock(side_effect=slow_scrape)
+        scraper.extract_review_data = AsyncMock(return_value={
+            "product_name": "Pixel 9", "product_category": "smartphones",
+        })
+
+        first = asyncio.create_task(scraper.ingest_youtube_review(db_session, VIDEO_URL))
+        second = asyncio.create_task(scraper.ingest_youtube_review(db_session, VIDEO_URL))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(first, second)
+
+        assert results[0] is results[1]
+        assert results[0]["status"] == "success"
+        scraper.scrape_youtube_video.assert_awaited_once()
+        assert scraper._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_exact_product_name_preferred_over_fuzzy_match(self, scraper, db_session):
+        db_session.add_all([
+            Product(name="Pixel 9 Pro", category="smartphones", review_count=5),
+            Product(name="Pixel 9", category="smartphones", review_count=0),
+        ])
+        await db_session.flush()
+
+        product = await scraper._get_or_create_product(db_session, {"product_name": "Pixel 9"})
+
+        assert product.name == "Pixel 9"
+
+    @pytest.mark.asyncio
+    async def test_populated_scrape_skips_analysis(self, scraper, db_session):
+        scraper.scrape_youtube_video = AsyncMock(return_value=dict(
+            self.VIDEO,
+            products_mentioned=["Pixel 9"],
+            key_points=["Great camera"],
+            recommendation="positive",
+            overall_rating=8.5,
+            cons=["Slow charging"],
+            opinions=[{"aspect": "camera", "sentiment": 0.9, "confidence": 0.8}],
+            transcript_summary="A strong phone.",
+        ))
+        scraper.extract_review_data = AsyncMock()
+
+        result = await scraper.ingest_youtube_review(db_session, VIDEO_URL)
+
+        assert result["status"] == "success"
+        assert result["product_name"] == "Pixel 9"
+        assert result["summary"] == "A strong phone."
+        scraper.extract_review_data.assert_not_called()
+        review = (await db_session.execute(select(Review))).scalar_one()
+        assert review.review_metadata["recommendation"] == "buy"
+        assert review.review_metadata["pros"] == ["Great camera"]
+        assert review.review_metadata["cons"] == ["Slow charging"]
+        assert result["opinions_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_typical_scrape_still_analyzed_for_opinions(self, scraper, db_session):
+        scraper.scrape_youtube_video = AsyncMock(return_value=dict(
+            self.VIDEO,
+            products_mentioned=["Pixel 9"],
+            key_points=["Great camera"],
+            recommendation="positive",
+        ))
+        scraper.extract_review_data = AsyncMock(return_value={
+            "product_name": "Pixel 9",
+            "overall_rating": 8.0,
+            "cons": ["Slow charging"],
+            "opinions": [{"aspect": "camera", "sentiment": 0.8}],
+        })
+
+        result = await scraper.ingest_youtube_review(db_session, VIDEO_URL)
+
+        scraper.extract_review_data.assert_awaited_once()
+        assert result["opinions_count"] == 1
+        review = (await db_session.execute(select(Review))).scalar_one()
+        assert review.review_metadata["cons"] == ["Slow charging"]